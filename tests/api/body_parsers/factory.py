@@ -57,6 +57,30 @@ class BodyParserFactoryTestCase(unittest.TestCase):
         self.mocks['pet_rm_fields'] = pet_rm_fields_patch.start()
         self.patches.append(pet_rm_fields_patch)
 
+        shop_listing_fields_patch = patch(
+            'users.api.body_parsers.factory.SHOP_LISTING', new='shop listing fields'
+        )
+        self.mocks['shop_listing_fields'] = shop_listing_fields_patch.start()
+        self.patches.append(shop_listing_fields_patch)
+
+        batch_reg_fields_patch = patch(
+            'users.api.body_parsers.factory.BATCH_REGISTRATION', new='batch reg fields'
+        )
+        self.mocks['batch_reg_fields'] = batch_reg_fields_patch.start()
+        self.patches.append(batch_reg_fields_patch)
+
+        for name, value in (('ITEM_LISTING', 'item listing fields'),
+                            ('SERVICE_PATCH', 'service patch fields'),
+                            ('PET_PATCH', 'pet patch fields'),
+                            ('SHOP_NEARBY', 'shop nearby fields'),
+                            ('SHOP_SEARCH', 'shop search fields'),
+                            ('SHOP_SUGGEST', 'shop suggest fields'),
+                            ('USER_LOOKUP', 'user lookup fields'),
+                            ('SHOP_CHANGES', 'shop changes fields')):
+            fields_patch = patch(f'users.api.body_parsers.factory.{name}', new=value)
+            fields_patch.start()
+            self.patches.append(fields_patch)
+
     def tearDown(self):
         for patch_ in self.patches:
             patch_.stop()
@@ -71,7 +95,17 @@ class BodyParserFactoryTestCase(unittest.TestCase):
             'client_update': 'client up fields',
             'shop_update': 'shops up fields',
             'service_removal': 'service rm fields',
-            'pet_removal': 'pet rm fields'
+            'pet_removal': 'pet rm fields',
+            'shop_listing': 'shop listing fields',
+            'batch_registration': 'batch reg fields',
+            'item_listing': 'item listing fields',
+            'service_patch': 'service patch fields',
+            'pet_patch': 'pet patch fields',
+            'shop_nearby': 'shop nearby fields',
+            'shop_search': 'shop search fields',
+            'shop_suggest': 'shop suggest fields',
+            'user_lookup': 'user lookup fields',
+            'shop_changes': 'shop changes fields'
         }
 
         # Act
@@ -91,5 +125,17 @@ class BodyParserFactoryTestCase(unittest.TestCase):
         parser = BodyParserFactory.get_parser(mock_self, type_)
 
         # Assert
-        self.mocks['parser'].assert_called_with(self.mocks['auth_fields'])
+        self.mocks['parser'].assert_called_with(self.mocks['auth_fields'], None)
         self.assertEqual(parser, self.mocks['parser'].return_value)
+
+    def test_get_parser_with_source_passes_it_on(self):
+        # Setup
+        mock_self = MagicMock(types={
+            'auth': self.mocks['auth_fields']
+        })
+
+        # Act
+        BodyParserFactory.get_parser(mock_self, 'auth', 'record')
+
+        # Assert
+        self.mocks['parser'].assert_called_with(self.mocks['auth_fields'], 'record')
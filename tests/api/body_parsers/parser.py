@@ -29,6 +29,7 @@ class BodyParserTestCase(unittest.TestCase):
 
         # Assert
         mock_self._create_parser.assert_called_once()
+        mock_self._create_parser.return_value.parse_args.assert_called_with(req=None)
         self.assertEqual(
             mock_self.fields,
             mock_self._create_parser.return_value.parse_args.return_value
@@ -44,6 +44,18 @@ class AuthenticationServiceTestCase(unittest.TestCase):
         self.mocks['shops_col'] = shops_col_patch.start()
         self.patches.append(shops_col_patch)
 
+        hasher_patch = patch('users.api.services.authentication.get_password_hasher')
+        self.mocks['hasher'] = hasher_patch.start()
+        self.patches.append(hasher_patch)
+
+        cache_patch = patch('users.api.services.authentication.get_listing_cache')
+        self.mocks['cache'] = cache_patch.start()
+        self.patches.append(cache_patch)
+
+        name_index_patch = patch('users.api.services.authentication.get_name_index')
+        self.mocks['name_index'] = name_index_patch.start()
+        self.patches.append(name_index_patch)
+
     def tearDown(self):
         for patch_ in self.patches:
             patch_.stop()
@@ -72,28 +84,136 @@ class AuthenticationServiceTestCase(unittest.TestCase):
             'password': 'hangloose',
             'type': 'client'
         }
+        self.mocks['mongo'].return_value.get_user_by_username.return_value = {
+            '_id': 'test_id', 'password': 'stored_hash'
+        }
+        self.mocks['hasher'].return_value.verify.return_value = (True, False)
 
         # Act
         AuthenticationService.authenticate(mock_self)
 
         # Assert
         self.mocks['mongo'].return_value.get_user_by_username.assert_called_with(
-            'test_col', 'dude', 'hangloose'
+            'test_col', 'dude'
         )
+        self.mocks['hasher'].return_value.verify.assert_called_with('hangloose', 'stored_hash')
+        self.mocks['create_access_token'].assert_called_with({'_id': 'test_id'})
         self.mocks['jsonify'].assert_called_with(
             self.mocks['create_access_token'].return_value
         )
+        mock_self._rehash.assert_not_called()
+
+    def test_authenticate_token_identity_keeps_only_identity_fields(self):
+        # Setup
+        mock_self = MagicMock(collections={'shop': 'test_col'})
+        mock_self.parser.fields = {'username': 'shop', 'password': 'secret', 'type': 'shop'}
+        self.mocks['mongo'].return_value.get_user_by_username.return_value = {
+            '_id': 'test_id', 'username': 'shop', 'type': 'shop', 'name': 'Pet',
+            'password': 'stored_hash', 'offers': [{'name': 'banho'}],
+            'service_names': ['banho'], 'version': 3, 'updated_at': 'now'
+        }
+        self.mocks['hasher'].return_value.verify.return_value = (True, False)
+
+        # Act
+        AuthenticationService.authenticate(mock_self)
+
+        # Assert
+        self.mocks['create_access_token'].assert_called_with(
+            {'_id': 'test_id', 'username': 'shop', 'type': 'shop', 'name': 'Pet'}
+        )
+
+    def test_authenticate_legacy_password_rehashes(self):
+        # Setup
+        mock_self = MagicMock(collections={'client': 'test_col'})
+        mock_self.parser.fields = {
+            'username': 'dude',
+            'password': 'hangloose',
+            'type': 'client'
+        }
+        self.mocks['mongo'].return_value.get_user_by_username.return_value = {
+            '_id': 'test_id', 'password': 'hangloose'
+        }
+        self.mocks['hasher'].return_value.verify.return_value = (True, True)
+
+        # Act
+        AuthenticationService.authenticate(mock_self)
+
+        # Assert
+        mock_self._rehash.assert_called_with('test_col', 'test_id', 'hangloose')
+
+    def test_authenticate_wrong_password_abort_401(self):
+        # Setup
+        mock_self = MagicMock(collections={'client': 'test_col'})
+        mock_self.parser.fields = {
+            'username': 'dude',
+            'password': 'wrong',
+            'type': 'client'
+        }
+        self.mocks['hasher'].return_value.verify.return_value = (False, False)
+
+        # Act
+        AuthenticationService.authenticate(mock_self)
+
+        # Assert
+        self.mocks['abort'].assert_called_with(401, extra="'Invalid username or password'")
+        self.mocks['jsonify'].assert_not_called()
 
     def test_authenticate_keyerror_abort(self):
         # Setup
         mock_self = MagicMock()
         self.mocks['mongo'].return_value.get_user_by_username.side_effect = KeyError
+        self.mocks['hasher'].return_value.verify.return_value = (False, False)
 
         # Act
         AuthenticationService.authenticate(mock_self)
 
         # Assert
-        self.mocks['abort'].assert_called()
+        self.mocks['abort'].assert_called_with(401, extra="'Invalid username or password'")
+
+    def test_authenticate_unknown_user_verifies_dummy_hash(self):
+        # Setup
+        mock_self = MagicMock()
+        mock_self.parser.fields = {'username': 'nobody', 'password': 'guess', 'type': 'client'}
+        self.mocks['mongo'].return_value.get_user_by_username.side_effect = KeyError
+        hasher = self.mocks['hasher'].return_value
+        hasher.verify.return_value = (False, False)
+
+        # Act
+        AuthenticationService.authenticate(mock_self)
+
+        # Assert
+        hasher.verify.assert_called_with('guess', hasher.dummy_hash)
+
+    def test_authenticate_hashing_busy_abort_503(self):
+        # Setup
+        mock_self = MagicMock()
+        self.mocks['hasher'].return_value.verify.side_effect = RuntimeError('busy')
+
+        # Act
+        AuthenticationService.authenticate(mock_self)
+
+        # Assert
+        self.mocks['abort'].assert_called_with(503, extra='busy')
+
+    def test_rehash_stores_new_hash(self):
+        # Act
+        AuthenticationService._rehash('test_col', 'test_id', 'hangloose')
+
+        # Assert
+        self.mocks['hasher'].return_value.hash.assert_called_with('hangloose')
+        self.mocks['mongo'].return_value.set_password.assert_called_with(
+            'test_col', 'test_id', self.mocks['hasher'].return_value.hash.return_value
+        )
+
+    def test_rehash_error_is_ignored(self):
+        # Setup
+        self.mocks['mongo'].return_value.set_password.side_effect = RuntimeError
+
+        # Act
+        AuthenticationService._rehash('test_col', 'test_id', 'hangloose')
+
+        # Assert
+        self.mocks['abort'].assert_not_called()
 
     def test_delete_user_deletes_user_on_db(self):
         # Setup
@@ -110,3 +230,18 @@ class AuthenticationServiceTestCase(unittest.TestCase):
         self.mocks['mongo'].return_value.delete.assert_called_with(
             'test_col', 'test_id'
         )
+
+    def test_delete_user_shop_invalidates_listing_cache(self):
+        # Setup
+        mock_self = MagicMock(collections={'shop': 'test_col'})
+        self.mocks['get_jwt_identity'].return_value = {
+            'type': 'shop',
+            '_id': 'test_id'
+        }
+
+        # Act
+        AuthenticationService.delete_user(mock_self)
+
+        # Assert
+        self.mocks['cache'].return_value.invalidate_user.assert_called_with('test_id')
+        self.mocks['name_index'].return_value.remove.assert_called_with('test_id')
@@ -0,0 +1,135 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from werkzeug.exceptions import HTTPException
+
+from users.api.services.changes import ChangesService
+
+
+NOW = datetime(2026, 10, 18, 12, 0)
+
+
+# pylint: disable=protected-access
+class ChangesServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.mocks = {}
+        self.patches = []
+
+        abort_patch = patch('users.api.services.changes.abort')
+        self.mocks['abort'] = abort_patch.start()
+        self.mocks['abort'].side_effect = HTTPException
+        self.patches.append(abort_patch)
+
+        get_jwt_id_patch = patch('users.api.services.changes.get_jwt_identity')
+        self.mocks['get_jwt_id'] = get_jwt_id_patch.start()
+        self.mocks['get_jwt_id'].return_value = {'_id': 'viewer', 'type': 'client'}
+        self.patches.append(get_jwt_id_patch)
+
+        mongo_patch = patch('users.api.services.changes.get_mongo_adapter')
+        self.mocks['mongo'] = mongo_patch.start()
+        self.mocks['mongo'].return_value.get_changes.return_value = ('shops', ['deleted_id'])
+        self.patches.append(mongo_patch)
+
+        parser_factory_patch = patch('users.api.services.changes.FACTORY')
+        self.mocks['parser_factory'] = parser_factory_patch.start()
+        self.patches.append(parser_factory_patch)
+
+        stream_patch = patch('users.api.services.changes.stream_json_object')
+        self.mocks['stream'] = stream_patch.start()
+        self.patches.append(stream_patch)
+
+        utc_now_patch = patch('users.api.services.changes.utc_now', return_value=NOW)
+        utc_now_patch.start()
+        self.patches.append(utc_now_patch)
+
+        for name, value in (('SHOPS_COLLECTION', 'test_shops'),
+                            ('SYNC_TOMBSTONES_TTL_DAYS', 30),
+                            ('SYNC_OVERLAP_SECONDS', 120)):
+            setting_patch = patch(f'users.api.services.changes.{name}', new=value)
+            setting_patch.start()
+            self.patches.append(setting_patch)
+
+    def tearDown(self):
+        for patch_ in self.patches:
+            patch_.stop()
+
+    @staticmethod
+    def _get_mock_self(**fields):
+        mock_self = MagicMock()
+        mock_self.parser_factory.get_parser.return_value = MagicMock(fields=fields)
+        mock_self._split_fields.side_effect = ChangesService._split_fields
+        return mock_self
+
+    def test_init_sets_factory(self):
+        # Setup
+        mock_self = MagicMock()
+
+        # Act
+        ChangesService.__init__(mock_self)
+
+        # Assert
+        self.assertEqual(mock_self.parser_factory, self.mocks['parser_factory'])
+
+    def test_get_streams_changes_with_next_sync_time(self):
+        # Setup
+        since = NOW - timedelta(days=1)
+        mock_self = self._get_mock_self(updated_since=since, fields='name, pics')
+
+        # Act
+        response = ChangesService.get(mock_self)
+
+        # Assert
+        mock_self.parser_factory.get_parser.assert_called_with('shop_changes')
+        self.mocks['mongo'].return_value.get_changes.assert_called_with(
+            'test_shops', since, ['name', 'pics'], 'viewer'
+        )
+        self.mocks['stream'].assert_called_with(
+            {'synced_at': NOW - timedelta(seconds=120), 'deleted': ['deleted_id']},
+            'shops', 'shops'
+        )
+        self.assertEqual(response, self.mocks['stream'].return_value)
+
+    def test_get_offset_time_read_as_naive_utc(self):
+        # Setup
+        since = datetime(2026, 10, 18, 8, 0, tzinfo=timezone(timedelta(hours=-3)))
+        mock_self = self._get_mock_self(updated_since=since)
+
+        # Act
+        ChangesService.get(mock_self)
+
+        # Assert
+        self.mocks['mongo'].return_value.get_changes.assert_called_with(
+            'test_shops', datetime(2026, 10, 18, 11, 0), None, 'viewer'
+        )
+
+    def test_get_recent_since_is_next_sync_time(self):
+        # Setup
+        since = NOW - timedelta(seconds=30)
+        mock_self = self._get_mock_self(updated_since=since)
+
+        # Act
+        ChangesService.get(mock_self)
+
+        # Assert
+        self.assertEqual(self.mocks['stream'].call_args[0][0]['synced_at'], since)
+
+    def test_get_older_than_tombstones_abort_410(self):
+        # Setup
+        mock_self = self._get_mock_self(updated_since=NOW - timedelta(days=31))
+
+        # Act & Assert
+        with self.assertRaises(HTTPException):
+            ChangesService.get(mock_self)
+        self.assertEqual(self.mocks['abort'].call_args[0][0], 410)
+        self.mocks['mongo'].return_value.get_changes.assert_not_called()
+
+    def test_get_invalid_field_abort_400(self):
+        # Setup
+        mock_self = self._get_mock_self(updated_since=NOW, fields='password')
+        self.mocks['mongo'].return_value.get_changes.side_effect = ValueError('Invalid fields')
+
+        # Act & Assert
+        with self.assertRaises(HTTPException):
+            ChangesService.get(mock_self)
+        self.mocks['abort'].assert_called_with(400, extra='Invalid fields')
@@ -1,12 +1,13 @@
 import unittest
 from unittest.mock import MagicMock, patch, call
 
+from bson.objectid import ObjectId
 from werkzeug.exceptions import HTTPException
 
 from users.api.services.data_input import DataInputService
 
 
-# pylint: disable=protected-access
+# pylint: disable=protected-access, too-many-public-methods
 class DataInputServiceTestCase(unittest.TestCase):
     def setUp(self):
         self.mocks = {}
@@ -58,6 +59,18 @@ class DataInputServiceTestCase(unittest.TestCase):
         self.mocks['cos'] = cos_patch.start()
         self.patches.append(cos_patch)
 
+        hasher_patch = patch('users.api.services.data_input.get_password_hasher')
+        self.mocks['hasher'] = hasher_patch.start()
+        self.patches.append(hasher_patch)
+
+        cache_patch = patch('users.api.services.data_input.get_listing_cache')
+        self.mocks['cache'] = cache_patch.start()
+        self.patches.append(cache_patch)
+
+        name_index_patch = patch('users.api.services.data_input.get_name_index')
+        self.mocks['name_index'] = name_index_patch.start()
+        self.patches.append(name_index_patch)
+
     def tearDown(self):
         for patch_ in self.patches:
             patch_.stop()
@@ -68,7 +81,8 @@ class DataInputServiceTestCase(unittest.TestCase):
             _validate_email='method1',
             _validate_pics='method4',
             _validate_cpf='method5',
-            _validate_cnpj='method6'
+            _validate_cnpj='method6',
+            _validate_location='method7'
         )
 
         # Act
@@ -93,13 +107,14 @@ class DataInputServiceTestCase(unittest.TestCase):
                 'cpf': 'method5',
                 'cnpj': 'method6',
                 'profile_pic': 'method4',
-                'banner_pic': 'method4'
+                'banner_pic': 'method4',
+                'location': 'method7'
             }
         )
 
     def test_register_returns_new_user(self):
         # Setup
-        new_user = {'new': 'user', 'right': 'here'}
+        new_user = {'new': 'user', 'right': 'here', 'password': 'plain'}
         mock_self = MagicMock(types={'test_type': 'test_col'})
         mock_self.parser_factory.get_parser.return_value = \
             MagicMock(fields=new_user)
@@ -110,17 +125,29 @@ class DataInputServiceTestCase(unittest.TestCase):
 
         # Assert
         mock_self._validate_fields.assert_called_with(new_user)
-        mock_self._create_array_fields.assert_called_with(
-            new_user, 'test_type'
-        )
+        self.mocks['hasher'].return_value.hash.assert_called_with('plain')
+        self.assertEqual(new_user['password'], self.mocks['hasher'].return_value.hash.return_value)
         self.mocks['mongo'].return_value.create.assert_called_with(
             'test_col', new_user
         )
         self.mocks['jsonify'].assert_called()
 
+    def test_register_hashing_runtime_error_abort_503(self):
+        # Setup
+        mock_self = MagicMock(types={'test_type': 'test_col'})
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields={'password': 'plain'})
+        self.mocks['hasher'].return_value.hash.side_effect = RuntimeError('busy')
+
+        # Act
+        DataInputService.register(mock_self, 'test_type')
+
+        # Assert
+        self.mocks['abort'].assert_called_with(503, extra='busy')
+
     def test_register_keyerror_abort(self):
         # Setup
-        new_user = {'new': 'user', 'right': 'here'}
+        new_user = {'new': 'user', 'right': 'here', 'password': 'plain'}
         mock_self = MagicMock(types={'test_type': 'test_col'})
         mock_self.parser_factory.get_parser.return_value = \
             MagicMock(fields=new_user)
@@ -133,11 +160,102 @@ class DataInputServiceTestCase(unittest.TestCase):
 
         # Assert
         mock_self._validate_fields.assert_called_with(new_user)
-        mock_self._create_array_fields.assert_called_with(
-            new_user, 'test_type'
-        )
         self.mocks['abort'].assert_called()
 
+    def test_register_batch_returns_result_per_record(self):
+        # Setup
+        mock_self = MagicMock(
+            types={'shop': 'test_col'},
+            _get_error_message=DataInputService._get_error_message
+        )
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields={'users': ['bad', 'good']})
+        bad_record = HTTPException()
+        bad_record.data = {'extra': 'Invalid CNPJ'}
+        mock_self._parse_batch_record.side_effect = [bad_record, {'password': 'plain'}]
+        mock_self._create_batch.return_value = [
+            {'status': 'created', 'user': {'_id': 'new_id', 'name': 'Pet Feliz'}}
+        ]
+
+        # Act
+        DataInputService.register_batch(mock_self, 'shop')
+
+        # Assert
+        mock_self._create_batch.assert_called_with('test_col', [{'password': 'plain'}])
+        self.mocks['jsonify'].assert_called_with([
+            {'index': 0, 'status': 'invalid', 'error': 'Invalid CNPJ'},
+            {'index': 1, 'status': 'created', 'user': {'_id': 'new_id', 'name': 'Pet Feliz'}}
+        ])
+        self.mocks['cache'].return_value.clear.assert_called_once()
+        self.mocks['name_index'].return_value.add.assert_called_once_with('new_id', 'Pet Feliz')
+
+    def test_create_batch_hashes_passwords_and_inserts(self):
+        # Setup
+        docs = [{'password': 'plain'}]
+        self.mocks['hasher'].return_value.hash_many.return_value = ['hash']
+
+        # Act
+        created = DataInputService._create_batch('test_col', docs)
+
+        # Assert
+        self.mocks['mongo'].return_value.create_many.assert_called_with(
+            'test_col', [{'password': 'hash'}]
+        )
+        self.assertEqual(created, self.mocks['mongo'].return_value.create_many.return_value)
+
+    @patch('users.api.services.data_input.BATCH_MAX_SIZE', new=1)
+    def test_register_batch_too_big_abort_400(self):
+        # Setup
+        mock_self = MagicMock(types={'client': 'test_col'})
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields={'users': [{}, {}]})
+        self.mocks['abort'].side_effect = HTTPException
+
+        # Act & Assert
+        with self.assertRaises(HTTPException):
+            DataInputService.register_batch(mock_self, 'client')
+        self.mocks['abort'].assert_called_with(400, extra='At most 1 users per batch')
+
+    def test_register_batch_runtime_error_abort_503(self):
+        # Setup
+        mock_self = MagicMock(types={'client': 'test_col'})
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields={'users': []})
+        mock_self._create_batch.side_effect = RuntimeError('busy')
+        self.mocks['abort'].side_effect = HTTPException
+
+        # Act & Assert
+        with self.assertRaises(HTTPException):
+            DataInputService.register_batch(mock_self, 'client')
+        self.mocks['abort'].assert_called_with(503, extra='busy')
+
+    def test_parse_batch_record_parses_and_validates(self):
+        # Setup
+        mock_self = MagicMock()
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields={'username': 'user'})
+
+        # Act
+        doc = DataInputService._parse_batch_record(mock_self, {'username': 'user'}, 'client')
+
+        # Assert
+        source = mock_self.parser_factory.get_parser.call_args[0][1]
+        self.assertEqual(source.json, {'username': 'user'})
+        mock_self._validate_fields.assert_called_with(doc)
+        self.assertEqual(doc['type'], 'client')
+
+    def test_get_error_message_uses_extra_message_or_description(self):
+        # Setup
+        extra, message, plain = HTTPException(), HTTPException(), HTTPException('desc')
+        extra.data = {'extra': 'Invalid CPF'}
+        message.data = {'message': {'cpf': 'Missing required parameter'}}
+
+        # Act & Assert
+        self.assertEqual(DataInputService._get_error_message(extra), 'Invalid CPF')
+        self.assertEqual(DataInputService._get_error_message(message),
+                         {'cpf': 'Missing required parameter'})
+        self.assertEqual(DataInputService._get_error_message(plain), 'desc')
+
     def test_update_succesful_returns_updated_user(self):
         # Setup
         mock_self = MagicMock(types={'sftd': 'test_col'})
@@ -158,6 +276,51 @@ class DataInputServiceTestCase(unittest.TestCase):
         )
         self.assertEqual(updated, self.mocks['jsonify'].return_value)
 
+    def test_register_shop_invalidates_listing_cache(self):
+        # Setup
+        new_user = {'_id': ObjectId('5f5b8d4e1c9d440000a1b2c3'), 'name': 'Pet Feliz',
+                    'password': 'plain'}
+        mock_self = MagicMock(types={'shop': 'test_col'})
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields=new_user)
+
+        # Act
+        DataInputService.register(mock_self, 'shop')
+
+        # Assert
+        self.mocks['cache'].return_value.invalidate_new_user.assert_called_with(
+            '5f5b8d4e1c9d440000a1b2c3'
+        )
+        self.mocks['name_index'].return_value.add.assert_called_with(
+            '5f5b8d4e1c9d440000a1b2c3', 'Pet Feliz'
+        )
+
+    def test_register_client_keeps_listing_cache(self):
+        # Setup
+        mock_self = MagicMock(types={'client': 'test_col'})
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields={'_id': 'new_id', 'password': 'plain'})
+
+        # Act
+        DataInputService.register(mock_self, 'client')
+
+        # Assert
+        self.mocks['cache'].return_value.invalidate_new_user.assert_not_called()
+        self.mocks['name_index'].return_value.add.assert_not_called()
+
+    def test_update_shop_invalidates_listing_cache(self):
+        # Setup
+        mock_self = MagicMock(types={'shop': 'test_col'})
+        self.mocks['get_jwt_id'].return_value = {'_id': 'mano'}
+
+        # Act
+        DataInputService.update(mock_self, 'shop')
+
+        # Assert
+        self.mocks['cache'].return_value.invalidate_user.assert_called_with('mano')
+        updated = self.mocks['mongo'].return_value.update.return_value
+        self.mocks['name_index'].return_value.add.assert_called_with('mano', updated.get('name'))
+
     def test_update_key_error_abort_404(self):
         # Setup
         mock_self = MagicMock(types={'sftd': 'test_col'})
@@ -255,27 +418,36 @@ class DataInputServiceTestCase(unittest.TestCase):
                 400, extra='Invalid CNPJ'
             )
 
-    def test_create_array_fields_type_client_create_pets_array(self):
+    def test_validate_location_point_kept(self):
         # Setup
-        doc = {}
-        type_ = 'client'
+        doc = {'location': {'type': 'Point', 'coordinates': [-46.6, -23.5], 'extra': 1}}
 
         # Act
-        DataInputService._create_array_fields(doc, type_)
+        DataInputService._validate_location(doc)
 
         # Assert
-        self.assertEqual(doc, {'pets': []})
+        self.mocks['abort'].assert_not_called()
+        self.assertEqual(doc['location'], {'type': 'Point', 'coordinates': [-46.6, -23.5]})
 
-    def test_create_array_fields_type_shop_create_services_array(self):
+    def test_validate_location_invalid_abort_400(self):
         # Setup
-        doc = {}
-        type_ = 'shop'
+        self.mocks['abort'].side_effect = HTTPException
+        invalid = (
+            {'type': 'Polygon', 'coordinates': [0, 0]},
+            {'type': 'Point', 'coordinates': [0]},
+            {'type': 'Point', 'coordinates': ['0', '0']},
+            {'type': 'Point', 'coordinates': [True, False]},
+            {'type': 'Point', 'coordinates': [0, 91]}
+        )
 
-        # Act
-        DataInputService._create_array_fields(doc, type_)
+        for location in invalid:
+            # Act & Assert
+            with self.assertRaises(HTTPException):
+                DataInputService._validate_location({'location': location})
+            self.mocks['abort'].assert_called_with(
+                400, extra='Invalid location, expected a GeoJSON Point [lng, lat]'
+            )
 
-        # Assert
-        self.assertEqual(doc, {'services': []})
     def test_validate_email_good_no_action(self):
         # Setup
         doc = {'email': 'holly@la.ca'}
@@ -1,5 +1,5 @@
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch, call
 
 from users.api.services.get_all import GetAllService
 
@@ -18,31 +18,235 @@ class GetAllServiceTestCase(unittest.TestCase):
         self.mocks['mongo'] = mongo_patch.start()
         self.patches.append(mongo_patch)
 
+        parser_factory_patch = patch('users.api.services.get_all.FACTORY')
+        self.mocks['parser_factory'] = parser_factory_patch.start()
+        self.patches.append(parser_factory_patch)
+
+        stream_patch = patch('users.api.services.get_all.stream_json_list')
+        self.mocks['stream'] = stream_patch.start()
+        self.patches.append(stream_patch)
+
         shops_col_patch = patch('users.api.services.get_all.SHOPS_COLLECTION',
                                 new='test_shops_col')
         self.mocks['shops_col'] = shops_col_patch.start()
         self.patches.append(shops_col_patch)
 
+        get_jwt_id_patch = patch('users.api.services.get_all.get_jwt_identity')
+        self.mocks['get_jwt_id'] = get_jwt_id_patch.start()
+        self.mocks['get_jwt_id'].return_value = {'_id': 'shop_id', 'type': 'shop'}
+        self.patches.append(get_jwt_id_patch)
+
+        encode_list_patch = patch('users.api.services.get_all.encode_json_list')
+        self.mocks['encode_list'] = encode_list_patch.start()
+        self.patches.append(encode_list_patch)
+
+        json_response_patch = patch('users.api.services.get_all.json_response')
+        self.mocks['json_response'] = json_response_patch.start()
+        self.patches.append(json_response_patch)
+
+        get_id_patch = patch('users.api.services.get_all.get_document_id')
+        self.mocks['get_id'] = get_id_patch.start()
+        self.patches.append(get_id_patch)
+
+        cache_patch = patch('users.api.services.get_all.get_listing_cache')
+        self.mocks['cache'] = cache_patch.start()
+        self.patches.append(cache_patch)
+
+        make_etag_patch = patch('users.api.services.get_all.make_etag')
+        self.mocks['make_etag'] = make_etag_patch.start()
+        self.patches.append(make_etag_patch)
+
+        not_modified_patch = patch('users.api.services.get_all.get_not_modified')
+        self.mocks['not_modified'] = not_modified_patch.start()
+        self.mocks['not_modified'].return_value = None
+        self.patches.append(not_modified_patch)
+
+        set_etag_patch = patch('users.api.services.get_all.set_etag')
+        self.mocks['set_etag'] = set_etag_patch.start()
+        self.patches.append(set_etag_patch)
+
     def tearDown(self):
         for patch_ in self.patches:
             patch_.stop()
 
-    def test_get_returns_mongo_return(self):
+    def test_init_sets_factory(self):
+        # Setup
+        mock_self = MagicMock()
+
+        # Act
+        GetAllService.__init__(mock_self)
+
+        # Assert
+        self.assertEqual(mock_self.parser_factory, self.mocks['parser_factory'])
+
+    def test_get_page_encodes_and_caches_raw_mongo_return(self):
+        # Setup
+        mock_self = MagicMock()
+        self.mocks['cache'].return_value.get_page.return_value = None
+        self.mocks['mongo'].return_value.get_users.return_value = iter(['shop_a', 'shop_b'])
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields={'limit': 10, 'after': 'last_id'})
+
+        # Act
+        response = GetAllService.get(mock_self)
+
+        # Assert
+        mock_self.parser_factory.get_parser.assert_called_with('shop_listing')
+        self.mocks['mongo'].return_value.get_users.assert_called_with(
+            'test_shops_col', 10, 'last_id', mock_self._split_fields.return_value,
+            filters={}, causal_key='shop_id', raw=True, primary=True
+        )
+        self.mocks['mongo'].return_value.get_version.assert_called_with(
+            'test_shops_col', causal_key='shop_id', primary=True
+        )
+        self.mocks['make_etag'].assert_called_with(
+            'test_shops_col', self.mocks['mongo'].return_value.get_version.return_value,
+            10, 'last_id', mock_self._split_fields.return_value, []
+        )
+        etag = self.mocks['make_etag'].return_value
+        self.mocks['encode_list'].assert_called_with(['shop_a', 'shop_b'])
+        self.mocks['cache'].return_value.set_page.assert_called_with(
+            10, 'last_id', mock_self._split_fields.return_value,
+            ([self.mocks['get_id'].return_value] * 2, self.mocks['encode_list'].return_value,
+             etag)
+        )
+        self.mocks['get_id'].assert_has_calls([call('shop_a'), call('shop_b')])
+        self.mocks['json_response'].assert_called_with(self.mocks['encode_list'].return_value)
+        self.mocks['set_etag'].assert_called_with(self.mocks['json_response'].return_value, etag)
+        self.assertEqual(response, self.mocks['set_etag'].return_value)
+
+    def test_get_matching_etag_returns_not_modified_without_reading_shops(self):
+        # Setup
+        mock_self = MagicMock()
+        mock_self.parser_factory.get_parser.return_value = MagicMock(fields={'limit': 10})
+        self.mocks['cache'].return_value.get_page.return_value = None
+        self.mocks['not_modified'].return_value = 'not_modified'
+
+        # Act
+        response = GetAllService.get(mock_self)
+
+        # Assert
+        self.mocks['not_modified'].assert_called_with(self.mocks['make_etag'].return_value)
+        self.mocks['mongo'].return_value.get_users.assert_not_called()
+        self.mocks['encode_list'].assert_not_called()
+        self.assertEqual(response, 'not_modified')
+
+    def test_get_filtered_page_streamed_not_cached(self):
+        # Setup
+        mock_self = MagicMock()
+        mock_self.parser_factory.get_parser.return_value = MagicMock(fields={
+            'limit': 10, 'species': 'cat', 'max_price': 80.0, 'min_price': None
+        })
+
+        # Act
+        response = GetAllService.get(mock_self)
+
+        # Assert
+        filters = {'species': 'cat', 'max_price': 80.0}
+        self.mocks['cache'].return_value.get_page.assert_not_called()
+        self.mocks['cache'].return_value.set_page.assert_not_called()
+        self.mocks['mongo'].return_value.get_users.assert_called_with(
+            'test_shops_col', 10, None, mock_self._split_fields.return_value,
+            filters=filters, causal_key='shop_id', raw=True, primary=False
+        )
+        self.mocks['make_etag'].assert_called_with(
+            'test_shops_col', self.mocks['mongo'].return_value.get_version.return_value,
+            10, None, mock_self._split_fields.return_value, sorted(filters.items())
+        )
+        self.mocks['stream'].assert_called_with(
+            self.mocks['mongo'].return_value.get_users.return_value
+        )
+        self.assertEqual(response, self.mocks['set_etag'].return_value)
+
+    def test_get_cached_page_skips_mongo(self):
+        # Setup
+        mock_self = MagicMock()
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields={'limit': 10})
+        self.mocks['cache'].return_value.get_page.return_value = \
+            (['a1'], b'[{"_id":"a1"}]\n', 'tag')
+
         # Act
-        response = GetAllService.get()
+        response = GetAllService.get(mock_self)
 
         # Assert
-        self.assertEqual(
-            response,
+        self.mocks['mongo'].return_value.get_version.assert_not_called()
+        self.mocks['mongo'].return_value.get_users.assert_not_called()
+        self.mocks['encode_list'].assert_not_called()
+        self.mocks['json_response'].assert_called_with(b'[{"_id":"a1"}]\n')
+        self.mocks['set_etag'].assert_called_with(self.mocks['json_response'].return_value, 'tag')
+        self.assertEqual(response, self.mocks['set_etag'].return_value)
+
+    def test_get_cached_page_matching_etag_returns_not_modified(self):
+        # Setup
+        mock_self = MagicMock()
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields={'limit': 10})
+        self.mocks['cache'].return_value.get_page.return_value = \
+            (['a1'], b'[{"_id":"a1"}]\n', 'tag')
+        self.mocks['not_modified'].return_value = 'not_modified'
+
+        # Act
+        response = GetAllService.get(mock_self)
+
+        # Assert
+        self.mocks['not_modified'].assert_called_with('tag')
+        self.mocks['json_response'].assert_not_called()
+        self.assertEqual(response, 'not_modified')
+
+    def test_get_without_limit_streamed_not_cached(self):
+        # Setup
+        mock_self = MagicMock()
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields={'limit': 0})
+
+        # Act
+        response = GetAllService.get(mock_self)
+
+        # Assert
+        self.mocks['cache'].return_value.get_page.assert_not_called()
+        self.mocks['cache'].return_value.set_page.assert_not_called()
+        self.mocks['stream'].assert_called_with(
             self.mocks['mongo'].return_value.get_users.return_value
         )
+        self.mocks['set_etag'].assert_called_with(self.mocks['stream'].return_value,
+                                                  self.mocks['make_etag'].return_value)
+        self.assertEqual(response, self.mocks['set_etag'].return_value)
 
     def test_get_keyerro_aborts_404(self):
         # Setup
+        mock_self = MagicMock()
+        self.mocks['cache'].return_value.get_page.return_value = None
         self.mocks['mongo'].return_value.get_users.side_effect = KeyError
 
         # Act
-        GetAllService.get()
+        GetAllService.get(mock_self)
 
         # Assert
         self.mocks['abort'].assert_called()
+
+    def test_get_value_error_aborts_400(self):
+        # Setup
+        mock_self = MagicMock()
+        self.mocks['cache'].return_value.get_page.return_value = None
+        self.mocks['mongo'].return_value.get_users.side_effect = ValueError('bad id')
+
+        # Act
+        GetAllService.get(mock_self)
+
+        # Assert
+        self.mocks['abort'].assert_called_with(400, extra='bad id')
+
+    def test_split_fields_returns_trimmed_list(self):
+        # Act
+        fields = GetAllService._split_fields('name, address,,pics.profile')
+
+        # Assert
+        self.assertEqual(fields, ['name', 'address', 'pics.profile'])
+
+    def test_split_fields_empty_returns_none(self):
+        # Act
+        fields = GetAllService._split_fields(None)
+
+        # Assert
+        self.assertIsNone(fields)
@@ -0,0 +1,257 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from werkzeug.exceptions import HTTPException
+
+from users.api.services.items import ItemsService
+
+
+class ItemsServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.mocks = {}
+        self.patches = []
+
+        abort_patch = patch('users.api.services.items.abort')
+        self.mocks['abort'] = abort_patch.start()
+        self.patches.append(abort_patch)
+
+        get_jwt_id_patch = patch('users.api.services.items.get_jwt_identity')
+        self.mocks['get_jwt_id'] = get_jwt_id_patch.start()
+        self.patches.append(get_jwt_id_patch)
+
+        mongo_patch = patch('users.api.services.items.get_mongo_adapter')
+        self.mocks['mongo'] = mongo_patch.start()
+        self.patches.append(mongo_patch)
+
+        cache_patch = patch('users.api.services.items.get_listing_cache')
+        self.mocks['cache'] = cache_patch.start()
+        self.patches.append(cache_patch)
+
+        parser_factory_patch = patch('users.api.services.items.FACTORY')
+        self.mocks['parser_factory'] = parser_factory_patch.start()
+        self.patches.append(parser_factory_patch)
+
+        jsonify_patch = patch('users.api.services.items.jsonify')
+        self.mocks['jsonify'] = jsonify_patch.start()
+        self.patches.append(jsonify_patch)
+
+        stream_patch = patch('users.api.services.items.stream_json_list')
+        self.mocks['stream'] = stream_patch.start()
+        self.patches.append(stream_patch)
+
+        shops_col_patch = patch('users.api.services.items.SHOPS_COLLECTION',
+                                new='test_shops_col')
+        self.mocks['shops_col'] = shops_col_patch.start()
+        self.patches.append(shops_col_patch)
+
+        clients_col_patch = patch('users.api.services.items.CLIENTS_COLLECTION',
+                                  new='test_clients_col')
+        self.mocks['clients_col'] = clients_col_patch.start()
+        self.patches.append(clients_col_patch)
+
+        make_etag_patch = patch('users.api.services.items.make_etag')
+        self.mocks['make_etag'] = make_etag_patch.start()
+        self.patches.append(make_etag_patch)
+
+        not_modified_patch = patch('users.api.services.items.get_not_modified')
+        self.mocks['not_modified'] = not_modified_patch.start()
+        self.mocks['not_modified'].return_value = None
+        self.patches.append(not_modified_patch)
+
+        set_etag_patch = patch('users.api.services.items.set_etag')
+        self.mocks['set_etag'] = set_etag_patch.start()
+        self.patches.append(set_etag_patch)
+
+    def tearDown(self):
+        for patch_ in self.patches:
+            patch_.stop()
+
+    def test_init_sets_factory_and_collections(self):
+        # Setup
+        mock_self = MagicMock()
+
+        # Act
+        ItemsService.__init__(mock_self)
+
+        # Assert
+        self.assertEqual(mock_self.parser_factory, self.mocks['parser_factory'])
+        self.assertEqual(
+            mock_self.collections,
+            {'client': 'test_clients_col', 'shop': 'test_shops_col'}
+        )
+        self.assertEqual(
+            mock_self.parser_type,
+            {'client': 'pet_patch', 'shop': 'service_patch'}
+        )
+
+    def test_get_shop_id_lists_that_shops_services(self):
+        # Setup
+        mock_self = MagicMock(collections={'shop': 'test_col'})
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields={'limit': 10, 'after': 'last_id', 'shop_id': 'other_shop'})
+        self.mocks['get_jwt_id'].return_value = {'_id': 'client_id', 'type': 'client'}
+
+        # Act
+        response = ItemsService.get(mock_self, 'shop')
+
+        # Assert
+        mock_self.parser_factory.get_parser.assert_called_with('item_listing')
+        self.mocks['mongo'].return_value.get_items.assert_called_with(
+            'test_col', 'other_shop', 10, 'last_id', 'client_id'
+        )
+        self.mocks['mongo'].return_value.get_version.assert_called_with(
+            'test_col', 'other_shop', 'client_id'
+        )
+        self.mocks['make_etag'].assert_called_with(
+            'test_col', 'other_shop', self.mocks['mongo'].return_value.get_version.return_value,
+            10, 'last_id'
+        )
+        self.mocks['stream'].assert_called_with(
+            self.mocks['mongo'].return_value.get_items.return_value
+        )
+        self.mocks['set_etag'].assert_called_with(self.mocks['stream'].return_value,
+                                                  self.mocks['make_etag'].return_value)
+        self.assertEqual(response, self.mocks['set_etag'].return_value)
+
+    def test_get_matching_etag_returns_not_modified_without_reading_items(self):
+        # Setup
+        mock_self = MagicMock(collections={'client': 'test_col'})
+        mock_self.parser_factory.get_parser.return_value = MagicMock(fields={'limit': 0})
+        self.mocks['get_jwt_id'].return_value = {'_id': 'client_id', 'type': 'client'}
+        self.mocks['not_modified'].return_value = 'not_modified'
+
+        # Act
+        response = ItemsService.get(mock_self, 'client')
+
+        # Assert
+        self.mocks['not_modified'].assert_called_with(self.mocks['make_etag'].return_value)
+        self.mocks['mongo'].return_value.get_items.assert_not_called()
+        self.assertEqual(response, 'not_modified')
+
+    def test_get_without_shop_id_lists_own_items(self):
+        # Setup
+        mock_self = MagicMock(collections={'client': 'test_col'})
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields={'limit': 0, 'shop_id': 'ignored'})
+        self.mocks['get_jwt_id'].return_value = {'_id': 'client_id', 'type': 'client'}
+
+        # Act
+        ItemsService.get(mock_self, 'client')
+
+        # Assert
+        self.mocks['mongo'].return_value.get_items.assert_called_with(
+            'test_col', 'client_id', 0, None, 'client_id'
+        )
+
+    def test_get_other_user_type_abort_403(self):
+        # Setup
+        mock_self = MagicMock(collections={'client': 'test_col'})
+        mock_self.parser_factory.get_parser.return_value = MagicMock(fields={'limit': 0})
+        self.mocks['get_jwt_id'].return_value = {'_id': 'shop_id', 'type': 'shop'}
+        self.mocks['abort'].side_effect = HTTPException
+
+        # Act & Assert
+        with self.assertRaises(HTTPException):
+            ItemsService.get(mock_self, 'client')
+        self.mocks['abort'].assert_called_with(403, extra='Only a client has these items')
+        self.mocks['mongo'].return_value.get_items.assert_not_called()
+
+    def test_get_value_error_abort_400(self):
+        # Setup
+        mock_self = MagicMock(collections={'shop': 'test_col'})
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields={'limit': 0, 'shop_id': 'bad'})
+        self.mocks['mongo'].return_value.get_items.side_effect = ValueError('Invalid id')
+
+        # Act
+        ItemsService.get(mock_self, 'shop')
+
+        # Assert
+        self.mocks['abort'].assert_called_with(400, extra='Invalid id')
+        self.mocks['stream'].assert_not_called()
+
+    def test_patch_updates_item_returns_it(self):
+        # Setup
+        mock_self = MagicMock(collections={'shop': 'test_col'},
+                              parser_type={'shop': 'service_patch'})
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields={'item_id': 'item', 'price': '10'})
+        self.mocks['get_jwt_id'].return_value = {'_id': 'shop_id', 'type': 'shop'}
+
+        # Act
+        response = ItemsService.patch(mock_self, 'shop')
+
+        # Assert
+        mock_self.parser_factory.get_parser.assert_called_with('service_patch')
+        self.mocks['mongo'].return_value.update_item.assert_called_with(
+            'test_col', 'shop_id', 'item', {'price': '10'}
+        )
+        self.mocks['jsonify'].assert_called_with(
+            self.mocks['mongo'].return_value.update_item.return_value
+        )
+        self.assertEqual(response, self.mocks['jsonify'].return_value)
+        self.mocks['cache'].return_value.invalidate_user.assert_called_with('shop_id')
+
+    def test_patch_pet_leaves_listing_cache(self):
+        # Setup
+        mock_self = MagicMock(collections={'client': 'test_col'},
+                              parser_type={'client': 'pet_patch'})
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields={'item_id': 'item', 'name': 'Rex'})
+        self.mocks['get_jwt_id'].return_value = {'_id': 'client_id', 'type': 'client'}
+
+        # Act
+        ItemsService.patch(mock_self, 'client')
+
+        # Assert
+        self.mocks['cache'].assert_not_called()
+
+    def test_patch_no_changes_abort_400(self):
+        # Setup
+        mock_self = MagicMock(collections={'shop': 'test_col'},
+                              parser_type={'shop': 'service_patch'})
+        mock_self.parser_factory.get_parser.return_value = MagicMock(fields={'item_id': 'item'})
+        self.mocks['abort'].side_effect = HTTPException
+
+        # Act & Assert
+        with self.assertRaises(HTTPException):
+            ItemsService.patch(mock_self, 'shop')
+        self.mocks['abort'].assert_called_with(
+            400, extra='At least one field is required for updates!'
+        )
+
+    def test_patch_other_user_type_abort_403(self):
+        # Setup
+        mock_self = MagicMock(collections={'client': 'test_col'},
+                              parser_type={'client': 'pet_patch'})
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields={'item_id': 'item', 'name': 'Rex'})
+        self.mocks['get_jwt_id'].return_value = {'_id': 'shop_id', 'type': 'shop'}
+        self.mocks['abort'].side_effect = HTTPException
+
+        # Act & Assert
+        with self.assertRaises(HTTPException):
+            ItemsService.patch(mock_self, 'client')
+        self.mocks['abort'].assert_called_with(403, extra='Only a client has these items')
+
+    def test_patch_errors_abort(self):
+        # Setup
+        mock_self = MagicMock(collections={'client': 'test_col'},
+                              parser_type={'client': 'pet_patch'})
+        self.mocks['get_jwt_id'].return_value = {'_id': 'client_id', 'type': 'client'}
+        update_item = self.mocks['mongo'].return_value.update_item
+        cases = ((KeyError('No object found with set id'), 404,
+                  "'No object found with set id'"),
+                 (ValueError('Invalid id'), 400, 'Invalid id'),
+                 (RuntimeError('down'), 500, 'Error when updating, down'))
+
+        for error, code, extra in cases:
+            mock_self.parser_factory.get_parser.return_value = \
+                MagicMock(fields={'item_id': 'item', 'name': 'Rex'})
+            update_item.side_effect = error
+
+            # Act
+            ItemsService.patch(mock_self, 'client')
+
+            # Assert
+            self.mocks['abort'].assert_called_with(code, extra=extra)
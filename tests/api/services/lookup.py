@@ -0,0 +1,186 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from werkzeug.exceptions import HTTPException
+
+from users.api.services.lookup import LookupService, CLIENT_FIELDS_FOR_SHOPS
+
+
+# pylint: disable=protected-access
+class LookupServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.mocks = {}
+        self.patches = []
+
+        abort_patch = patch('users.api.services.lookup.abort')
+        self.mocks['abort'] = abort_patch.start()
+        self.mocks['abort'].side_effect = HTTPException
+        self.patches.append(abort_patch)
+
+        get_jwt_id_patch = patch('users.api.services.lookup.get_jwt_identity')
+        self.mocks['get_jwt_id'] = get_jwt_id_patch.start()
+        self.mocks['get_jwt_id'].return_value = {'_id': 'shop_id', 'type': 'shop'}
+        self.patches.append(get_jwt_id_patch)
+
+        mongo_patch = patch('users.api.services.lookup.get_mongo_adapter')
+        self.mocks['mongo'] = mongo_patch.start()
+        self.mocks['mongo'].return_value.get_users_by_ids.return_value = ([], [])
+        self.patches.append(mongo_patch)
+
+        parser_factory_patch = patch('users.api.services.lookup.FACTORY')
+        self.mocks['parser_factory'] = parser_factory_patch.start()
+        self.patches.append(parser_factory_patch)
+
+        jsonify_patch = patch('users.api.services.lookup.jsonify')
+        self.mocks['jsonify'] = jsonify_patch.start()
+        self.patches.append(jsonify_patch)
+
+        max_ids_patch = patch('users.api.services.lookup.LOOKUP_MAX_IDS', new=3)
+        max_ids_patch.start()
+        self.patches.append(max_ids_patch)
+
+    def tearDown(self):
+        for patch_ in self.patches:
+            patch_.stop()
+
+    @staticmethod
+    def _get_mock_self(**fields):
+        mock_self = MagicMock(collections={'client': 'test_clients', 'shop': 'test_shops'})
+        mock_self.parser_factory.get_parser.return_value = MagicMock(fields=fields)
+        mock_self._split.side_effect = LookupService._split
+        mock_self._get_client_fields_for_shops.side_effect = \
+            LookupService._get_client_fields_for_shops
+        return mock_self
+
+    def test_init_sets_factory_and_collections(self):
+        # Setup
+        mock_self = MagicMock()
+
+        # Act
+        with patch('users.api.services.lookup.CLIENTS_COLLECTION', new='test_clients'), \
+                patch('users.api.services.lookup.SHOPS_COLLECTION', new='test_shops'):
+            LookupService.__init__(mock_self)
+
+        # Assert
+        self.assertEqual(mock_self.parser_factory, self.mocks['parser_factory'])
+        self.assertEqual(mock_self.collections,
+                         {'client': 'test_clients', 'shop': 'test_shops'})
+
+    def test_get_batch_returns_users_in_order_and_missing_ids(self):
+        # Setup
+        mock_self = self._get_mock_self(ids='b, a,b', fields='name')
+        self.mocks['mongo'].return_value.get_users_by_ids.return_value = (['shop_b'], ['a'])
+
+        # Act
+        response = LookupService.get(mock_self, 'shop')
+
+        # Assert
+        mock_self.parser_factory.get_parser.assert_called_with('user_lookup')
+        self.mocks['mongo'].return_value.get_users_by_ids.assert_called_with(
+            'test_shops', ['b', 'a'], ['name'], 'shop_id'
+        )
+        self.mocks['jsonify'].assert_called_with({'users': ['shop_b'], 'missing': ['a']})
+        self.assertEqual(response, self.mocks['jsonify'].return_value)
+
+    def test_get_single_returns_user(self):
+        # Setup
+        mock_self = self._get_mock_self()
+        self.mocks['mongo'].return_value.get_users_by_ids.return_value = (['shop_a'], [])
+
+        # Act
+        response = LookupService.get(mock_self, 'shop', 'a')
+
+        # Assert
+        self.mocks['mongo'].return_value.get_users_by_ids.assert_called_with(
+            'test_shops', ['a'], None, 'shop_id'
+        )
+        self.mocks['jsonify'].assert_called_with('shop_a')
+        self.assertEqual(response, self.mocks['jsonify'].return_value)
+
+    def test_get_single_missing_aborts_404(self):
+        # Setup
+        mock_self = self._get_mock_self()
+        self.mocks['mongo'].return_value.get_users_by_ids.return_value = ([], ['a'])
+
+        # Act & Assert
+        with self.assertRaises(HTTPException):
+            LookupService.get(mock_self, 'shop', 'a')
+        self.mocks['abort'].assert_called_with(404, extra='No shop with id a')
+
+    def test_get_without_ids_aborts_400(self):
+        # Setup
+        mock_self = self._get_mock_self(ids=' , ')
+
+        # Act & Assert
+        with self.assertRaises(HTTPException):
+            LookupService.get(mock_self, 'shop')
+        self.mocks['abort'].assert_called_with(400, extra='At least one id is required')
+
+    def test_get_too_many_ids_aborts_400(self):
+        # Setup
+        mock_self = self._get_mock_self(ids='a,b,c,d')
+
+        # Act & Assert
+        with self.assertRaises(HTTPException):
+            LookupService.get(mock_self, 'shop')
+        self.mocks['abort'].assert_called_with(400, extra='At most 3 ids per lookup')
+        self.mocks['mongo'].return_value.get_users_by_ids.assert_not_called()
+
+    def test_get_client_looking_up_other_clients_aborts_403(self):
+        # Setup
+        mock_self = self._get_mock_self(ids='client_id,other')
+        self.mocks['get_jwt_id'].return_value = {'_id': 'client_id', 'type': 'client'}
+
+        # Act & Assert
+        with self.assertRaises(HTTPException):
+            LookupService.get(mock_self, 'client')
+        self.mocks['abort'].assert_called_with(403, extra='Clients may only look themselves up')
+        self.mocks['mongo'].return_value.get_users_by_ids.assert_not_called()
+
+    def test_get_client_looking_up_itself(self):
+        # Setup
+        mock_self = self._get_mock_self()
+        self.mocks['get_jwt_id'].return_value = {'_id': 'client_id', 'type': 'client'}
+        self.mocks['mongo'].return_value.get_users_by_ids.return_value = (['client'], [])
+
+        # Act
+        LookupService.get(mock_self, 'client', 'client_id')
+
+        # Assert
+        self.mocks['mongo'].return_value.get_users_by_ids.assert_called_with(
+            'test_clients', ['client_id'], None, 'client_id'
+        )
+
+    def test_get_shop_looking_up_clients_reads_public_fields(self):
+        # Setup
+        mock_self = self._get_mock_self(ids='client_id')
+
+        # Act
+        LookupService.get(mock_self, 'client')
+
+        # Assert
+        self.mocks['mongo'].return_value.get_users_by_ids.assert_called_with(
+            'test_clients', ['client_id'], CLIENT_FIELDS_FOR_SHOPS, 'shop_id'
+        )
+
+    def test_get_shop_requesting_clients_private_fields_aborts_403(self):
+        # Setup
+        mock_self = self._get_mock_self(ids='client_id', fields='name,cpf,email')
+
+        # Act & Assert
+        with self.assertRaises(HTTPException):
+            LookupService.get(mock_self, 'client')
+        self.mocks['abort'].assert_called_with(
+            403, extra="Shops may not read the clients' cpf, email"
+        )
+        self.mocks['mongo'].return_value.get_users_by_ids.assert_not_called()
+
+    def test_get_value_error_aborts_400(self):
+        # Setup
+        mock_self = self._get_mock_self(ids='nope')
+        self.mocks['mongo'].return_value.get_users_by_ids.side_effect = ValueError('Invalid id')
+
+        # Act & Assert
+        with self.assertRaises(HTTPException):
+            LookupService.get(mock_self, 'shop')
+        self.mocks['abort'].assert_called_with(400, extra='Invalid id')
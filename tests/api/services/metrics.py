@@ -0,0 +1,19 @@
+import unittest
+from unittest.mock import patch
+
+from users.api.services.metrics import MetricsService
+
+
+class MetricsServiceTestCase(unittest.TestCase):
+
+    @patch('users.api.services.metrics.get_listing_cache')
+    @patch('users.api.services.metrics.get_mongo_adapter')
+    def test_get_returns_pool_and_cache_stats(self, mongo_mock, cache_mock):
+        # Act
+        metrics = MetricsService.get()
+
+        # Assert
+        self.assertEqual(metrics, {
+            'mongo_pool': mongo_mock.return_value.pool_metrics.stats.return_value,
+            'shops_cache': cache_mock.return_value.stats.return_value
+        })
@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from werkzeug.exceptions import HTTPException
+
+from users.api.services.nearby import NearbyService
+
+
+class NearbyServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.mocks = {}
+        self.patches = []
+
+        abort_patch = patch('users.api.services.nearby.abort')
+        self.mocks['abort'] = abort_patch.start()
+        self.patches.append(abort_patch)
+
+        mongo_patch = patch('users.api.services.nearby.get_mongo_adapter')
+        self.mocks['mongo'] = mongo_patch.start()
+        self.patches.append(mongo_patch)
+
+        parser_factory_patch = patch('users.api.services.nearby.FACTORY')
+        self.mocks['parser_factory'] = parser_factory_patch.start()
+        self.patches.append(parser_factory_patch)
+
+        stream_patch = patch('users.api.services.nearby.stream_json_list')
+        self.mocks['stream'] = stream_patch.start()
+        self.patches.append(stream_patch)
+
+    def tearDown(self):
+        for patch_ in self.patches:
+            patch_.stop()
+
+    def test_init_sets_factory(self):
+        # Setup
+        mock_self = MagicMock()
+
+        # Act
+        NearbyService.__init__(mock_self)
+
+        # Assert
+        self.assertEqual(mock_self.parser_factory, self.mocks['parser_factory'])
+
+    def test_get_returns_streamed_nearby_shops(self):
+        # Setup
+        mock_self = MagicMock()
+        mock_self.parser_factory.get_parser.return_value = MagicMock(fields={
+            'lat': -23.5, 'lng': -46.6, 'radius': 1000, 'limit': 10, 'skip': 20
+        })
+
+        # Act
+        response = NearbyService.get(mock_self)
+
+        # Assert
+        mock_self.parser_factory.get_parser.assert_called_with('shop_nearby')
+        self.mocks['mongo'].return_value.get_nearby_shops.assert_called_with(
+            -46.6, -23.5, 1000, 10, 20
+        )
+        self.mocks['stream'].assert_called_with(
+            self.mocks['mongo'].return_value.get_nearby_shops.return_value
+        )
+        self.assertEqual(response, self.mocks['stream'].return_value)
+
+    def test_get_invalid_args_abort_400(self):
+        # Setup
+        mock_self = MagicMock()
+        self.mocks['abort'].side_effect = HTTPException
+        cases = (({'lat': 91, 'lng': 0, 'radius': 1}, 'Invalid coordinates'),
+                 ({'lat': 0, 'lng': -181, 'radius': 1}, 'Invalid coordinates'),
+                 ({'lat': 0, 'lng': 0, 'radius': 0}, 'Radius must be positive'))
+
+        for fields, extra in cases:
+            mock_self.parser_factory.get_parser.return_value = MagicMock(fields=fields)
+
+            # Act & Assert
+            with self.assertRaises(HTTPException):
+                NearbyService.get(mock_self)
+            self.mocks['abort'].assert_called_with(400, extra=extra)
+        self.mocks['mongo'].return_value.get_nearby_shops.assert_not_called()
+
+    def test_get_runtime_error_abort_500(self):
+        # Setup
+        mock_self = MagicMock()
+        mock_self.parser_factory.get_parser.return_value = MagicMock(fields={
+            'lat': 0, 'lng': 0, 'radius': 1, 'limit': 0, 'skip': 0
+        })
+        self.mocks['mongo'].return_value.get_nearby_shops.side_effect = RuntimeError('down')
+
+        # Act
+        NearbyService.get(mock_self)
+
+        # Assert
+        self.mocks['abort'].assert_called_with(500, extra='Error when searching, down')
@@ -26,6 +26,10 @@ class RemovalServiceTestCase(unittest.TestCase):
         self.mocks['mongo'] = mongo_patch.start()
         self.patches.append(mongo_patch)
 
+        cache_patch = patch('users.api.services.removal.get_listing_cache')
+        self.mocks['cache'] = cache_patch.start()
+        self.patches.append(cache_patch)
+
         parser_factory_patch = patch('users.api.services.removal.FACTORY')
         self.mocks['parser_factory'] = parser_factory_patch.start()
         self.patches.append(parser_factory_patch)
@@ -65,7 +69,7 @@ class RemovalServiceTestCase(unittest.TestCase):
             {'client': 'pet_removal', 'shop': 'service_removal'}
         )
 
-    def test_remove_succesful_returns_updated_user(self):
+    def test_remove_succesful_returns_removed_item(self):
         # Setup
         mock_self = MagicMock(collections={'type': 'test_type'})
         type_ = 'type'
@@ -79,17 +83,28 @@ class RemovalServiceTestCase(unittest.TestCase):
         )
         self.assertEqual(updated, self.mocks['jsonify'].return_value)
 
+    def test_remove_service_invalidates_shops_listing_pages(self):
+        # Setup
+        mock_self = MagicMock(collections={'shop': 'test_shops_col'})
+        self.mocks['get_jwt_id'].return_value = {'_id': 'shop_id', 'type': 'shop'}
+
+        # Act
+        RemovalService.remove(mock_self, 'shop')
+
+        # Assert
+        self.mocks['cache'].return_value.invalidate_user.assert_called_with('shop_id')
+
     def test_remove_key_error_abort_404(self):
         # Setup
         mock_self = MagicMock(collections={'type': 'test_type'})
         type_ = 'type'
-        self.mocks['mongo'].return_value.remove.side_effect = KeyError
+        self.mocks['mongo'].return_value.remove.side_effect = KeyError('No object found')
 
         # Act
         RemovalService.remove(mock_self, type_)
 
         # Assert
-        self.mocks['abort'].assert_called_with(404)
+        self.mocks['abort'].assert_called_with(404, extra="'No object found'")
         self.mocks['jsonify'].assert_not_called()
 
     def test_remove_runtime_error_abort_500(self):
@@ -104,3 +119,14 @@ class RemovalServiceTestCase(unittest.TestCase):
         # Assert
         self.mocks['abort'].assert_called_with(500, extra='Error when updating, ;(')
         self.mocks['jsonify'].assert_not_called()
+
+    def test_remove_value_error_abort_400(self):
+        # Setup
+        mock_self = MagicMock(collections={'type': 'test_type'})
+        self.mocks['mongo'].return_value.remove.side_effect = ValueError('Invalid id')
+
+        # Act
+        RemovalService.remove(mock_self, 'type')
+
+        # Assert
+        self.mocks['abort'].assert_called_with(400, extra='Invalid id')
@@ -0,0 +1,86 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from werkzeug.exceptions import HTTPException
+
+from users.api.services.search import SearchService
+
+
+class SearchServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.mocks = {}
+        self.patches = []
+
+        abort_patch = patch('users.api.services.search.abort')
+        self.mocks['abort'] = abort_patch.start()
+        self.patches.append(abort_patch)
+
+        mongo_patch = patch('users.api.services.search.get_mongo_adapter')
+        self.mocks['mongo'] = mongo_patch.start()
+        self.patches.append(mongo_patch)
+
+        parser_factory_patch = patch('users.api.services.search.FACTORY')
+        self.mocks['parser_factory'] = parser_factory_patch.start()
+        self.patches.append(parser_factory_patch)
+
+        stream_patch = patch('users.api.services.search.stream_json_list')
+        self.mocks['stream'] = stream_patch.start()
+        self.patches.append(stream_patch)
+
+    def tearDown(self):
+        for patch_ in self.patches:
+            patch_.stop()
+
+    def test_init_sets_factory(self):
+        # Setup
+        mock_self = MagicMock()
+
+        # Act
+        SearchService.__init__(mock_self)
+
+        # Assert
+        self.assertEqual(mock_self.parser_factory, self.mocks['parser_factory'])
+
+    def test_get_returns_streamed_search_results(self):
+        # Setup
+        mock_self = MagicMock()
+        mock_self.parser_factory.get_parser.return_value = MagicMock(fields={
+            'q': ' banho e tosa ', 'limit': 10, 'skip': 20
+        })
+
+        # Act
+        response = SearchService.get(mock_self)
+
+        # Assert
+        mock_self.parser_factory.get_parser.assert_called_with('shop_search')
+        self.mocks['mongo'].return_value.search_shops.assert_called_with('banho e tosa', 10, 20)
+        self.mocks['stream'].assert_called_with(
+            self.mocks['mongo'].return_value.search_shops.return_value
+        )
+        self.assertEqual(response, self.mocks['stream'].return_value)
+
+    def test_get_blank_text_abort_400(self):
+        # Setup
+        mock_self = MagicMock()
+        mock_self.parser_factory.get_parser.return_value = MagicMock(fields={'q': '  '})
+        self.mocks['abort'].side_effect = HTTPException
+
+        # Act & Assert
+        with self.assertRaises(HTTPException):
+            SearchService.get(mock_self)
+        self.mocks['abort'].assert_called_with(400, extra='The search text is required')
+        self.mocks['mongo'].return_value.search_shops.assert_not_called()
+
+    def test_get_runtime_error_abort_500(self):
+        # Setup
+        mock_self = MagicMock()
+        mock_self.parser_factory.get_parser.return_value = MagicMock(fields={
+            'q': 'banho', 'limit': 0, 'skip': 0
+        })
+        self.mocks['mongo'].return_value.search_shops.side_effect = RuntimeError('no index')
+
+        # Act
+        SearchService.get(mock_self)
+
+        # Assert
+        self.mocks['abort'].assert_called_with(500, extra='Error when searching, no index')
@@ -0,0 +1,46 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from users.api.services.suggest import SuggestService
+
+
+class SuggestServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.mocks = {}
+        self.patches = []
+
+        parser_factory_patch = patch('users.api.services.suggest.FACTORY')
+        self.mocks['parser_factory'] = parser_factory_patch.start()
+        self.patches.append(parser_factory_patch)
+
+        name_index_patch = patch('users.api.services.suggest.get_name_index')
+        self.mocks['name_index'] = name_index_patch.start()
+        self.patches.append(name_index_patch)
+
+    def tearDown(self):
+        for patch_ in self.patches:
+            patch_.stop()
+
+    def test_init_sets_factory(self):
+        # Setup
+        mock_self = MagicMock()
+
+        # Act
+        SuggestService.__init__(mock_self)
+
+        # Assert
+        self.assertEqual(mock_self.parser_factory, self.mocks['parser_factory'])
+
+    def test_get_returns_index_suggestions(self):
+        # Setup
+        mock_self = MagicMock()
+        mock_self.parser_factory.get_parser.return_value = \
+            MagicMock(fields={'prefix': 'pet', 'limit': 5})
+
+        # Act
+        suggestions = SuggestService.get(mock_self)
+
+        # Assert
+        mock_self.parser_factory.get_parser.assert_called_with('shop_suggest')
+        self.mocks['name_index'].return_value.suggest.assert_called_with('pet', 5)
+        self.assertEqual(suggestions, self.mocks['name_index'].return_value.suggest.return_value)
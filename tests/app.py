@@ -0,0 +1,46 @@
+import importlib
+import unittest
+from unittest.mock import patch
+
+import users.app
+
+
+class AppTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.patches = []
+        settings = {
+            'SERVER_THREADS': 12,
+            'SERVER_MAX_THREADS': 24,
+            'SERVER_REQUEST_QUEUE_SIZE': 256,
+            'SERVER_ACCEPTED_QUEUE_SIZE': 32,
+            'SERVER_TIMEOUT': 7
+        }
+        for name, value in settings.items():
+            setting_patch = patch(f'users.utils.env_vars.{name}', new=value)
+            setting_patch.start()
+            self.patches.append(setting_patch)
+
+        server_patch = patch('cheroot.wsgi.Server')
+        self.server_mock = server_patch.start()
+        self.patches.append(server_patch)
+
+    def tearDown(self):
+        for patch_ in self.patches:
+            patch_.stop()
+        importlib.reload(users.app)
+
+    def test_server_built_from_env_vars(self):
+        # Act
+        app = importlib.reload(users.app)
+
+        # Assert
+        self.server_mock.assert_called_once_with(
+            ('0.0.0.0', app.PORT),
+            app.DISPATCHER,
+            numthreads=12,
+            max=24,
+            request_queue_size=256,
+            accepted_queue_size=32,
+            timeout=7
+        )
@@ -0,0 +1,45 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+import bson
+
+from users.tools.bench_listing import main, generate_shops, measure, read_dicts, read_raw
+
+
+class BenchListingToolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.batch = b''.join(bson.encode(shop) for shop in generate_shops(3))
+
+    def test_read_paths_encode_the_same_json(self):
+        # Act
+        _, dicts = read_dicts(self.batch)
+        _, raws = read_raw(self.batch)
+
+        # Assert
+        self.assertEqual(dicts, raws)
+        self.assertEqual(len(dicts), 3)
+
+    def test_measure_reports_time_and_memory(self):
+        # Act
+        result = measure(read_raw, self.batch, 1)
+
+        # Assert
+        self.assertEqual(set(result), {'ms', 'peak_kib', 'held_kib'})
+        self.assertGreaterEqual(result['peak_kib'], result['held_kib'])
+
+    @patch('users.tools.bench_listing.bsonjs', new=None)
+    def test_main_prints_each_path(self):
+        # Setup
+        output = io.StringIO()
+
+        # Act
+        with redirect_stdout(output):
+            code = main(['--shops', '5', '--rounds', '1'])
+
+        # Assert
+        self.assertEqual(code, 0)
+        lines = output.getvalue().splitlines()
+        self.assertEqual([line.split()[0] for line in lines[2:]], ['dict', 'raw'])
@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from bson.objectid import ObjectId
+
+from users.tools.dump import dump_range, main, range_query, split_ranges
+from users.tools.ndjson import Checkpoint, decode, read_lines
+
+
+# pylint: disable=consider-using-with
+class DumpToolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.docs = [{'_id': ObjectId(), 'username': f'user{index}'} for index in range(5)]
+        self.collection = MagicMock()
+        self.collection.find.side_effect = lambda query, **_: iter([
+            doc for doc in self.docs if '$gt' not in query.get('_id', {})
+            or doc['_id'] > query['_id']['$gt']
+        ])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_split_ranges_single_worker_unbounded(self):
+        # Act & Assert
+        self.assertEqual(split_ranges(self.collection, 1), [{'lower': None, 'upper': None}])
+        self.collection.aggregate.assert_not_called()
+
+    def test_split_ranges_uses_bucket_bounds(self):
+        # Setup
+        self.collection.aggregate.return_value = iter([
+            {'_id': {'min': 1, 'max': 5}}, {'_id': {'min': 5, 'max': 9}}
+        ])
+
+        # Act
+        ranges = split_ranges(self.collection, 2)
+
+        # Assert
+        self.assertEqual(ranges, [{'lower': 1, 'upper': 5}, {'lower': 5, 'upper': None}])
+
+    def test_split_ranges_empty_collection_unbounded(self):
+        # Setup
+        self.collection.aggregate.return_value = iter([])
+
+        # Act & Assert
+        self.assertEqual(split_ranges(self.collection, 4), [{'lower': None, 'upper': None}])
+
+    def test_range_query_bounds(self):
+        # Act & Assert
+        self.assertEqual(range_query({'lower': None, 'upper': None}), {})
+        self.assertEqual(range_query({'lower': 1, 'upper': 5}), {'_id': {'$gte': 1, '$lt': 5}})
+        self.assertEqual(range_query({'lower': 1, 'upper': None}, after=3), {'_id': {'$gt': 3}})
+
+    def test_dump_range_writes_batches_and_checkpoints(self):
+        # Setup
+        path = os.path.join(self.directory.name, 'clients.ndjson.gz')
+        checkpoint = Checkpoint(None)
+
+        # Act
+        count = dump_range(self.collection, {'lower': None, 'upper': None}, path, 2,
+                           checkpoint)
+
+        # Assert
+        self.assertEqual(count, 5)
+        self.assertEqual([decode(line) for line in read_lines(path)], self.docs)
+        self.assertEqual(checkpoint.get_part(path)['last_id'], self.docs[-1]['_id'])
+        self.assertTrue(checkpoint.get_part(path)['done'])
+
+    def test_dump_range_resumes_after_last_id(self):
+        # Setup
+        path = os.path.join(self.directory.name, 'clients.ndjson')
+        checkpoint = Checkpoint(None)
+        self.collection.find.side_effect = [iter(self.docs[:2]), iter(self.docs[2:])]
+        with patch('users.tools.dump.NdjsonWriter.write', side_effect=[None, OSError]):
+            with self.assertRaises(OSError):
+                dump_range(self.collection, {'lower': None, 'upper': None}, path, 1,
+                           checkpoint)
+
+        # Act
+        count = dump_range(self.collection, {'lower': None, 'upper': None}, path, 5,
+                           checkpoint)
+
+        # Assert
+        self.assertEqual(self.collection.find.call_args[0][0],
+                         {'_id': {'$gt': self.docs[0]['_id']}})
+        self.assertEqual(count, 4)
+
+    def test_dump_range_done_skipped(self):
+        # Setup
+        checkpoint = Checkpoint(None)
+        checkpoint.set_part('unused', {'count': 5, 'done': True})
+
+        # Act
+        count = dump_range(self.collection, {}, 'unused', 2, checkpoint)
+
+        # Assert
+        self.assertEqual(count, 5)
+        self.collection.find.assert_not_called()
+
+    @patch('users.tools.dump.MongoAdapter')
+    def test_main_dumps_collection(self, mongo_mock):
+        # Setup
+        mongo_mock.return_value.db_.__getitem__.return_value = self.collection
+        path = os.path.join(self.directory.name, 'clients.ndjson')
+
+        # Act
+        code = main(['clients', path, '--batch-size', '2'])
+
+        # Assert
+        self.assertEqual(code, 0)
+        self.assertEqual(len(list(read_lines(path))), 5)
@@ -0,0 +1,46 @@
+import unittest
+from unittest.mock import patch
+
+from users.tools.indexes import main
+
+
+class IndexesToolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.patches = []
+        self.mocks = {}
+
+        manager_patch = patch('users.tools.indexes.IndexManager')
+        self.mocks['manager'] = manager_patch.start()
+        self.patches.append(manager_patch)
+
+        mongo_patch = patch('users.tools.indexes.MongoAdapter')
+        self.mocks['mongo'] = mongo_patch.start()
+        self.patches.append(mongo_patch)
+
+    def tearDown(self):
+        for patch_ in self.patches:
+            patch_.stop()
+
+    def test_main_syncs_indexes(self):
+        # Act
+        code = main(['--drop'])
+
+        # Assert
+        self.mocks['manager'].assert_called_with(self.mocks['mongo'].return_value.db_)
+        self.mocks['manager'].return_value.sync.assert_called_with(drop=True)
+        self.assertEqual(code, 0)
+
+    def test_main_check_with_drift_returns_1(self):
+        # Setup
+        self.mocks['manager'].return_value.diff.return_value = {
+            'col': {'missing': ['username_unique']}
+        }
+        self.mocks['manager'].return_value.has_drift.return_value = True
+
+        # Act
+        code = main(['--check'])
+
+        # Assert
+        self.mocks['manager'].return_value.sync.assert_not_called()
+        self.assertEqual(code, 1)
@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from bson.objectid import ObjectId
+
+from users.tools.dump import main as dump_main
+from users.tools.load import BulkWriteError, load_file, main
+from users.tools.ndjson import COLLECTIONS, Checkpoint, NdjsonWriter, encode
+
+
+# pylint: disable=consider-using-with, protected-access
+class LoadToolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'shops.ndjson.gz')
+        self.docs = [{'_id': ObjectId(), 'username': f'shop{index}'} for index in range(5)]
+        with NdjsonWriter(self.path) as writer:
+            writer.write([encode(doc) for doc in self.docs])
+        self.collection = MagicMock()
+
+        utc_now_patch = patch('users.tools.load.utc_now', return_value='now')
+        utc_now_patch.start()
+        self.addCleanup(utc_now_patch.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_load_file_upserts_in_batches(self):
+        # Setup
+        checkpoint = Checkpoint(None)
+
+        # Act
+        result = load_file(self.collection, self.path, 2, checkpoint)
+
+        # Assert
+        self.assertEqual(result, (5, 0))
+        self.assertEqual(self.collection.bulk_write.call_count, 3)
+        operations = self.collection.bulk_write.call_args_list[0][0][0]
+        self.assertEqual(operations[0]._filter, {'_id': self.docs[0]['_id']})
+        self.assertEqual(checkpoint.get_part(self.path), {'lines': 5})
+
+    def test_load_file_resumes_after_checkpointed_lines(self):
+        # Setup
+        checkpoint = Checkpoint(None)
+        checkpoint.set_part(self.path, {'lines': 3})
+
+        # Act
+        result = load_file(self.collection, self.path, 2, checkpoint)
+
+        # Assert
+        self.assertEqual(result, (2, 0))
+        written = [operation._doc for call in self.collection.bulk_write.call_args_list
+                   for operation in call[0][0]]
+        self.assertEqual(written, [dict(doc, updated_at='now') for doc in self.docs[3:]])
+
+    def test_load_file_insert_counts_failures(self):
+        # Setup
+        self.collection.bulk_write.side_effect = BulkWriteError({'writeErrors': [
+            {'index': 0, 'code': 11000, 'errmsg': 'E11000 duplicate key'}
+        ]})
+
+        # Act
+        result = load_file(self.collection, self.path, 5, Checkpoint(None), upsert=False)
+
+        # Assert
+        self.assertEqual(result, (4, 1))
+        self.assertEqual(self.collection.bulk_write.call_args[0][0][0]._doc,
+                         dict(self.docs[0], updated_at='now'))
+
+    def test_load_file_stamps_dumped_users_updated_at(self):
+        # Setup
+        path = os.path.join(self.directory.name, 'dumped.ndjson')
+        with NdjsonWriter(path) as writer:
+            writer.write([encode(dict(self.docs[0], updated_at=datetime(2020, 1, 1)))])
+
+        # Act
+        load_file(self.collection, path, 10, Checkpoint(None))
+
+        # Assert
+        operation = self.collection.bulk_write.call_args[0][0][0]
+        self.assertEqual(operation._doc, dict(self.docs[0], updated_at='now'))
+
+    @patch('users.tools.load.MongoAdapter')
+    def test_main_loads_files(self, mongo_mock):
+        # Setup
+        mongo_mock.return_value.db_.__getitem__.return_value = self.collection
+
+        # Act
+        code = main(['shops', self.path, '--workers', '2'])
+
+        # Assert
+        self.assertEqual(code, 0)
+        self.collection.bulk_write.assert_called_once()
+        mongo_mock.return_value.bump_version.assert_called_once()
+
+    @patch.dict('users.tools.load.OWNER_COLLECTIONS',
+                {'test_services': 'test_shops', 'test_pets': 'test_clients'})
+    @patch.dict('users.tools.load.COLLECTIONS',
+                {'services': 'test_services', 'pets': 'test_pets'})
+    @patch('users.tools.dump.MongoAdapter')
+    @patch('users.tools.load.MongoAdapter')
+    def test_items_round_trip(self, load_mongo_mock, dump_mongo_mock):
+        for name, owner in (('services', 'test_shops'), ('pets', 'test_clients')):
+            with self.subTest(collection=name):
+                # Setup
+                owner_ids = [ObjectId(), ObjectId()]
+                docs = [{'_id': ObjectId(), 'owner_id': owner_ids[index % 2], 'name': str(index)}
+                        for index in range(3)]
+                source = MagicMock()
+                source.find.return_value = iter(docs)
+                dump_mongo_mock.return_value.db_.__getitem__.return_value = source
+                collections = {COLLECTIONS[name]: MagicMock(), owner: MagicMock()}
+                load_mongo_mock.return_value.db_.__getitem__.side_effect = collections.get
+                path = os.path.join(self.directory.name, f'{name}.ndjson.gz')
+
+                # Act
+                dump_code = dump_main([name, path])
+                load_code = main([name, path])
+
+                # Assert
+                self.assertEqual((dump_code, load_code), (0, 0))
+                operations = collections[COLLECTIONS[name]].bulk_write.call_args[0][0]
+                written = [operation._doc for operation in operations]
+                self.assertEqual(written, docs)
+                owners_query = collections[owner].update_many.call_args[0][0]
+                self.assertCountEqual(owners_query['_id']['$in'], owner_ids)
+                load_mongo_mock.return_value.bump_version.assert_called_with(owner)
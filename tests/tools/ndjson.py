@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+
+from bson.objectid import ObjectId
+
+from users.tools.ndjson import Checkpoint, NdjsonWriter, batched, decode, encode, \
+    part_path, read_lines
+
+
+# pylint: disable=consider-using-with
+class NdjsonTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_encode_decode_keeps_object_ids(self):
+        # Setup
+        doc = {'_id': ObjectId(), 'name': 'petx', 'weight_kilos': 5.5}
+
+        # Act & Assert
+        self.assertEqual(decode(encode(doc)), doc)
+
+    def test_batched_splits_in_lists(self):
+        # Act & Assert
+        self.assertEqual(list(batched(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+    def test_part_path_numbers_files_keeping_extensions(self):
+        # Act & Assert
+        self.assertEqual(part_path('out/shops.ndjson.gz', 2, 4),
+                         os.path.join('out', 'shops.002.ndjson.gz'))
+        self.assertEqual(part_path('shops.ndjson', 0, 1), 'shops.ndjson')
+
+    def test_writer_gzip_resume_truncates_to_offset(self):
+        # Setup
+        path = os.path.join(self.directory.name, 'shops.ndjson.gz')
+        with NdjsonWriter(path) as writer:
+            writer.write(['{"a": 1}'])
+            offset = writer.offset
+            writer.write(['{"lost": true}'])
+
+        # Act
+        with NdjsonWriter(path, offset) as writer:
+            writer.write(['{"a": 2}', '{"a": 3}'])
+
+        # Assert
+        self.assertEqual(list(read_lines(path)), ['{"a": 1}', '{"a": 2}', '{"a": 3}'])
+
+    def test_writer_plain_file(self):
+        # Setup
+        path = os.path.join(self.directory.name, 'shops.ndjson')
+
+        # Act
+        with NdjsonWriter(path) as writer:
+            writer.write(['{"a": 1}', '{"a": 2}'])
+
+        # Assert
+        self.assertEqual(list(read_lines(path)), ['{"a": 1}', '{"a": 2}'])
+
+    def test_checkpoint_saved_and_reloaded(self):
+        # Setup
+        path = os.path.join(self.directory.name, 'checkpoint.json')
+        last_id = ObjectId()
+        checkpoint = Checkpoint(path)
+        checkpoint.set('ranges', [{'lower': None, 'upper': None}])
+
+        # Act
+        checkpoint.set_part(0, {'last_id': last_id, 'offset': 10})
+        reloaded = Checkpoint(path)
+
+        # Assert
+        self.assertTrue(reloaded.resuming)
+        self.assertEqual(reloaded.get('ranges'), [{'lower': None, 'upper': None}])
+        self.assertEqual(reloaded.get_part(0), {'last_id': last_id, 'offset': 10})
+
+    def test_checkpoint_without_path_kept_in_memory(self):
+        # Setup
+        checkpoint = Checkpoint(None)
+
+        # Act
+        checkpoint.set_part('file', {'lines': 3})
+
+        # Assert
+        self.assertFalse(Checkpoint(None).resuming)
+        self.assertEqual(checkpoint.get_part('file'), {'lines': 3})
@@ -0,0 +1,159 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from users.tools.split_items import main, split_user, summarize_user, PyMongoError
+from users.utils.db.summaries import summarize_services
+
+
+# pylint: disable=protected-access
+class SplitItemsToolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.patches = []
+        self.mocks = {}
+
+        mongo_patch = patch('users.tools.split_items.MongoAdapter')
+        self.mocks['mongo'] = mongo_patch.start()
+        self.patches.append(mongo_patch)
+
+        collections_patch = patch.dict('users.tools.split_items.USER_COLLECTIONS',
+                                       {'shops': 'test_shops'})
+        collections_patch.start()
+        self.patches.append(collections_patch)
+
+        items_patch = patch.dict('users.tools.split_items.ITEM_COLLECTIONS',
+                                 {'test_shops': ('services', 'test_services')})
+        items_patch.start()
+        self.patches.append(items_patch)
+
+        summaries_patch = patch.dict('users.tools.split_items.ITEM_SUMMARIES',
+                                     {'test_shops': 'summarize'})
+        summaries_patch.start()
+        self.patches.append(summaries_patch)
+
+        split_patch = patch('users.tools.split_items.split_user')
+        self.mocks['split'] = split_patch.start()
+        self.patches.append(split_patch)
+
+        summarize_patch = patch('users.tools.split_items.summarize_user')
+        self.mocks['summarize'] = summarize_patch.start()
+        self.patches.append(summarize_patch)
+
+    def tearDown(self):
+        for patch_ in self.patches:
+            patch_.stop()
+
+    def test_main_splits_every_user_with_the_array(self):
+        # Setup
+        db_ = self.mocks['mongo'].return_value.db_
+        db_['test_shops'].find.return_value = [{'_id': 1}, {'_id': 2}]
+        self.mocks['split'].side_effect = [2, PyMongoError('down')]
+
+        # Act
+        code = main(['shops', '--batch-size', '10'])
+
+        # Assert
+        db_['test_shops'].find.assert_called_with(
+            {'services': {'$exists': True}}, projection={'services': True}, batch_size=10
+        )
+        self.mocks['split'].assert_called_with(
+            db_['test_shops'], db_['test_services'], 'services', {'_id': 2}, 'summarize'
+        )
+        self.mocks['summarize'].assert_not_called()
+        db_['test_services'].update_many.assert_not_called()
+        self.mocks['mongo'].return_value.bump_version.assert_called_with('test_shops')
+        self.assertEqual(code, 1)
+
+    def test_main_unsets_legacy_index_once_every_user_is_split(self):
+        # Setup
+        db_ = self.mocks['mongo'].return_value.db_
+        db_['test_shops'].find.return_value = [{'_id': 1}]
+        self.mocks['split'].return_value = 1
+
+        # Act
+        code = main(['shops'])
+
+        # Assert
+        db_['test_services'].update_many.assert_called_with(
+            {'legacy_index': {'$exists': True}}, {'$unset': {'legacy_index': ''}}
+        )
+        self.assertEqual(code, 0)
+
+    def test_main_summaries_resummarizes_every_user(self):
+        # Setup
+        db_ = self.mocks['mongo'].return_value.db_
+        db_['test_shops'].find.side_effect = [[], [{'_id': 1}, {'_id': 2}]]
+
+        # Act
+        code = main(['shops', '--summaries'])
+
+        # Assert
+        db_['test_shops'].find.assert_called_with({}, projection={'_id': True},
+                                                  batch_size=1000)
+        self.mocks['summarize'].assert_called_with(
+            db_['test_shops'], db_['test_services'], 2, 'summarize'
+        )
+        self.mocks['mongo'].return_value.bump_version.assert_called_with('test_shops')
+        self.assertEqual(code, 0)
+
+
+class SplitUserTestCase(unittest.TestCase):
+
+    def test_split_user_upserts_items_and_unsets_array(self):
+        # Setup
+        users, items = MagicMock(), MagicMock()
+        user = {'_id': 'owner', 'services': [{'service_id': 'bath'}]}
+
+        # Act
+        moved = split_user(users, items, 'services', user)
+
+        # Assert
+        request = items.bulk_write.call_args[0][0][0]
+        self.assertEqual(request._filter, {'owner_id': 'owner', 'legacy_index': 0})
+        self.assertEqual(request._doc,
+                         {'service_id': 'bath', 'owner_id': 'owner', 'legacy_index': 0})
+        users.update_one.assert_called_with({'_id': 'owner'}, {'$unset': {'services': ''}})
+        self.assertEqual(moved, 1)
+
+    def test_split_user_keeps_items_summary(self):
+        # Setup
+        users, items = MagicMock(), MagicMock()
+        services = [{'service_name': 'Tosa'}, {'service_name': 'Banho'}, {'service_name': 'Tosa'}]
+        items.find.return_value = [dict(service, _id=index)
+                                   for index, service in enumerate(services)]
+
+        # Act
+        split_user(users, items, 'services', {'_id': 'owner', 'services': services},
+                   summarize_services)
+
+        # Assert
+        items.find.assert_called_with({'owner_id': 'owner'})
+        summary = users.update_one.call_args[0][1]['$set']
+        self.assertEqual(summary['service_names'], ['banho', 'tosa'])
+        self.assertEqual([offer['item_id'] for offer in summary['offers']], [0, 1, 2])
+
+    def test_summarize_user_sets_summary_of_its_items(self):
+        # Setup
+        users, items = MagicMock(), MagicMock()
+        summarize = MagicMock(return_value={'service_names': ['Banho']})
+
+        # Act
+        summarize_user(users, items, 'owner', summarize)
+
+        # Assert
+        items.find.assert_called_with({'owner_id': 'owner'})
+        summarize.assert_called_with(items.find.return_value)
+        users.update_one.assert_called_with({'_id': 'owner'},
+                                            {'$set': {'service_names': ['Banho']}})
+
+    def test_split_user_empty_array_only_unsets(self):
+        # Setup
+        users, items = MagicMock(), MagicMock()
+
+        # Act
+        moved = split_user(users, items, 'pets', {'_id': 'owner', 'pets': []})
+
+        # Assert
+        items.bulk_write.assert_not_called()
+        users.update_one.assert_called_with({'_id': 'owner'}, {'$unset': {'pets': ''}})
+        self.assertEqual(moved, 0)
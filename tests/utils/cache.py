@@ -0,0 +1,156 @@
+import unittest
+from unittest.mock import patch
+
+from users.utils.cache import TTLCache, ListingCache, get_listing_cache
+
+
+class TTLCacheTestCase(unittest.TestCase):
+
+    def test_get_missing_counts_miss(self):
+        # Setup
+        cache = TTLCache(2, 30)
+
+        # Act
+        value = cache.get('nope')
+
+        # Assert
+        self.assertIsNone(value)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_get_stored_counts_hit(self):
+        # Setup
+        cache = TTLCache(2, 30)
+        cache.set('key', 'value')
+
+        # Act
+        value = cache.get('key')
+
+        # Assert
+        self.assertEqual(value, 'value')
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    @patch('users.utils.cache.time')
+    def test_get_expired_entry_misses(self, time_mock):
+        # Setup
+        cache = TTLCache(2, 30)
+        time_mock.monotonic.return_value = 100
+        cache.set('key', 'value')
+        time_mock.monotonic.return_value = 131
+
+        # Act
+        value = cache.get('key')
+
+        # Assert
+        self.assertIsNone(value)
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_set_full_evicts_least_recently_used(self):
+        # Setup
+        cache = TTLCache(2, 30)
+        cache.set('old', 1)
+        cache.set('recent', 2)
+        cache.get('old')
+
+        # Act
+        cache.set('new', 3)
+
+        # Assert
+        self.assertIsNone(cache.get('recent'))
+        self.assertEqual(cache.get('old'), 1)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_set_disabled_stores_nothing(self):
+        # Setup
+        cache = TTLCache(2, 0)
+
+        # Act
+        cache.set('key', 'value')
+
+        # Assert
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_clear_removes_everything(self):
+        # Setup
+        cache = TTLCache(2, 30)
+        cache.set('key', 'value')
+
+        # Act
+        cache.clear()
+
+        # Assert
+        self.assertEqual(cache.stats()['size'], 0)
+        self.assertEqual(cache.stats()['invalidations'], 1)
+
+
+class ListingCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ListingCache(10, 30)
+        self.cache.set_page(2, None, None,
+                            (['a1', 'a5'], b'[{"_id":"a1"},{"_id":"a5"}]\n', 'tag1'))
+        self.cache.set_page(2, 'a5', ['name'], (['a7'], b'[{"_id":"a7"}]\n', 'tag2'))
+
+    def test_set_page_without_limit_not_cached(self):
+        # Act
+        self.cache.set_page(0, None, None, (['a1'], b'[{"_id":"a1"}]\n', 'tag'))
+
+        # Assert
+        self.assertIsNone(self.cache.get_page(0, None, None))
+
+    def test_get_page_returns_ids_body_and_etag(self):
+        # Act
+        page = self.cache.get_page(2, 'a5', ['name'])
+
+        # Assert
+        self.assertEqual(page, (['a7'], b'[{"_id":"a7"}]\n', 'tag2'))
+
+    def test_invalidate_user_drops_only_pages_holding_it(self):
+        # Act
+        self.cache.invalidate_user('a7')
+
+        # Assert
+        self.assertIsNotNone(self.cache.get_page(2, None, None))
+        self.assertIsNone(self.cache.get_page(2, 'a5', ['name']))
+
+    def test_invalidate_new_user_drops_last_page(self):
+        # Act
+        self.cache.invalidate_new_user('a9')
+
+        # Assert
+        self.assertIsNotNone(self.cache.get_page(2, None, None))
+        self.assertIsNone(self.cache.get_page(2, 'a5', ['name']))
+
+    def test_invalidate_new_user_inside_full_page_range_drops_it(self):
+        # Act
+        self.cache.invalidate_new_user('a3')
+
+        # Assert
+        self.assertIsNone(self.cache.get_page(2, None, None))
+        self.assertIsNotNone(self.cache.get_page(2, 'a5', ['name']))
+
+
+class GetListingCacheTestCase(unittest.TestCase):
+
+    @staticmethod
+    @patch('users.utils.cache.ListingCache')
+    def test_get_listing_cache_first_call(cache_mock):
+        # Setup
+        get_listing_cache.cache = None
+
+        # Act
+        get_listing_cache()
+
+        # Assert
+        cache_mock.assert_called()
+
+    @staticmethod
+    @patch('users.utils.cache.ListingCache')
+    def test_get_listing_cache_subsequent_calls(cache_mock):
+        # Setup
+        get_listing_cache.cache = True
+
+        # Act
+        get_listing_cache()
+
+        # Assert
+        cache_mock.assert_not_called()
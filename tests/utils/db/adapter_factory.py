@@ -53,3 +53,42 @@ class AdapterFactoryTestCase(unittest.TestCase):
 
         # Assert
         cos_mock.assert_not_called()
+
+    @staticmethod
+    @patch('users.utils.db.adapter_factory.DB_BACKEND', new='memory')
+    @patch('users.utils.db.adapter_factory.MemoryAdapter')
+    @patch('users.utils.db.adapter_factory.MongoAdapter')
+    def test_get_mongo_adapter_memory_backend(mongo_mock, memory_mock):
+        # Setup
+        get_mongo_adapter.adapter = None
+
+        # Act
+        get_mongo_adapter()
+
+        # Assert
+        memory_mock.assert_called()
+        mongo_mock.assert_not_called()
+
+    @patch('users.utils.db.adapter_factory.DB_BACKEND', new='redis')
+    def test_get_mongo_adapter_invalid_backend_raises_value_error(self):
+        # Setup
+        get_mongo_adapter.adapter = None
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            get_mongo_adapter()
+
+    @staticmethod
+    @patch('users.utils.db.adapter_factory.FILES_BACKEND', new='memory')
+    @patch('users.utils.db.adapter_factory.MemoryStorageAdapter')
+    @patch('users.utils.db.adapter_factory.StorageAdapter')
+    def test_get_cos_adapter_memory_backend(cos_mock, memory_mock):
+        # Setup
+        get_cos_adapter.adapter = None
+
+        # Act
+        get_cos_adapter()
+
+        # Assert
+        memory_mock.assert_called()
+        cos_mock.assert_not_called()
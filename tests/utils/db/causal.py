@@ -0,0 +1,116 @@
+import unittest
+from unittest.mock import MagicMock
+
+from users.utils.db.causal import CausalTokens, get_read_preference, NO_STALENESS_LIMIT_TTL
+
+
+class GetReadPreferenceTestCase(unittest.TestCase):
+
+    def test_get_read_preference_secondary_with_staleness(self):
+        # Act
+        preference = get_read_preference('secondaryPreferred', 90)
+
+        # Assert
+        self.assertEqual(preference.mongos_mode, 'secondaryPreferred')
+        self.assertEqual(preference.max_staleness, 90)
+
+    def test_get_read_preference_primary_ignores_staleness(self):
+        # Act
+        preference = get_read_preference('primary', 90)
+
+        # Assert
+        self.assertEqual(preference.mongos_mode, 'primary')
+        self.assertEqual(preference.max_staleness, -1)
+
+    def test_get_read_preference_unknown_raises_value_error(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            get_read_preference('anywhere')
+
+
+class CausalTokensTestCase(unittest.TestCase):
+
+    def test_init_uses_max_staleness_as_ttl(self):
+        # Act
+        tokens = CausalTokens(MagicMock(), 10, 90)
+
+        # Assert
+        self.assertEqual(tokens.tokens.ttl, 90)
+
+    def test_init_without_max_staleness_uses_default_ttl(self):
+        # Act
+        tokens = CausalTokens(MagicMock(), 10)
+
+        # Assert
+        self.assertEqual(tokens.tokens.ttl, NO_STALENESS_LIMIT_TTL)
+
+    def test_start_session_without_key_returns_none(self):
+        # Setup
+        client = MagicMock()
+        tokens = CausalTokens(client, 10)
+
+        # Act
+        session = tokens.start_session(None)
+
+        # Assert
+        self.assertIsNone(session)
+        client.start_session.assert_not_called()
+
+    def test_start_session_unknown_key_starts_plain_causal_session(self):
+        # Setup
+        client = MagicMock()
+        tokens = CausalTokens(client, 10)
+
+        # Act
+        session = tokens.start_session('user')
+
+        # Assert
+        self.assertEqual(session, client.start_session.return_value)
+        client.start_session.assert_called_with(causal_consistency=True)
+        session.advance_cluster_time.assert_not_called()
+        session.advance_operation_time.assert_not_called()
+
+    def test_start_session_known_key_advances_session(self):
+        # Setup
+        client = MagicMock()
+        tokens = CausalTokens(client, 10)
+        tokens.tokens.set('user', ('cluster_time', 'operation_time'))
+
+        # Act
+        session = tokens.start_session('user')
+
+        # Assert
+        session.advance_cluster_time.assert_called_with('cluster_time')
+        session.advance_operation_time.assert_called_with('operation_time')
+
+    def test_end_session_keeps_times_for_every_key(self):
+        # Setup
+        tokens = CausalTokens(MagicMock(), 10)
+        session = MagicMock(cluster_time='cluster_time', operation_time='operation_time')
+
+        # Act
+        tokens.end_session(session, 'user', None, 'user_id')
+
+        # Assert
+        self.assertEqual(tokens.tokens.get('user'), ('cluster_time', 'operation_time'))
+        self.assertEqual(tokens.tokens.get('user_id'), ('cluster_time', 'operation_time'))
+        session.end_session.assert_called_once()
+
+    def test_end_session_without_operation_keeps_nothing(self):
+        # Setup
+        tokens = CausalTokens(MagicMock(), 10)
+        session = MagicMock(operation_time=None)
+
+        # Act
+        tokens.end_session(session, 'user')
+
+        # Assert
+        self.assertIsNone(tokens.tokens.get('user'))
+        session.end_session.assert_called_once()
+
+    def test_end_session_none_does_nothing(self):
+        # Setup
+        tokens = CausalTokens(MagicMock(), 10)
+
+        # Act & Assert
+        tokens.end_session(None, 'user')
@@ -0,0 +1,126 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from users.utils.db.change_watcher import ChangeWatcher, OperationFailure, PyMongoError, \
+    CHANGE_PROJECTION
+
+
+# pylint: disable=consider-using-with, protected-access
+class ChangeWatcherTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.db_ = MagicMock()
+        self.stream = self.db_.watch.return_value.__enter__.return_value
+        self.subscriber = MagicMock()
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+        retry_patch = patch('users.utils.db.change_watcher.CHANGE_STREAM_RETRY_SECONDS', new=0)
+        retry_patch.start()
+        self.addCleanup(retry_patch.stop)
+        self.token_path = os.path.join(self.temp_dir.name, 'token.json')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _get_watcher(self, token_path=''):
+        watcher = ChangeWatcher(self.db_, ['shops'], token_path)
+        watcher.subscribe(self.subscriber)
+        return watcher
+
+    def test_watch_publishes_changes_and_keeps_token(self):
+        # Setup
+        watcher = self._get_watcher(self.token_path)
+        change = {'_id': {'_data': 'token_1'}, 'operationType': 'update'}
+        self.stream.alive = True
+        self.stream.try_next.side_effect = [None, change, StopIteration]
+
+        # Act
+        with self.assertRaises(StopIteration):
+            watcher._watch()
+
+        # Assert
+        self.db_.watch.assert_called_with(
+            [{'$match': {'ns.coll': {'$in': ['shops']}}}, {'$project': CHANGE_PROJECTION}],
+            resume_after=None, max_await_time_ms=1000
+        )
+        self.subscriber.on_change.assert_called_once_with(change)
+        self.assertTrue(watcher.available)
+        self.assertEqual(self._get_watcher(self.token_path).resume_token, {'_data': 'token_1'})
+
+    def test_watch_resumes_after_saved_token(self):
+        # Setup
+        self._get_watcher(self.token_path)._set_token({'_data': 'saved'})
+        watcher = self._get_watcher(self.token_path)
+        self.stream.alive = False
+
+        # Act
+        watcher._watch()
+
+        # Assert
+        self.assertEqual(self.db_.watch.call_args[1]['resume_after'], {'_data': 'saved'})
+
+    def test_run_unsupported_deployment_stops(self):
+        # Setup
+        watcher = self._get_watcher()
+        self.db_.watch.side_effect = OperationFailure('not a replica set', code=40573)
+
+        # Act
+        watcher.run()
+
+        # Assert
+        self.assertFalse(watcher.available)
+        self.db_.watch.assert_called_once()
+
+    def test_run_history_lost_resets_and_restarts_without_token(self):
+        # Setup
+        watcher = self._get_watcher()
+        watcher.resume_token = {'_data': 'old'}
+        tokens = []
+
+        def watch(*_args, **kwargs):
+            tokens.append(kwargs['resume_after'])
+            if len(tokens) == 1:
+                raise OperationFailure('history lost', code=286)
+            watcher.stop()
+            return MagicMock()
+        self.db_.watch.side_effect = watch
+
+        # Act
+        watcher.run()
+
+        # Assert
+        self.assertEqual(tokens, [{'_data': 'old'}, None])
+        self.subscriber.on_reset.assert_called_once()
+
+    def test_run_transient_error_retries(self):
+        # Setup
+        watcher = self._get_watcher()
+        calls = []
+
+        def watch(*_args, **_kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                watcher.stop()
+            raise PyMongoError('network')
+        self.db_.watch.side_effect = watch
+
+        # Act
+        watcher.run()
+
+        # Assert
+        self.assertEqual(len(calls), 2)
+
+    def test_publish_failing_subscriber_does_not_stop_others(self):
+        # Setup
+        watcher = self._get_watcher()
+        self.subscriber.on_change.side_effect = ValueError
+        other = MagicMock()
+        watcher.subscribe(other)
+
+        # Act
+        watcher._publish('on_change', {'_id': 'token'})
+
+        # Assert
+        other.on_change.assert_called_with({'_id': 'token'})
@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import MagicMock
+
+from pymongo import ASCENDING, TEXT, IndexModel
+
+from users.utils.db.indexes import IndexManager, PyMongoError
+
+
+# pylint: disable=protected-access
+class IndexManagerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = {
+            'test_col': [
+                IndexModel([('username', ASCENDING)], name='username_unique', unique=True),
+                IndexModel([('services.service_id', ASCENDING)], name='services_service_id'),
+                IndexModel([('name', TEXT)], name='search')
+            ]
+        }
+        self.db_ = MagicMock()
+        self.db_['test_col'].index_information.return_value = {
+            '_id_': {'key': [('_id', 1)]},
+            'username_unique': {'key': [('username', 1)]},
+            'search': {'key': [('_fts', 'text'), ('_ftsx', 1)], 'weights': {'name': 1}},
+            'old_index': {'key': [('old', 1)]}
+        }
+
+    def test_diff_reports_missing_changed_and_extra(self):
+        # Setup
+        manager = IndexManager(self.db_, self.registry)
+
+        # Act
+        drift = manager.diff()
+
+        # Assert
+        self.assertEqual(drift, {
+            'test_col': {
+                'missing': ['services_service_id'],
+                'changed': ['username_unique'],
+                'extra': ['old_index']
+            }
+        })
+
+    def test_diff_error_raises_runtime_error(self):
+        # Setup
+        self.db_['test_col'].index_information.side_effect = PyMongoError
+        manager = IndexManager(self.db_, self.registry)
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            manager.diff()
+
+    def test_sync_creates_only_missing(self):
+        # Setup
+        manager = IndexManager(self.db_, self.registry)
+
+        # Act
+        manager.sync()
+
+        # Assert
+        self.db_['test_col'].drop_index.assert_not_called()
+        created = self.db_['test_col'].create_indexes.call_args[0][0]
+        self.assertEqual([model.document['name'] for model in created],
+                         ['services_service_id'])
+
+    def test_sync_drop_rebuilds_changed_and_drops_extra(self):
+        # Setup
+        manager = IndexManager(self.db_, self.registry)
+
+        # Act
+        manager.sync(drop=True)
+
+        # Assert
+        dropped = [args[0][0] for args in self.db_['test_col'].drop_index.call_args_list]
+        self.assertEqual(dropped, ['old_index', 'username_unique'])
+        created = self.db_['test_col'].create_indexes.call_args[0][0]
+        self.assertEqual([model.document['name'] for model in created],
+                         ['username_unique', 'services_service_id'])
+
+    def test_sync_error_raises_runtime_error(self):
+        # Setup
+        self.db_['test_col'].create_indexes.side_effect = PyMongoError
+        manager = IndexManager(self.db_, self.registry)
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            manager.sync()
+
+    def test_has_drift(self):
+        # Act & Assert
+        self.assertTrue(IndexManager.has_drift({'col': {'missing': ['a'], 'extra': []}}))
+        self.assertFalse(IndexManager.has_drift({'col': {'missing': [], 'extra': []}}))
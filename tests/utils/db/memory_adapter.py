@@ -0,0 +1,501 @@
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+from bson.raw_bson import RawBSONDocument
+
+from users.utils.db.memory_adapter import MemoryAdapter
+from users.utils.db.mongo_adapter import MongoAdapter
+from users.utils.db.summaries import summarize_services
+
+
+# pylint: disable=protected-access, too-many-public-methods
+class MemoryAdapterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.patches = []
+
+        for name, value in (
+                ('ITEM_COLLECTIONS', {'clients': ('pets', 'pets'),
+                                      'shops': ('services', 'services')}),
+                ('ITEM_SUMMARIES', {'shops': summarize_services}),
+                ('SHOPS_COLLECTION', 'shops')):
+            setting_patch = patch(f'users.utils.db.memory_adapter.{name}', new=value)
+            setting_patch.start()
+            self.patches.append(setting_patch)
+
+        fields_patch = patch('users.utils.db.mongo_adapter.PROJECTABLE_FIELDS',
+                             new={'shops': ['username', 'name', 'pics', 'pics.profile']})
+        fields_patch.start()
+        self.patches.append(fields_patch)
+
+        self.adapter = MemoryAdapter()
+
+    def tearDown(self):
+        for patch_ in self.patches:
+            patch_.stop()
+
+    def _create(self, collection, username, **fields):
+        doc = dict(fields, username=username, password='hash')
+        self.adapter.create(collection, doc)
+        return doc
+
+    def test_overrides_every_public_mongo_adapter_method(self):
+        # Setup
+        public = [name for name in vars(MongoAdapter)
+                  if not name.startswith('_') and callable(getattr(MongoAdapter, name))]
+
+        # Act
+        missing = [name for name in public if name not in vars(MemoryAdapter)]
+
+        # Assert
+        self.assertEqual(missing, [], 'Inherited methods would read MongoDB')
+
+    def test_inherited_mongo_path_raises_runtime_error(self):
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            MongoAdapter.bump_version(self.adapter, 'shops')
+
+    def test_create_sets_id_and_removes_password(self):
+        # Act
+        doc = self._create('shops', 'shop')
+
+        # Assert
+        self.assertIsInstance(doc['_id'], ObjectId)
+        self.assertNotIn('password', doc)
+        stored = self.adapter.get_user_by_username('shops', 'shop')
+        self.assertEqual(stored['password'], 'hash')
+        self.assertEqual(stored['_id'], doc['_id'])
+
+    def test_create_duplicate_username_raises_key_error(self):
+        # Setup
+        self._create('shops', 'shop')
+
+        # Act & Assert
+        with self.assertRaises(KeyError):
+            self._create('shops', 'shop')
+
+    def test_create_many_reports_duplicates(self):
+        # Setup
+        self._create('shops', 'taken')
+        docs = [{'username': 'taken', 'password': 'hash'},
+                {'username': 'new', 'password': 'hash'},
+                {'username': 'new', 'password': 'hash'}]
+
+        # Act
+        results = self.adapter.create_many('shops', docs)
+
+        # Assert
+        self.assertEqual([result['status'] for result in results],
+                         ['duplicate', 'created', 'duplicate'])
+        self.assertNotIn('password', results[1]['user'])
+
+    def test_update_sets_fields_and_adds_items(self):
+        # Setup
+        shop = self._create('shops', 'shop', name='Old')
+
+        # Act
+        updated = self.adapter.update(
+            'shops', {'name': 'New', 'services': [{'service_name': 'Banho'}]}, shop['_id']
+        )
+
+        # Assert
+        self.assertEqual(updated['name'], 'New')
+        self.assertNotIn('password', updated)
+        items = list(self.adapter.get_items('shops', shop['_id']))
+        self.assertEqual([item['service_name'] for item in items], ['Banho'])
+        self.assertEqual(items[0]['owner_id'], shop['_id'])
+
+    def test_update_unknown_user_raises_key_error(self):
+        # Act & Assert
+        with self.assertRaises(KeyError):
+            self.adapter.update('shops', {'name': 'New'}, str(ObjectId()))
+
+    def test_update_invalid_id_raises_invalid_id(self):
+        # Act & Assert
+        with self.assertRaises(InvalidId):
+            self.adapter.update('shops', {'name': 'New'}, 'nope')
+
+    def test_update_taken_username_raises_runtime_error(self):
+        # Setup
+        self._create('shops', 'taken')
+        shop = self._create('shops', 'shop')
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            self.adapter.update('shops', {'username': 'taken'}, shop['_id'])
+
+    def test_update_username_moves_username_index(self):
+        # Setup
+        shop = self._create('shops', 'shop')
+
+        # Act
+        self.adapter.update('shops', {'username': 'renamed'}, shop['_id'])
+
+        # Assert
+        self.assertEqual(self.adapter.get_user_by_username('shops', 'renamed')['_id'],
+                         shop['_id'])
+        with self.assertRaises(KeyError):
+            self.adapter.get_user_by_username('shops', 'shop')
+
+    def test_add_items_syncs_search_field(self):
+        # Setup
+        shop = self._create('shops', 'shop')
+
+        # Act
+        self.adapter.add_items('shops', shop['_id'], [{'service_name': 'Tosa'},
+                                                      {'service_name': 'Banho'}])
+
+        # Assert
+        stored = self.adapter.get_user_by_username('shops', 'shop')
+        self.assertEqual(stored['service_names'], ['banho', 'tosa'])
+
+    def test_interleaved_item_writes_keep_both_offers(self):
+        # Setup
+        shop = self._create('shops', 'shop')
+        first = self.adapter.add_items('shops', shop['_id'], {'service_name': 'Banho',
+                                                              'price': '10'})[0]
+        second = {'_id': ObjectId(), 'owner_id': shop['_id'], 'service_name': 'Tosa'}
+        owned = self.adapter.items['services'][shop['_id']]
+
+        # Act
+        with self.adapter._lock:
+            # Both items are written before either owner update lands,
+            # the second write's owner update first
+            owned[first['_id']]['price'] = '20'
+            owned[second['_id']] = second
+            self.adapter._touch_owner('shops', shop['_id'],
+                                      {second['_id']: second}, added=True)
+            self.adapter._touch_owner('shops', shop['_id'],
+                                      {first['_id']: owned[first['_id']]})
+
+        # Assert
+        offers = self.adapter.users['shops']['docs'][shop['_id']]['offers']
+        self.assertCountEqual([(offer['item_id'], offer['price']) for offer in offers],
+                              [(first['_id'], 20.0), (second['_id'], None)])
+        self.assertEqual(self.adapter.users['shops']['docs'][shop['_id']]['service_names'],
+                         ['banho', 'tosa'])
+
+    def test_item_update_landing_after_its_removal_adds_no_offers(self):
+        # Setup
+        shop = self._create('shops', 'shop')
+        item = self.adapter.add_items('shops', shop['_id'], {'service_name': 'Banho'})[0]
+        self.adapter.remove('shops', {'item_id': str(item['_id'])}, shop['_id'])
+
+        # Act
+        with self.adapter._lock:
+            self.adapter._touch_owner('shops', shop['_id'],
+                                      {item['_id']: dict(item, price='20')})
+
+        # Assert
+        self.assertEqual(self.adapter.users['shops']['docs'][shop['_id']]['offers'], [])
+
+    def test_remove_by_name_returns_item(self):
+        # Setup
+        client = self._create('clients', 'client')
+        self.adapter.add_items('clients', client['_id'], {'name': 'Rex'})
+
+        # Act
+        removed = self.adapter.remove('clients', {'pet_name': 'Rex'}, client['_id'])
+
+        # Assert
+        self.assertEqual(removed['name'], 'Rex')
+        self.assertEqual(list(self.adapter.get_items('clients', client['_id'])), [])
+
+    def test_remove_missing_item_raises_key_error(self):
+        # Setup
+        client = self._create('clients', 'client')
+
+        # Act & Assert
+        with self.assertRaises(KeyError):
+            self.adapter.remove('clients', {'pet_name': 'Rex'}, client['_id'])
+
+    def test_remove_invalid_item_id_raises_value_error(self):
+        # Setup
+        client = self._create('clients', 'client')
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            self.adapter.remove('clients', {'item_id': 'nope'}, client['_id'])
+
+    def test_update_item_sets_changes(self):
+        # Setup
+        shop = self._create('shops', 'shop')
+        item = self.adapter.add_items('shops', shop['_id'], {'service_name': 'Banho'})[0]
+
+        # Act
+        updated = self.adapter.update_item('shops', shop['_id'], item['_id'],
+                                           {'service_name': 'Tosa'})
+
+        # Assert
+        self.assertEqual(updated['service_name'], 'Tosa')
+        stored = self.adapter.get_user_by_username('shops', 'shop')
+        self.assertEqual(stored['service_names'], ['tosa'])
+
+    def test_update_item_of_other_owner_raises_key_error(self):
+        # Setup
+        shop = self._create('shops', 'shop')
+        other = self._create('shops', 'other')
+        item = self.adapter.add_items('shops', shop['_id'], {'service_name': 'Banho'})[0]
+
+        # Act & Assert
+        with self.assertRaises(KeyError):
+            self.adapter.update_item('shops', other['_id'], item['_id'], {'price': '10'})
+
+    def test_get_items_keyset_pages(self):
+        # Setup
+        client = self._create('clients', 'client')
+        items = self.adapter.add_items('clients', client['_id'],
+                                       [{'name': 'Rex'}, {'name': 'Bob'}, {'name': 'Tom'}])
+
+        # Act
+        page = list(self.adapter.get_items('clients', client['_id'], 1, items[0]['_id']))
+
+        # Assert
+        self.assertEqual([item['name'] for item in page], ['Bob'])
+
+    def test_get_items_invalid_id_raises_value_error(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            self.adapter.get_items('clients', 'nope')
+
+    def test_delete_removes_user_and_items(self):
+        # Setup
+        shop = self._create('shops', 'shop')
+        self.adapter.add_items('shops', shop['_id'], {'service_name': 'Banho'})
+
+        # Act
+        deleted = self.adapter.delete('shops', shop['_id'])
+
+        # Assert
+        self.assertTrue(deleted)
+        with self.assertRaises(KeyError):
+            self.adapter.get_user_by_username('shops', 'shop')
+        self.assertEqual(list(self.adapter.get_items('shops', shop['_id'])), [])
+
+    def test_get_changes_lists_written_and_deleted_users_since(self):
+        # Setup
+        times = [datetime(2026, 10, 1, hour) for hour in range(5)]
+        with patch('users.utils.db.memory_adapter.utc_now', side_effect=times):
+            old = self._create('shops', 'old', name='Old')
+            kept = self._create('shops', 'kept', name='Kept')
+            gone = self._create('shops', 'gone', name='Gone')
+            self.adapter.update('shops', {'name': 'Renamed'}, old['_id'])
+            self.adapter.delete('shops', gone['_id'])
+
+        # Act
+        users, deleted = self.adapter.get_changes('shops', times[1], ['name'])
+
+        # Assert
+        self.assertEqual([dict(user) for user in users], [
+            {'_id': kept['_id'], 'name': 'Kept', 'updated_at': times[1]},
+            {'_id': old['_id'], 'name': 'Renamed', 'updated_at': times[3]}
+        ])
+        self.assertEqual(deleted, [str(gone['_id'])])
+
+    def test_get_changes_nothing_changed_returns_empty(self):
+        # Setup
+        self._create('shops', 'shop')
+
+        # Act
+        users, deleted = self.adapter.get_changes('shops', datetime(2100, 1, 1))
+
+        # Assert
+        self.assertEqual(list(users), [])
+        self.assertEqual(deleted, [])
+
+    def test_writes_increment_collection_and_user_versions(self):
+        # Setup
+        shop = self._create('shops', 'shop')
+        self.adapter.create_many('shops', [{'username': 'other', 'password': 'hash'}])
+
+        # Act
+        self.adapter.update('shops', {'name': 'New'}, shop['_id'])
+        self.adapter.add_items('shops', shop['_id'], {'service_name': 'Banho'})
+
+        # Assert
+        self.assertEqual(self.adapter.get_version('shops'), 4)
+        self.assertEqual(self.adapter.get_version('shops', shop['_id']), 3)
+        self.assertEqual(self.adapter.get_version('clients'), 0)
+
+    def test_get_version_unknown_user_returns_zero(self):
+        # Act & Assert
+        self.assertEqual(self.adapter.get_version('shops', str(ObjectId())), 0)
+
+    def test_get_user_by_username_missing_raises_key_error(self):
+        # Act & Assert
+        with self.assertRaises(KeyError):
+            self.adapter.get_user_by_username('shops', 'nobody')
+
+    def test_set_password_replaces_hash(self):
+        # Setup
+        shop = self._create('shops', 'shop')
+
+        # Act
+        self.adapter.set_password('shops', shop['_id'], 'new_hash')
+
+        # Assert
+        self.assertEqual(self.adapter.get_user_by_username('shops', 'shop')['password'],
+                         'new_hash')
+
+    def test_get_users_keyset_pages_without_password(self):
+        # Setup
+        first, second, third = (self._create('shops', name) for name in ('a', 'b', 'c'))
+
+        # Act
+        page = list(self.adapter.get_users('shops', 1, first['_id']))
+
+        # Assert
+        self.assertEqual(page, [second])
+        self.assertEqual(len(list(self.adapter.get_users('shops'))), 3)
+        self.assertEqual(list(self.adapter.get_users('shops', 0, third['_id'])), [])
+
+    def test_get_users_filters_match_one_offer_and_paginate(self):
+        # Setup
+        shops = [self._create('shops', name) for name in ('a', 'b', 'c', 'd')]
+        services = [
+            [{'service_id': 'groom', 'species': ['cat', 'dog'], 'price': 'R$ 70,00'}],
+            [{'service_id': 'groom', 'species': 'dog', 'price': '50'},
+             {'service_id': 'bath', 'species': 'cat', 'price': '40'}],
+            [{'service_id': 'groom', 'species': 'Cat', 'price': '120'}],
+            [{'service_id': 'groom', 'species': 'cat', 'price': '75.5'}]
+        ]
+        for shop, items in zip(shops, services):
+            self.adapter.add_items('shops', shop['_id'], items)
+        filters = {'service_id': 'groom', 'species': 'CAT', 'max_price': 80.0}
+
+        # Act
+        page = list(self.adapter.get_users('shops', 1, shops[0]['_id'], ['name'],
+                                           filters=filters))
+
+        # Assert
+        self.assertEqual(page, [{'_id': shops[3]['_id']}])
+        self.assertEqual(
+            [shop['username'] for shop in self.adapter.get_users('shops', filters=filters)],
+            ['a', 'd']
+        )
+        self.assertNotIn('offers', next(self.adapter.get_users('shops')))
+        self.assertEqual(list(self.adapter.get_users('shops', filters={'min_price': 500.0})),
+                         [])
+
+    def test_get_users_raw_returns_raw_documents(self):
+        # Setup
+        shop = self._create('shops', 'shop', name='Pet')
+
+        # Act
+        page = list(self.adapter.get_users('shops', raw=True))
+
+        # Assert
+        self.assertIsInstance(page[0], RawBSONDocument)
+        self.assertEqual(dict(page[0]), {'_id': shop['_id'], 'username': 'shop', 'name': 'Pet'})
+
+    def test_get_users_fields_projects_subfields(self):
+        # Setup
+        shop = self._create('shops', 'shop', name='Pet', pics={'profile': 'p', 'banner': 'b'})
+
+        # Act
+        page = list(self.adapter.get_users('shops', fields=['name', 'pics.profile']))
+
+        # Assert
+        self.assertEqual(page, [{'_id': shop['_id'], 'name': 'Pet', 'pics': {'profile': 'p'}}])
+
+    def test_get_users_invalid_field_raises_value_error(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            self.adapter.get_users('shops', fields=['password'])
+
+    def test_get_users_empty_raises_key_error(self):
+        # Act & Assert
+        with self.assertRaises(KeyError):
+            self.adapter.get_users('shops')
+
+    def test_get_users_by_ids_keeps_order_and_lists_missing(self):
+        # Setup
+        first, second = self._create('shops', 'a', name='A'), self._create('shops', 'b', name='B')
+        unknown = str(ObjectId())
+
+        # Act
+        users, missing = self.adapter.get_users_by_ids(
+            'shops', [str(second['_id']), unknown, str(first['_id'])], ['name']
+        )
+
+        # Assert
+        self.assertEqual(users, [{'_id': second['_id'], 'name': 'B'},
+                                 {'_id': first['_id'], 'name': 'A'}])
+        self.assertEqual(missing, [unknown])
+
+    def test_get_users_by_ids_repeated_id_in_other_case_found_once(self):
+        # Setup
+        shop_id = str(self._create('shops', 'a', name='A')['_id'])
+
+        # Act
+        users, missing = self.adapter.get_users_by_ids('shops', [shop_id, shop_id.upper()])
+
+        # Assert
+        self.assertEqual(len(users), 1)
+        self.assertEqual(missing, [])
+
+    def test_get_users_by_ids_invalid_id_raises_value_error(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            self.adapter.get_users_by_ids('shops', ['nope'])
+
+    def test_get_nearby_shops_nearest_first_within_radius(self):
+        # Setup
+        self._create('shops', 'far', location={'type': 'Point', 'coordinates': [-46.7, -23.5]})
+        self._create('shops', 'near', location={'type': 'Point', 'coordinates': [-46.64, -23.5]})
+        self._create('shops', 'away', location={'type': 'Point', 'coordinates': [-43.2, -22.9]})
+
+        # Act
+        shops = list(self.adapter.get_nearby_shops(-46.63, -23.5, 10000))
+
+        # Assert
+        self.assertEqual([shop['username'] for shop in shops], ['near', 'far'])
+        self.assertAlmostEqual(shops[0]['distance'], 1021, delta=5)
+        self.assertNotIn('password', shops[0])
+
+    def test_get_shop_names_pairs(self):
+        # Setup
+        shop = self._create('shops', 'shop', name='Pet Feliz')
+
+        # Act
+        names = list(self.adapter.get_shop_names())
+
+        # Assert
+        self.assertEqual(names, [(str(shop['_id']), 'Pet Feliz')])
+
+    def test_search_shops_weights_fields(self):
+        # Setup
+        self._create('shops', 'described', name='Casa', description='banho e tosa')
+        self._create('shops', 'named', name='Banho Feliz')
+
+        # Act
+        shops = list(self.adapter.search_shops('BANHO'))
+
+        # Assert
+        self.assertEqual([shop['username'] for shop in shops], ['named', 'described'])
+        self.assertGreater(shops[0]['score'], shops[1]['score'])
+
+    def test_search_shops_phrase_required(self):
+        # Setup
+        self._create('shops', 'phrase', name='Pet Feliz')
+        self._create('shops', 'words', name='Feliz Pet')
+
+        # Act
+        shops = list(self.adapter.search_shops('"pet feliz"'))
+
+        # Assert
+        self.assertEqual([shop['username'] for shop in shops], ['phrase'])
+
+    def test_search_shops_matches_service_names_without_accents(self):
+        # Setup
+        shop = self._create('shops', 'shop', name='Casa')
+        self.adapter.add_items('shops', shop['_id'], {'service_name': 'Vacinação'})
+
+        # Act
+        shops = list(self.adapter.search_shops('vacinacao'))
+
+        # Assert
+        self.assertEqual([found['username'] for found in shops], ['shop'])
@@ -0,0 +1,71 @@
+import io
+import unittest
+from unittest.mock import MagicMock
+
+from users.utils.db.memory_storage_adapter import MemoryStorageAdapter
+
+
+class MemoryStorageAdapterTestCase(unittest.TestCase):
+
+    @staticmethod
+    def _get_file(content=b'picture', filename='pic.png'):
+        file_obj = io.BytesIO(content)
+        file_obj.filename = filename
+        return file_obj
+
+    def test_upload_keeps_extension_and_content(self):
+        # Setup
+        adapter = MemoryStorageAdapter()
+        file_obj = self._get_file()
+
+        # Act
+        file_id = adapter.upload(file_obj)
+
+        # Assert
+        self.assertTrue(file_id.endswith('.png'))
+        self.assertEqual(file_obj.filename, file_id)
+        self.assertTrue(file_obj.closed)
+        self.assertEqual(adapter.download(file_id).read(), b'picture')
+
+    def test_upload_unreadable_file_raises_runtime_error(self):
+        # Setup
+        adapter = MemoryStorageAdapter()
+        file_obj = MagicMock(filename='pic.png')
+        file_obj.read.side_effect = OSError
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            adapter.upload(file_obj)
+
+    def test_download_missing_raises_runtime_error(self):
+        # Setup
+        adapter = MemoryStorageAdapter()
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            adapter.download('nope.png')
+
+    def test_delete_removes_file(self):
+        # Setup
+        adapter = MemoryStorageAdapter()
+        file_id = adapter.upload(self._get_file())
+
+        # Act
+        deleted = adapter.delete(file_id)
+
+        # Assert
+        self.assertTrue(deleted)
+        with self.assertRaises(RuntimeError):
+            adapter.download(file_id)
+
+    def test_replace_keeps_file_id(self):
+        # Setup
+        adapter = MemoryStorageAdapter()
+        file_id = adapter.upload(self._get_file())
+
+        # Act
+        new_id = adapter.replace(file_id, self._get_file(b'other'))
+
+        # Assert
+        self.assertEqual(new_id, file_id)
+        self.assertEqual(adapter.download(file_id).read(), b'other')
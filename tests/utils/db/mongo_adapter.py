@@ -1,10 +1,28 @@
 import unittest
-from unittest.mock import patch, MagicMock, call
+from unittest.mock import patch, MagicMock
 
-from users.utils.db.mongo_adapter import MongoAdapter, DuplicateKeyError, PyMongoError
+import bson
+from bson.objectid import ObjectId
+from bson.raw_bson import RawBSONDocument
+from pymongo import ReadPreference
+
+from users.utils.db.mongo_adapter import MongoAdapter, DuplicateKeyError, PyMongoError, \
+    InvalidId, BulkWriteError, HIDDEN_FIELDS, RAW_CODEC_OPTIONS, get_document_id
+from users.utils.db.summaries import SERVICE_NAMES_UPDATE, get_offers_update, \
+    summarize_services
+
+
+# pylint: disable=protected-access, too-many-public-methods, too-many-lines
+def get_mock_adapter(**kwargs):
+    """ Adapter mock whose reads use the same collection mocks as writes
+        and whose streamed results are returned as they are
+    """
+    mock_self = MagicMock(**kwargs)
+    mock_self._reader.side_effect = lambda collection, *_, **__: mock_self.db_[collection]
+    mock_self._end_session_after.side_effect = lambda documents, *_: documents
+    return mock_self
 
 
-# pylint: disable=protected-access
 class MongoAdapterTestCase(unittest.TestCase):
 
     def setUp(self):
@@ -24,17 +42,54 @@ class MongoAdapterTestCase(unittest.TestCase):
         self.mocks['conn_str'] = conn_str.start()
         self.patches.append(conn_str)
 
+        pool_metrics_patch = patch('users.utils.db.mongo_adapter.PoolMetricsListener')
+        self.mocks['pool_metrics'] = pool_metrics_patch.start()
+        self.patches.append(pool_metrics_patch)
+
+        for name, value in (('MONGO_MAX_POOL_SIZE', 100), ('MONGO_MIN_POOL_SIZE', 0),
+                            ('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000),
+                            ('MONGO_SERVER_SELECTION_TIMEOUT_MS', 10000),
+                            ('MONGO_COMPRESSORS', ['zlib']),
+                            ('MONGO_READ_PREFERENCE', 'secondaryPreferred'),
+                            ('MONGO_MAX_STALENESS_SECONDS', 90),
+                            ('MONGO_CAUSAL_TOKENS_SIZE', 10)):
+            setting_patch = patch(f'users.utils.db.mongo_adapter.{name}', new=value)
+            setting_patch.start()
+            self.patches.append(setting_patch)
+
+        read_pref_patch = patch('users.utils.db.mongo_adapter.get_read_preference')
+        self.mocks['read_pref'] = read_pref_patch.start()
+        self.patches.append(read_pref_patch)
+
+        causal_patch = patch('users.utils.db.mongo_adapter.CausalTokens')
+        self.mocks['causal'] = causal_patch.start()
+        self.patches.append(causal_patch)
+
         return_doc_patch = patch('users.utils.db.mongo_adapter.ReturnDocument')
         self.mocks['return_doc'] = return_doc_patch.start()
         self.patches.append(return_doc_patch)
 
+        utc_now_patch = patch('users.utils.db.mongo_adapter.utc_now', return_value='now')
+        self.mocks['utc_now'] = utc_now_patch.start()
+        self.patches.append(utc_now_patch)
+
+        versions_patch = patch('users.utils.db.mongo_adapter.VERSIONS_COLLECTION',
+                               new='test_versions')
+        versions_patch.start()
+        self.patches.append(versions_patch)
+
+        tombstones_patch = patch('users.utils.db.mongo_adapter.TOMBSTONES_COLLECTION',
+                                 new='test_tombstones')
+        tombstones_patch.start()
+        self.patches.append(tombstones_patch)
+
     def tearDown(self):
         for patch_ in self.patches:
             patch_.stop()
 
     def test_init_client_created(self):
         # Setup
-        mock_self = MagicMock()
+        mock_self = get_mock_adapter()
 
         # Act
         MongoAdapter.__init__(mock_self)
@@ -42,12 +97,22 @@ class MongoAdapterTestCase(unittest.TestCase):
         # Assert
         self.mocks['mongo'].assert_called_with(
             'mock_connection',
-            connect=True
+            connect=True,
+            maxPoolSize=100,
+            minPoolSize=0,
+            waitQueueTimeoutMS=5000,
+            serverSelectionTimeoutMS=10000,
+            compressors=['zlib'],
+            event_listeners=[self.mocks['pool_metrics'].return_value]
         )
+        self.mocks['read_pref'].assert_called_with('secondaryPreferred', 90)
+        self.assertEqual(mock_self.read_preference, self.mocks['read_pref'].return_value)
+        self.mocks['causal'].assert_called_with(mock_self.client, 10, 90)
+        self.assertEqual(mock_self.causal_tokens, self.mocks['causal'].return_value)
 
     def test_create_successful_run(self):
         # Setup
-        mock_self = MagicMock()
+        mock_self = get_mock_adapter()
         collection = 'test'
         doc = {
             'username': 'unique_user',
@@ -57,13 +122,23 @@ class MongoAdapterTestCase(unittest.TestCase):
             _id='mongo_created_id',
             password='password_test'
         )
+        inserted = []
+        mock_self.db_['test'].insert_one.side_effect = \
+            lambda doc_, **_: inserted.append(dict(doc_))
 
         # Act
         MongoAdapter.create(mock_self, collection, doc)
 
         # Assert
-        mock_self.db_['test'].insert_one.assert_called_with(
-            {'username': 'unique_user', 'name': 'chad', '_id': 'mongo_created_id'}
+        session = mock_self.causal_tokens.start_session.return_value
+        mock_self.db_['test'].insert_one.assert_called_with(doc, session=session)
+        self.assertEqual(inserted, [{'username': 'unique_user', 'name': 'chad',
+                                     '_id': 'mongo_created_id', 'password': 'password_test',
+                                     'version': 1, 'updated_at': 'now'}])
+        mock_self.bump_version.assert_called_with('test', session)
+        mock_self.causal_tokens.start_session.assert_called_with('unique_user')
+        mock_self.causal_tokens.end_session.assert_called_with(
+            session, 'unique_user', 'mongo_created_id'
         )
         self.assertEqual(doc, {
             'username': 'unique_user',
@@ -73,7 +148,7 @@ class MongoAdapterTestCase(unittest.TestCase):
 
     def test_create_doc_already_exists(self):
         # Setup
-        mock_self = MagicMock()
+        mock_self = get_mock_adapter()
         mock_self.db_['test'].insert_one.side_effect = DuplicateKeyError(MagicMock)
         collection = 'test'
         doc = {
@@ -85,9 +160,68 @@ class MongoAdapterTestCase(unittest.TestCase):
         with self.assertRaises(KeyError):
             MongoAdapter.create(mock_self, collection, doc)
 
+    def test_create_many_reports_status_per_document(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        docs = [
+            {'_id': 1, 'username': 'first', 'password': 'hash'},
+            {'_id': 2, 'username': 'taken', 'password': 'hash'},
+            {'_id': 3, 'username': 'broken', 'password': 'hash'}
+        ]
+        mock_self.db_['test'].insert_many.side_effect = BulkWriteError({'writeErrors': [
+            {'index': 1, 'code': 11000, 'errmsg': 'E11000 duplicate key'},
+            {'index': 2, 'code': 2, 'errmsg': 'bad value'}
+        ]})
+
+        # Act
+        results = MongoAdapter.create_many(mock_self, 'test', docs)
+
+        # Assert
+        mock_self.db_['test'].insert_many.assert_called_with(docs, ordered=False)
+        mock_self.bump_version.assert_called_once_with('test')
+        self.assertEqual(results, [
+            {'status': 'created',
+             'user': {'_id': 1, 'username': 'first'}},
+            {'status': 'duplicate', 'error': 'User taken already exists in test'},
+            {'status': 'error', 'error': 'bad value'}
+        ])
+
+    def test_create_many_empty_skips_insert(self):
+        # Setup
+        mock_self = get_mock_adapter()
+
+        # Act
+        results = MongoAdapter.create_many(mock_self, 'test', [])
+
+        # Assert
+        mock_self.db_['test'].insert_many.assert_not_called()
+        self.assertEqual(results, [])
+
+    def test_create_many_all_failed_keeps_version(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self.db_['test'].insert_many.side_effect = BulkWriteError({'writeErrors': [
+            {'index': 0, 'code': 11000, 'errmsg': 'E11000 duplicate key'}
+        ]})
+
+        # Act
+        MongoAdapter.create_many(mock_self, 'test', [{'username': 'taken'}])
+
+        # Assert
+        mock_self.bump_version.assert_not_called()
+
+    def test_create_many_unexpected_error_raises_runtime_error(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self.db_['test'].insert_many.side_effect = PyMongoError
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            MongoAdapter.create_many(mock_self, 'test', [{'username': 'user'}])
+
     def test_update_not_updating_list_fields_updated_document(self):
         # Setup
-        mock_self = MagicMock()
+        mock_self = get_mock_adapter()
         collection = 'test'
         doc = {'test_field': 'new_value'}
         user_id = 'polar_bear'
@@ -96,43 +230,75 @@ class MongoAdapterTestCase(unittest.TestCase):
         MongoAdapter.update(mock_self, collection, doc, user_id)
 
         # Assert
-        mock_self.db_['test'].find_one_and_update.assert_called_with(
+        mock_self.db_['test'].find_one_and_update.assert_called_once_with(
             mock_self._get_id_filter.return_value,
-            {'$set': {'test_field': 'new_value'}},
-            projection={'password': False},
-            return_document=self.mocks['return_doc'].AFTER
+            {'$set': {'test_field': 'new_value', 'updated_at': 'now'}, '$inc': {'version': 1}},
+            projection=dict.fromkeys(HIDDEN_FIELDS, False),
+            return_document=self.mocks['return_doc'].AFTER,
+            session=mock_self.causal_tokens.start_session.return_value
+        )
+        mock_self.bump_version.assert_called_with(
+            'test', mock_self.causal_tokens.start_session.return_value
         )
+        mock_self.add_items.assert_not_called()
 
-    def test_update_updating_list_field_updated_document(self):
+    @patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                {'test': ('services', 'test_services')})
+    def test_update_updating_list_field_adds_items(self):
         # Setup
-        mock_self = MagicMock()
+        mock_self = get_mock_adapter()
         collection = 'test'
-        doc = {'services': 'new_service', 'pets': 'new_pet'}
+        doc = {'services': ['new_service'], 'name': 'new'}
         user_id = 'polar_bear'
-        find_calls = [
-            call(
-                mock_self._get_id_filter.return_value,
-                {'$push': {'services': 'new_service'}},
-                projection={'password': False},
-                return_document=self.mocks['return_doc'].AFTER
-            ),
-            call(
-                mock_self._get_id_filter.return_value,
-                {'$push': {'pets': 'new_pet'}},
-                projection={'password': False},
-                return_document=self.mocks['return_doc'].AFTER
-            )
-        ]
 
         # Act
         MongoAdapter.update(mock_self, collection, doc, user_id)
 
         # Assert
-        mock_self.db_['test'].find_one_and_update.assert_has_calls(find_calls)
+        mock_self.db_['test'].find_one_and_update.assert_called_once_with(
+            mock_self._get_id_filter.return_value,
+            {'$set': {'name': 'new', 'updated_at': 'now'}, '$inc': {'version': 1}},
+            projection=dict.fromkeys(HIDDEN_FIELDS, False),
+            return_document=self.mocks['return_doc'].AFTER,
+            session=mock_self.causal_tokens.start_session.return_value
+        )
+        mock_self.add_items.assert_called_with('test', 'polar_bear', ['new_service'])
+
+    @patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                {'test': ('pets', 'test_pets')})
+    def test_update_only_list_field_finds_user_and_adds_items(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        doc = {'pets': [{'name': 'Rex'}]}
+
+        # Act
+        updated = MongoAdapter.update(mock_self, 'test', doc, 'polar_bear')
+
+        # Assert
+        mock_self.db_['test'].find_one_and_update.assert_not_called()
+        mock_self.db_['test'].find_one.assert_called_with(
+            mock_self._get_id_filter.return_value, projection=dict.fromkeys(HIDDEN_FIELDS, False),
+            session=mock_self.causal_tokens.start_session.return_value
+        )
+        mock_self.add_items.assert_called_with('test', 'polar_bear', [{'name': 'Rex'}])
+        mock_self.bump_version.assert_not_called()
+        self.assertEqual(updated, mock_self.db_['test'].find_one.return_value)
+
+    @patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                {'test': ('pets', 'test_pets')})
+    def test_update_user_not_found_does_not_add_items(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self.db_['test'].find_one.return_value = None
+
+        # Act & Assert
+        with self.assertRaises(KeyError):
+            MongoAdapter.update(mock_self, 'test', {'pets': [{'name': 'Rex'}]}, 'polar_bear')
+        mock_self.add_items.assert_not_called()
 
     def test_update_document_not_found_no_update_raises_key_error(self):
         # Arrange
-        mock_self = MagicMock()
+        mock_self = get_mock_adapter()
         collection = 'test'
         doc = {}
         user_id = 'polar_bear'
@@ -143,7 +309,7 @@ class MongoAdapterTestCase(unittest.TestCase):
 
     def test_update_document_unexpected_error_raises_runtime_error(self):
         # Arrange
-        mock_self = MagicMock()
+        mock_self = get_mock_adapter()
         collection = 'test'
         doc = {'something': 'testing'}
         mock_self.db_['test'].find_one_and_update.side_effect = PyMongoError()
@@ -153,70 +319,204 @@ class MongoAdapterTestCase(unittest.TestCase):
         with self.assertRaises(RuntimeError):
             MongoAdapter.update(mock_self, collection, doc, user_id)
 
-    def test_remove_removes_service_updated_document(self):
+    @patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                {'test': ('services', 'test_services')})
+    def test_add_items_inserts_with_owner_id(self):
         # Setup
-        mock_self = MagicMock()
-        collection = 'test'
+        mock_self = get_mock_adapter()
+        mock_self._get_id_filter.return_value = {'_id': 'owner'}
+        mock_self.db_['test_services'].insert_many.side_effect = \
+            lambda docs, **_: [doc.update(_id='item') for doc in docs]
+
+        # Act
+        added = MongoAdapter.add_items(mock_self, 'test', 'polar_bear', {'service_id': 'bath'})
+
+        # Assert
+        session = mock_self.causal_tokens.start_session.return_value
+        mock_self.db_['test_services'].insert_many.assert_called_with(
+            [{'service_id': 'bath', 'owner_id': 'owner', '_id': 'item'}], session=session
+        )
+        self.assertEqual(added, [{'service_id': 'bath', 'owner_id': 'owner', '_id': 'item'}])
+        mock_self._touch_owner.assert_called_with('test', 'owner', {'item': added[0]},
+                                                  session, added=True)
+        mock_self.causal_tokens.end_session.assert_called_with(session, 'polar_bear')
+
+    @patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                {'test': ('services', 'test_services')})
+    def test_add_items_unexpected_error_raises_runtime_error(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self.db_['test_services'].insert_many.side_effect = PyMongoError()
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            MongoAdapter.add_items(mock_self, 'test', 'polar_bear', [{'service_id': 'bath'}])
+
+    @patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                {'test': ('services', 'test_services')})
+    def test_remove_removes_service_returns_item(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self._get_id_filter.return_value = {'_id': 'owner'}
         doc = {'service_id': 'some_id'}
-        user_id = 'polar_bear'
 
         # Act
-        MongoAdapter.remove(mock_self, collection, doc, user_id)
+        removed = MongoAdapter.remove(mock_self, 'test', doc, 'polar_bear')
 
         # Assert
-        mock_self.db_['test'].find_one_and_update.assert_called_with(
-            mock_self._get_id_filter.return_value,
-            {'$pull': {'services': {'service_id': 'some_id'}}},
-            projection={'password': False},
-            return_document=self.mocks['return_doc'].AFTER
+        mock_self.db_['test_services'].find_one_and_delete.assert_called_with(
+            {'owner_id': 'owner', 'service_id': 'some_id'},
+            session=mock_self.causal_tokens.start_session.return_value
+        )
+        self.assertEqual(removed, mock_self.db_['test_services'].find_one_and_delete.return_value)
+        mock_self._touch_owner.assert_called_with(
+            'test', 'owner', {removed['_id']: None},
+            mock_self.causal_tokens.start_session.return_value
         )
 
-    def test_remove_removes_pet_updated_document(self):
+    @patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                {'test': ('pets', 'test_pets')})
+    def test_remove_removes_pet_by_name(self):
         # Setup
-        mock_self = MagicMock()
-        collection = 'test'
+        mock_self = get_mock_adapter()
+        mock_self._get_id_filter.return_value = {'_id': 'owner'}
         doc = {'pet_name': 'some_name'}
-        user_id = 'polar_bear'
 
         # Act
-        MongoAdapter.remove(mock_self, collection, doc, user_id)
+        MongoAdapter.remove(mock_self, 'test', doc, 'polar_bear')
 
         # Assert
-        mock_self.db_['test'].find_one_and_update.assert_called_with(
-            mock_self._get_id_filter.return_value,
-            {'$pull': {'pets': {'name': 'some_name'}}},
-            projection={'password': False},
-            return_document=self.mocks['return_doc'].AFTER
+        mock_self.db_['test_pets'].find_one_and_delete.assert_called_with(
+            {'owner_id': 'owner', 'name': 'some_name'},
+            session=mock_self.causal_tokens.start_session.return_value
         )
 
-    def test_remove_not_found_no_update_raises_key_error(self):
+    @patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                {'test': ('services', 'test_services')})
+    def test_remove_without_key_raises_key_error(self):
+        # Setup
+        mock_self = get_mock_adapter()
+
+        # Act & Assert
+        with self.assertRaises(KeyError):
+            MongoAdapter.remove(mock_self, 'test', {}, 'polar_bear')
+        mock_self.db_['test_services'].find_one_and_delete.assert_not_called()
+
+    @patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                {'test': ('services', 'test_services')})
+    def test_remove_not_found_raises_key_error(self):
         # Arrange
-        mock_self = MagicMock()
-        collection = 'test'
-        doc = {'service_id': 'test_id'}
-        user_id = 'polar_bear'
-        mock_self.db_['test'].find_one_and_update.return_value = None
+        mock_self = get_mock_adapter()
+        mock_self.db_['test_services'].find_one_and_delete.return_value = None
 
         # Act & Assert
         with self.assertRaises(KeyError):
-            MongoAdapter.remove(mock_self, collection, doc, user_id)
+            MongoAdapter.remove(mock_self, 'test', {'service_id': 'test_id'}, 'polar_bear')
 
+    @patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                {'test': ('services', 'test_services')})
     def test_remove_unexpected_error_raises_runtime_error(self):
         # Arrange
-        mock_self = MagicMock()
-        collection = 'test'
-        doc = {'service_id': 'test_id'}
-        user_id = 'polar_bear'
-        mock_self.db_['test'].find_one_and_update.side_effect = PyMongoError()
+        mock_self = get_mock_adapter()
+        mock_self.db_['test_services'].find_one_and_delete.side_effect = PyMongoError()
 
         # Act & Assert
         with self.assertRaises(RuntimeError):
-            MongoAdapter.remove(mock_self, collection, doc, user_id)
+            MongoAdapter.remove(mock_self, 'test', {'service_id': 'test_id'}, 'polar_bear')
+
+    @patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                {'test': ('pets', 'test_pets')})
+    def test_remove_by_item_id(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self._get_id_filter.return_value = {'_id': 'owner'}
+        mock_self._get_object_id.return_value = 'item_oid'
+
+        # Act
+        MongoAdapter.remove(mock_self, 'test', {'item_id': 'item'}, 'polar_bear')
+
+        # Assert
+        mock_self._get_object_id.assert_called_with('item')
+        mock_self.db_['test_pets'].find_one_and_delete.assert_called_with(
+            {'owner_id': 'owner', '_id': 'item_oid'},
+            session=mock_self.causal_tokens.start_session.return_value
+        )
+
+    @patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                {'test': ('services', 'test_services')})
+    def test_update_item_sets_changes_returns_item(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self._get_id_filter.return_value = {'_id': 'owner'}
+        mock_self._get_object_id.return_value = 'item_oid'
+
+        # Act
+        updated = MongoAdapter.update_item(mock_self, 'test', 'polar_bear', 'item',
+                                           {'price': '10'})
+
+        # Assert
+        mock_self.db_['test_services'].find_one_and_update.assert_called_with(
+            {'_id': 'item_oid', 'owner_id': 'owner'},
+            {'$set': {'price': '10'}},
+            return_document=self.mocks['return_doc'].AFTER,
+            session=mock_self.causal_tokens.start_session.return_value
+        )
+        self.assertEqual(updated, mock_self.db_['test_services'].find_one_and_update.return_value)
+        mock_self._touch_owner.assert_called_with(
+            'test', 'owner', {updated['_id']: updated},
+            mock_self.causal_tokens.start_session.return_value
+        )
+
+    @patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                {'test': ('services', 'test_services')})
+    def test_update_item_not_found_raises_key_error(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self.db_['test_services'].find_one_and_update.return_value = None
+
+        # Act & Assert
+        with self.assertRaises(KeyError):
+            MongoAdapter.update_item(mock_self, 'test', 'polar_bear', 'item', {'price': '10'})
+
+    @patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                {'test': ('services', 'test_services')})
+    def test_update_item_unexpected_error_raises_runtime_error(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self.db_['test_services'].find_one_and_update.side_effect = PyMongoError()
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            MongoAdapter.update_item(mock_self, 'test', 'polar_bear', 'item', {'price': '10'})
+
+    @patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                {'test': ('pets', 'test_pets')})
+    def test_get_items_keyset_query_by_owner(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self._get_object_id.side_effect = lambda id_: f'oid_{id_}'
+        mock_self.db_['test_pets'].find.return_value = iter([{'name': 'Rex'}])
+
+        # Act
+        items = MongoAdapter.get_items(mock_self, 'test', 'polar_bear', 10, 'last', 'viewer')
+
+        # Assert
+        self.assertEqual(list(items), [{'name': 'Rex'}])
+        mock_self.causal_tokens.start_session.assert_called_with('viewer')
+        mock_self.db_['test_pets'].find.assert_called_with(
+            {'owner_id': 'oid_polar_bear', '_id': {'$gt': 'oid_last'}},
+            sort=[('_id', 1)],
+            limit=10,
+            session=mock_self.causal_tokens.start_session.return_value
+        )
 
     @staticmethod
+    @patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                {'test': ('pets', 'test_pets')})
     def test_delete_successful_run_deleted_document():
         # Setup
-        mock_self = MagicMock()
+        mock_self = get_mock_adapter()
+        mock_self._get_id_filter.return_value = {'_id': 'owner'}
         collection = 'test'
         user_id = 'polar_bear'
 
@@ -224,13 +524,28 @@ class MongoAdapterTestCase(unittest.TestCase):
         MongoAdapter.delete(mock_self, collection, user_id)
 
         # Assert
-        mock_self.db_['test'].delete_one.assert_called_with(
-            mock_self._get_id_filter.return_value
+        mock_self.db_['test'].delete_one.assert_called_with({'_id': 'owner'})
+        mock_self.db_['test_pets'].delete_many.assert_called_with({'owner_id': 'owner'})
+        mock_self.db_['test_tombstones'].replace_one.assert_called_with(
+            {'_id': 'owner'}, {'collection': 'test', 'deleted_at': 'now'}, upsert=True
         )
+        mock_self.bump_version.assert_called_with('test')
+
+    def test_delete_nothing_deleted_leaves_no_tombstone(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self._get_id_filter.return_value = {'_id': 'owner'}
+        mock_self.db_['test'].delete_one.return_value.deleted_count = 0
+
+        # Act
+        MongoAdapter.delete(mock_self, 'test', 'polar_bear')
+
+        # Assert
+        mock_self.db_['test_tombstones'].replace_one.assert_not_called()
 
     def test_delete_except_pymongoerror(self):
         # Setup
-        mock_self = MagicMock()
+        mock_self = get_mock_adapter()
         collection = 'test'
         user_id = 'polar_bear'
         mock_self.db_['test'].delete_one.side_effect = PyMongoError
@@ -241,63 +556,567 @@ class MongoAdapterTestCase(unittest.TestCase):
 
     def test_get_user_by_username_found_user_returns_it(self):
         # Setup
-        mock_self = MagicMock()
+        mock_self = get_mock_adapter()
         collection = 'test_col'
         username = 'user'
-        password = 'password'
         mock_self.db_['test_col'].find_one.return_value = {
             '_id': 1234,
             'other': 'fields'
         }
 
         # Act
-        user = MongoAdapter.get_user_by_username(mock_self, collection, username, password)
+        user = MongoAdapter.get_user_by_username(mock_self, collection, username)
 
         # Assert
-        self.assertEqual(user, {'_id': '1234', 'other': 'fields'})
+        mock_self._reader.assert_called_with('test_col', primary=True)
+        mock_self.db_['test_col'].find_one.assert_called_with(
+            {'username': 'user'}, session=mock_self.causal_tokens.start_session.return_value
+        )
+        mock_self.causal_tokens.end_session.assert_called_with(
+            mock_self.causal_tokens.start_session.return_value, 'user'
+        )
+        self.assertEqual(user, {'_id': 1234, 'other': 'fields'})
 
     def test_get_user_by_username_not_found_raises_keyerror(self):
         # Setup
-        mock_self = MagicMock()
+        mock_self = get_mock_adapter()
         collection = 'test_col'
         username = 'user'
-        password = 'password'
         mock_self.db_['test_col'].find_one.return_value = None
 
         # Act & Assert
         with self.assertRaises(KeyError):
-            MongoAdapter.get_user_by_username(mock_self, collection, username, password)
+            MongoAdapter.get_user_by_username(mock_self, collection, username)
+
+    @staticmethod
+    def test_set_password_sets_hash():
+        # Setup
+        mock_self = get_mock_adapter()
+
+        # Act
+        MongoAdapter.set_password(mock_self, 'test_col', 'polar_bear', 'hash')
+
+        # Assert
+        mock_self.db_['test_col'].update_one.assert_called_with(
+            mock_self._get_id_filter.return_value,
+            {'$set': {'password': 'hash'}}
+        )
+
+    def test_set_password_unexpected_error_raises_runtime_error(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self.db_['test_col'].update_one.side_effect = PyMongoError
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            MongoAdapter.set_password(mock_self, 'test_col', 'polar_bear', 'hash')
 
     def test_get_users_returns_list(self):
         # Setup
-        mock_self = MagicMock()
+        mock_self = get_mock_adapter(_resume=MongoAdapter._resume)
         collection = 'test_col'
-        mock_self.db_['test_col'].find.return_value = [
+        mock_self.db_['test_col'].find.return_value = iter([
             {'_id': 123},
             {'_id': 456},
             {'_id': 789}
-        ]
+        ])
 
         # Act
         list_ = MongoAdapter.get_users(mock_self, collection)
 
         # Assert
-        self.assertEqual(list_, [
-            {'_id': '123'},
-            {'_id': '456'},
-            {'_id': '789'}
+        self.assertEqual(list(list_), [
+            {'_id': 123},
+            {'_id': 456},
+            {'_id': 789}
         ])
 
+    def test_get_users_raw_reads_raw_documents(self):
+        # Setup
+        mock_self = get_mock_adapter(_resume=MongoAdapter._resume)
+        mock_self.db_['test_col'].find.return_value = iter([{'_id': 123}])
+
+        # Act
+        list_ = MongoAdapter.get_users(mock_self, 'test_col', raw=True)
+
+        # Assert
+        mock_self._reader.assert_called_with('test_col', True, False)
+        self.assertEqual(list(list_), [{'_id': 123}])
+
+    def test_get_users_primary_reads_from_primary(self):
+        # Setup
+        mock_self = get_mock_adapter(_resume=MongoAdapter._resume)
+        mock_self.db_['test_col'].find.return_value = iter([{'_id': 123}])
+
+        # Act
+        MongoAdapter.get_users(mock_self, 'test_col', 10, raw=True, primary=True)
+
+        # Assert
+        mock_self._reader.assert_called_with('test_col', True, True)
+
+    def test_reader_raw_uses_raw_codec_options(self):
+        # Setup
+        mock_self = get_mock_adapter()
+
+        # Act
+        collection = MongoAdapter._reader(mock_self, 'test_col', True)
+
+        # Assert
+        mock_self.db_.get_collection.assert_called_with(
+            'test_col', codec_options=RAW_CODEC_OPTIONS,
+            read_preference=mock_self.read_preference
+        )
+        self.assertEqual(collection, mock_self.db_.get_collection.return_value)
+
+    def test_reader_primary_overrides_read_preference(self):
+        # Setup
+        mock_self = get_mock_adapter()
+
+        # Act
+        MongoAdapter._reader(mock_self, 'test_col', primary=True)
+
+        # Assert
+        mock_self.db_.get_collection.assert_called_with(
+            'test_col', codec_options=None, read_preference=ReadPreference.PRIMARY
+        )
+
+    def test_reader_default_inherits_codec_options(self):
+        # Setup
+        mock_self = get_mock_adapter()
+
+        # Act
+        MongoAdapter._reader(mock_self, 'test_col')
+
+        # Assert
+        mock_self.db_.get_collection.assert_called_with(
+            'test_col', codec_options=None, read_preference=mock_self.read_preference
+        )
+
+    def test_get_users_after_and_limit_keyset_query(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        collection = 'test_col'
+        mock_self.db_['test_col'].find.return_value = iter([{'_id': 123}])
+
+        # Act
+        MongoAdapter.get_users(mock_self, collection, 10, 'last_id', causal_key='viewer')
+
+        # Assert
+        mock_self._get_object_id.assert_called_with('last_id')
+        mock_self._reader.assert_called_with('test_col', False, False)
+        mock_self.causal_tokens.start_session.assert_called_with('viewer')
+        mock_self.db_['test_col'].find.assert_called_with(
+            {'_id': {'$gt': mock_self._get_object_id.return_value}},
+            projection=mock_self._get_projection.return_value,
+            sort=[('_id', 1)],
+            limit=10,
+            session=mock_self.causal_tokens.start_session.return_value
+        )
+        mock_self._end_session_after.assert_called_once()
+
+    def test_get_users_filters_match_one_offer(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self.db_['test_col'].find.return_value = iter([{'_id': 123}])
+
+        # Act
+        MongoAdapter.get_users(mock_self, 'test_col', 10,
+                               filters={'species': 'Gato', 'max_price': 80.0})
+
+        # Assert
+        mock_self.db_['test_col'].find.assert_called_with(
+            {'offers': {'$elemMatch': {'species': 'gato', 'price': {'$lte': 80.0}}}},
+            projection=mock_self._get_projection.return_value,
+            sort=[('_id', 1)],
+            limit=10,
+            session=mock_self.causal_tokens.start_session.return_value
+        )
+
+    def test_get_users_filters_nothing_found_returns_empty(self):
+        # Setup
+        mock_self = get_mock_adapter(_resume=MongoAdapter._resume)
+        mock_self.db_['test_col'].find.return_value = iter([])
+
+        # Act
+        list_ = MongoAdapter.get_users(mock_self, 'test_col', filters={'service_id': 'bath'})
+
+        # Assert
+        self.assertEqual(list(list_), [])
+
     def test_get_users_nothing_found_raises_keyerror(self):
         # Setup
-        mock_self = MagicMock()
+        mock_self = get_mock_adapter()
         collection = 'test_col'
-        mock_self.db_['test_col'].find.return_value = []
+        mock_self.db_['test_col'].find.return_value = iter([])
 
         # Act & Assert
         with self.assertRaises(KeyError):
             MongoAdapter.get_users(mock_self, collection)
 
+    def test_get_users_past_last_page_returns_empty(self):
+        # Setup
+        mock_self = get_mock_adapter(_resume=MongoAdapter._resume)
+        collection = 'test_col'
+        mock_self.db_['test_col'].find.return_value = iter([])
+
+        # Act
+        list_ = MongoAdapter.get_users(mock_self, collection, after='last_id')
+
+        # Assert
+        self.assertEqual(list(list_), [])
+
+    def test_get_users_by_ids_single_in_query_keeps_order(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self._get_unique_object_ids.side_effect = \
+            lambda ids: {f'oid_{id_}': id_ for id_ in ids}
+        mock_self.db_['test'].find.return_value = iter([{'_id': 'oid_a'}, {'_id': 'oid_c'}])
+
+        # Act
+        users, missing = MongoAdapter.get_users_by_ids(mock_self, 'test', ['c', 'b', 'a'],
+                                                       ['name'], 'requester')
+
+        # Assert
+        session = mock_self.causal_tokens.start_session.return_value
+        mock_self._get_projection.assert_called_with('test', ['name'])
+        mock_self.db_['test'].find.assert_called_once_with(
+            {'_id': {'$in': ['oid_c', 'oid_b', 'oid_a']}},
+            projection=mock_self._get_projection.return_value,
+            session=session
+        )
+        mock_self.causal_tokens.end_session.assert_called_with(session, 'requester')
+        self.assertEqual(users, [{'_id': 'oid_c'}, {'_id': 'oid_a'}])
+        self.assertEqual(missing, ['b'])
+
+    def test_get_users_by_ids_invalid_id_raises_value_error(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self._get_unique_object_ids.side_effect = ValueError
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            MongoAdapter.get_users_by_ids(mock_self, 'test', ['nope'])
+        mock_self.db_['test'].find.assert_not_called()
+
+    def test_get_unique_object_ids_drops_repeated_ids_in_any_case(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self._get_object_id.side_effect = lambda id_: f'oid_{id_.lower()}'
+
+        # Act
+        object_ids = MongoAdapter._get_unique_object_ids(mock_self, ['a1', 'b2', 'A1'])
+
+        # Assert
+        self.assertEqual(object_ids, {'oid_a1': 'a1', 'oid_b2': 'b2'})
+
+    def test_get_changes_reads_changed_users_and_tombstones(self):
+        # Setup
+        mock_self = get_mock_adapter(_resume=MongoAdapter._resume)
+        mock_self._get_projection.return_value = {'name': True}
+        # The tombstones are read first
+        mock_self.db_['test_col'].find.side_effect = [iter([{'_id': 'deleted_oid'}]),
+                                                      iter([{'_id': 123}])]
+
+        # Act
+        users, deleted = MongoAdapter.get_changes(mock_self, 'test_col', 'since', ['name'],
+                                                  'viewer')
+
+        # Assert
+        session = mock_self.causal_tokens.start_session.return_value
+        mock_self.causal_tokens.start_session.assert_called_with('viewer')
+        mock_self._reader.assert_any_call('test_col', True)
+        mock_self._reader.assert_any_call('test_tombstones')
+        mock_self.db_['test_tombstones'].find.assert_any_call(
+            {'collection': 'test_col', 'deleted_at': {'$gte': 'since'}},
+            projection={'_id': True},
+            session=session
+        )
+        mock_self.db_['test_col'].find.assert_called_with(
+            {'updated_at': {'$gte': 'since'}},
+            projection={'name': True, 'updated_at': True},
+            sort=[('updated_at', 1), ('_id', 1)],
+            session=session
+        )
+        mock_self._end_session_after.assert_called_once()
+        self.assertEqual(list(users), [{'_id': 123}])
+        self.assertEqual(deleted, ['deleted_oid'])
+
+    def test_get_changes_default_projection_hides_fields(self):
+        # Setup
+        mock_self = get_mock_adapter(_get_projection=MongoAdapter._get_projection)
+        mock_self.db_['test_col'].find.return_value = iter([])
+
+        # Act
+        users, deleted = MongoAdapter.get_changes(mock_self, 'test_col', 'since')
+
+        # Assert
+        self.assertEqual(mock_self.db_['test_col'].find.call_args[1]['projection'],
+                         {'password': False, 'offers': False, 'service_names': False,
+                          'version': False})
+        self.assertEqual(list(users), [])
+        self.assertEqual(deleted, [])
+
+    def test_get_changes_pymongoerror_ends_session(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self.db_['test_tombstones'].find.side_effect = PyMongoError
+
+        # Act & Assert
+        with self.assertRaises(PyMongoError):
+            MongoAdapter.get_changes(mock_self, 'test_col', 'since')
+        mock_self.causal_tokens.end_session.assert_called_with(
+            mock_self.causal_tokens.start_session.return_value
+        )
+
+    @patch('users.utils.db.mongo_adapter.SHOPS_COLLECTION', new='test_shops')
+    @patch('users.utils.db.mongo_adapter.LISTING_FIELDS', new=['name'])
+    def test_get_nearby_shops_geo_near_pipeline(self):
+        # Setup
+        mock_self = get_mock_adapter(_resume=MongoAdapter._resume)
+        mock_self.db_['test_shops'].aggregate.return_value = iter([{'_id': 1, 'name': 'pet'}])
+
+        # Act
+        shops = MongoAdapter.get_nearby_shops(mock_self, -46.6, -23.5, 1000, 10, 20)
+
+        # Assert
+        self.assertEqual(list(shops), [{'_id': 1, 'name': 'pet'}])
+        mock_self.db_['test_shops'].aggregate.assert_called_with([
+            {'$geoNear': {
+                'near': {'type': 'Point', 'coordinates': [-46.6, -23.5]},
+                'distanceField': 'distance',
+                'maxDistance': 1000,
+                'spherical': True
+            }},
+            {'$skip': 20},
+            {'$limit': 10},
+            {'$project': {'name': True, 'distance': True}}
+        ])
+
+    @patch('users.utils.db.mongo_adapter.SHOPS_COLLECTION', new='test_shops')
+    def test_get_nearby_shops_unexpected_error_raises_runtime_error(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self.db_['test_shops'].aggregate.side_effect = PyMongoError()
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            MongoAdapter.get_nearby_shops(mock_self, 0, 0, 1)
+
+    @patch('users.utils.db.mongo_adapter.SHOPS_COLLECTION', new='test_shops')
+    def test_get_shop_names_yields_id_name_pairs(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self.db_['test_shops'].find.return_value = \
+            iter([{'_id': 1, 'name': 'Pet'}, {'_id': 2}])
+
+        # Act
+        names = MongoAdapter.get_shop_names(mock_self)
+
+        # Assert
+        self.assertEqual(list(names), [('1', 'Pet'), ('2', None)])
+        mock_self.db_['test_shops'].find.assert_called_with({}, projection={'name': True})
+
+    @patch('users.utils.db.mongo_adapter.SHOPS_COLLECTION', new='test_shops')
+    @patch('users.utils.db.mongo_adapter.LISTING_FIELDS', new=['name'])
+    def test_search_shops_text_query_sorted_by_score(self):
+        # Setup
+        mock_self = get_mock_adapter(_resume=MongoAdapter._resume)
+        mock_self.db_['test_shops'].find.return_value = iter([{'_id': 1, 'score': 2.5}])
+
+        # Act
+        shops = MongoAdapter.search_shops(mock_self, 'banho e tosa', 10, 20)
+
+        # Assert
+        self.assertEqual(list(shops), [{'_id': 1, 'score': 2.5}])
+        mock_self.db_['test_shops'].find.assert_called_with(
+            {'$text': {'$search': 'banho e tosa'}},
+            projection={'name': True, 'score': {'$meta': 'textScore'}},
+            sort=[('score', {'$meta': 'textScore'})],
+            skip=20,
+            limit=10
+        )
+
+    @patch('users.utils.db.mongo_adapter.SHOPS_COLLECTION', new='test_shops')
+    def test_search_shops_unexpected_error_raises_runtime_error(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self.db_['test_shops'].find.side_effect = PyMongoError()
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            MongoAdapter.search_shops(mock_self, 'banho')
+
+    @patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                {'test': ('services', 'test_services')})
+    def test_touch_owner_replaces_written_items_offers_in_one_update(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        item = {'_id': 'item', 'service_name': 'Banho', 'price': '10', 'species': 'dog'}
+
+        # Act
+        with patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                        {'test': ('services', 'test_services')}), \
+                patch.dict('users.utils.db.mongo_adapter.ITEM_SUMMARIES',
+                           {'test': summarize_services}):
+            MongoAdapter._touch_owner(mock_self, 'test', 'owner', {'item': item}, 'session')
+
+        # Assert
+        mock_self.db_['test'].update_one.assert_called_once_with(
+            {'_id': 'owner'},
+            [
+                {'$set': {
+                    'updated_at': 'now',
+                    'version': {'$add': [{'$ifNull': ['$version', 0]}, 1]},
+                    'offers': get_offers_update(['item'], summarize_services([item])['offers'])
+                }},
+                {'$set': {'service_names': SERVICE_NAMES_UPDATE}}
+            ],
+            session='session'
+        )
+        mock_self.db_['test'].find.assert_not_called()
+        mock_self.db_['test'].find_one.assert_not_called()
+        mock_self.bump_version.assert_called_with('test', 'session')
+
+    def test_touch_owner_removed_item_drops_its_offers(self):
+        # Setup
+        mock_self = get_mock_adapter()
+
+        # Act
+        with patch.dict('users.utils.db.mongo_adapter.ITEM_COLLECTIONS',
+                        {'test': ('services', 'test_services')}), \
+                patch.dict('users.utils.db.mongo_adapter.ITEM_SUMMARIES',
+                           {'test': summarize_services}):
+            MongoAdapter._touch_owner(mock_self, 'test', 'owner', {'item': None})
+
+        # Assert
+        changes = mock_self.db_['test'].update_one.call_args[0][1][0]['$set']
+        self.assertEqual(changes['offers'], get_offers_update(['item'], []))
+
+    def test_touch_owner_collection_without_search_field_only_versions(self):
+        # Setup
+        mock_self = get_mock_adapter()
+
+        # Act
+        MongoAdapter._touch_owner(mock_self, 'not_searched', 'owner', {'item': None}, 'session')
+
+        # Assert
+        mock_self.db_['not_searched'].update_one.assert_called_with(
+            {'_id': 'owner'}, {'$set': {'updated_at': 'now'}, '$inc': {'version': 1}},
+            session='session'
+        )
+        mock_self.db_['not_searched'].find.assert_not_called()
+        mock_self.bump_version.assert_called_with('not_searched', 'session')
+
+    def testbump_version_upserts_collection_version(self):
+        # Setup
+        mock_self = get_mock_adapter()
+
+        # Act
+        MongoAdapter.bump_version(mock_self, 'test', 'session')
+
+        # Assert
+        mock_self.db_['test_versions'].update_one.assert_called_with(
+            {'_id': 'test'},
+            {'$inc': {'version': 1}, '$set': {'updated_at': 'now'}},
+            upsert=True,
+            session='session'
+        )
+
+    def test_get_version_of_collection(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self.db_['test_versions'].find_one.return_value = {'_id': 'test', 'version': 7}
+
+        # Act
+        version = MongoAdapter.get_version(mock_self, 'test', causal_key='requester')
+
+        # Assert
+        session = mock_self.causal_tokens.start_session.return_value
+        mock_self.db_['test_versions'].find_one.assert_called_with({'_id': 'test'},
+                                                                    session=session)
+        mock_self.causal_tokens.start_session.assert_called_with('requester')
+        mock_self.causal_tokens.end_session.assert_called_with(session, 'requester')
+        self.assertEqual(version, 7)
+
+    def test_get_version_primary_reads_from_primary(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self.db_['test_versions'].find_one.return_value = {'_id': 'test', 'version': 7}
+
+        # Act
+        MongoAdapter.get_version(mock_self, 'test', primary=True)
+
+        # Assert
+        mock_self._reader.assert_called_with('test_versions', primary=True)
+
+    def test_get_version_of_user_reads_only_version(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self.db_['test'].find_one.return_value = {'_id': 'oid', 'version': 3}
+
+        # Act
+        version = MongoAdapter.get_version(mock_self, 'test', 'polar_bear')
+
+        # Assert
+        mock_self.db_['test'].find_one.assert_called_with(
+            {'_id': mock_self._get_object_id.return_value},
+            projection={'version': True},
+            session=mock_self.causal_tokens.start_session.return_value
+        )
+        mock_self._get_object_id.assert_called_with('polar_bear')
+        self.assertEqual(version, 3)
+
+    def test_get_version_never_written_returns_zero(self):
+        # Setup
+        mock_self = get_mock_adapter()
+        mock_self.db_['test_versions'].find_one.return_value = None
+
+        # Act
+        version = MongoAdapter.get_version(mock_self, 'test')
+
+        # Assert
+        self.assertEqual(version, 0)
+
+    def test_get_projection_no_fields_hides_internal_fields(self):
+        # Act
+        projection = MongoAdapter._get_projection('test_col', None)
+
+        # Assert
+        self.assertEqual(projection, {'password': False, 'offers': False, 'service_names': False,
+                                      'version': False, 'updated_at': False})
+
+    @patch.dict('users.utils.db.mongo_adapter.PROJECTABLE_FIELDS',
+                {'test_col': ['name', 'pics', 'pics.profile']})
+    def test_get_projection_whitelisted_fields_included(self):
+        # Act
+        projection = MongoAdapter._get_projection('test_col', ['name', 'pics.profile'])
+
+        # Assert
+        self.assertEqual(projection, {'name': True, 'pics.profile': True})
+
+    @patch.dict('users.utils.db.mongo_adapter.PROJECTABLE_FIELDS',
+                {'test_col': ['name', 'pics', 'pics.profile']})
+    def test_get_projection_parent_and_subfield_keeps_parent(self):
+        # Act
+        projection = MongoAdapter._get_projection('test_col', ['pics', 'pics.profile'])
+
+        # Assert
+        self.assertEqual(projection, {'pics': True})
+
+    @patch.dict('users.utils.db.mongo_adapter.PROJECTABLE_FIELDS', {'test_col': ['name']})
+    def test_get_projection_not_whitelisted_raises_value_error(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            MongoAdapter._get_projection('test_col', ['name', 'password'])
+
+    def test_get_object_id_invalid_raises_value_error(self):
+        # Setup
+        self.mocks['obj_id'].side_effect = InvalidId
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            MongoAdapter._get_object_id('not_an_id')
+
     def test_get_id_filter_returns_obj_id_in_dict(self):
         # Setup
         user_id = 'user_id'
@@ -307,3 +1126,31 @@ class MongoAdapterTestCase(unittest.TestCase):
 
         # Assert
         self.assertEqual(id_filter, {'_id': self.mocks['obj_id']()})
+
+
+class GetDocumentIdTestCase(unittest.TestCase):
+
+    def test_get_document_id_raw_reads_header(self):
+        # Setup
+        object_id = ObjectId('5f5b8d4e1c9d440000a1b2c3')
+        raw = RawBSONDocument(bson.encode({'name': 'Pet', '_id': object_id}))
+
+        # Act
+        with patch.object(RawBSONDocument, '__getitem__') as getitem_mock:
+            document_id = get_document_id(raw)
+
+        # Assert
+        self.assertEqual(document_id, '5f5b8d4e1c9d440000a1b2c3')
+        getitem_mock.assert_not_called()
+
+    def test_get_document_id_raw_without_leading_id_decodes(self):
+        # Setup
+        raw = RawBSONDocument(bson.encode({'_id': 'custom', 'name': 'Pet'}))
+
+        # Act & Assert
+        self.assertEqual(get_document_id(raw), 'custom')
+
+    def test_get_document_id_dict(self):
+        # Act & Assert
+        self.assertEqual(get_document_id({'_id': ObjectId('5f5b8d4e1c9d440000a1b2c3')}),
+                         '5f5b8d4e1c9d440000a1b2c3')
@@ -0,0 +1,95 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from users.utils.db.pool_metrics import PoolMetricsListener
+
+
+PRIMARY = ('primary', 27017)
+SECONDARY = ('secondary', 27017)
+
+
+class PoolMetricsListenerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.listener = PoolMetricsListener(max_pool_size=4)
+
+    @patch('users.utils.db.pool_metrics.time')
+    def test_checkout_records_wait_and_usage(self, time_mock):
+        # Setup
+        time_mock.monotonic.side_effect = [10.0, 10.25]
+
+        # Act
+        self.listener.connection_check_out_started(MagicMock(address=PRIMARY))
+        self.listener.connection_checked_out(MagicMock(address=PRIMARY))
+
+        # Assert
+        stats = self.listener.stats()
+        self.assertEqual(stats['checkouts'], 1)
+        self.assertEqual(stats['wait_ms_max'], 250.0)
+        self.assertEqual(stats['wait_ms_avg'], 250.0)
+        self.assertEqual(stats['waiting'], 0)
+        self.assertEqual(stats['in_use'], 1)
+        self.assertEqual(stats['saturation'], 0.25)
+
+    def test_saturation_is_the_busiest_servers(self):
+        # Setup
+        for address in (PRIMARY, PRIMARY, PRIMARY, SECONDARY):
+            self.listener.connection_check_out_started(MagicMock(address=address))
+            self.listener.connection_checked_out(MagicMock(address=address))
+
+        # Act
+        stats = self.listener.stats()
+
+        # Assert
+        self.assertEqual(stats['in_use'], 4)
+        self.assertEqual(stats['saturation'], 0.75)
+        self.assertEqual(stats['servers'], {
+            'primary:27017': {'in_use': 3, 'in_use_max': 3, 'waiting': 0},
+            'secondary:27017': {'in_use': 1, 'in_use_max': 1, 'waiting': 0}
+        })
+
+    def test_checked_in_releases_connection(self):
+        # Setup
+        self.listener.connection_check_out_started(MagicMock(address=PRIMARY))
+        self.listener.connection_checked_out(MagicMock(address=PRIMARY))
+
+        # Act
+        self.listener.connection_checked_in(MagicMock(address=PRIMARY))
+
+        # Assert
+        stats = self.listener.stats()
+        self.assertEqual(stats['in_use'], 0)
+        self.assertEqual(stats['in_use_max'], 1)
+
+    def test_checkout_timeout_counted(self):
+        # Setup
+        self.listener.connection_check_out_started(MagicMock(address=PRIMARY))
+
+        # Act
+        self.listener.connection_check_out_failed(MagicMock(address=PRIMARY, reason='timeout'))
+
+        # Assert
+        stats = self.listener.stats()
+        self.assertEqual(stats['checkout_failures'], 1)
+        self.assertEqual(stats['checkout_timeouts'], 1)
+        self.assertEqual(stats['waiting'], 0)
+
+    def test_connections_lifecycle_counted(self):
+        # Act
+        self.listener.connection_created(MagicMock())
+        self.listener.connection_created(MagicMock())
+        self.listener.connection_closed(MagicMock())
+        self.listener.pool_cleared(MagicMock())
+
+        # Assert
+        stats = self.listener.stats()
+        self.assertEqual((stats['created'], stats['closed'], stats['open']), (2, 1, 1))
+        self.assertEqual(stats['pool_clears'], 1)
+
+    def test_stats_without_checkouts_no_division_by_zero(self):
+        # Act
+        stats = self.listener.stats()
+
+        # Assert
+        self.assertEqual(stats['wait_ms_avg'], 0.0)
+        self.assertEqual(stats['saturation'], 0.0)
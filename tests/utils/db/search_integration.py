@@ -0,0 +1,100 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from bson.objectid import ObjectId
+from pymongo import MongoClient
+
+from users.utils.db.indexes import INDEXES, IndexManager
+from users.utils.db.mongo_adapter import MongoAdapter
+from users.utils.db.summaries import summarize_services
+from users.utils.env_vars import SHOPS_COLLECTION
+
+
+TEST_CONNECTION_STRING = os.environ.get('MONGO_TEST_CONNECTION_STRING')
+
+
+# pylint: disable=protected-access
+@unittest.skipUnless(TEST_CONNECTION_STRING, 'MONGO_TEST_CONNECTION_STRING is not set')
+class SearchIntegrationTestCase(unittest.TestCase):
+    """ Runs the text search against a real mongod, e.g.
+        MONGO_TEST_CONNECTION_STRING=mongodb://localhost:27017
+    """
+
+    def setUp(self):
+        self.client = MongoClient(TEST_CONNECTION_STRING)
+        self.db_ = self.client.petlife_test
+        self.client.drop_database('petlife_test')
+
+        shops_patch = patch('users.utils.db.mongo_adapter.SHOPS_COLLECTION', new='shops')
+        shops_patch.start()
+        self.addCleanup(shops_patch.stop)
+
+        for name, value in (('ITEM_COLLECTIONS', {'shops': ('services', 'services')}),
+                            ('ITEM_SUMMARIES', {'shops': summarize_services})):
+            setting_patch = patch.dict(f'users.utils.db.mongo_adapter.{name}', value)
+            setting_patch.start()
+            self.addCleanup(setting_patch.stop)
+
+        IndexManager(self.db_, {'shops': INDEXES[SHOPS_COLLECTION]}).sync()
+
+        self.adapter = MongoAdapter.__new__(MongoAdapter)
+        self.adapter.db_ = self.db_
+
+    def tearDown(self):
+        self.client.drop_database('petlife_test')
+        self.client.close()
+
+    def test_search_ranks_name_over_services_and_description(self):
+        # Setup
+        self.db_.shops.insert_many([
+            {'name': 'Pet Feliz', 'description': 'Fazemos banho', 'username': 'desc'},
+            {'name': 'Casa do Cão', 'service_names': ['Banho e tosa'], 'username': 'service'},
+            {'name': 'Banho Bom', 'username': 'name'},
+            {'name': 'Ração Barata', 'username': 'none'}
+        ])
+
+        # Act
+        shops = list(self.adapter.search_shops('banho', limit=2))
+
+        # Assert
+        self.assertEqual([shop['username'] for shop in shops], ['name', 'service'])
+        self.assertTrue(all(isinstance(shop['_id'], str) for shop in shops))
+        self.assertEqual(
+            [shop['username'] for shop in self.adapter.search_shops('banho', skip=2)], ['desc']
+        )
+
+    def test_interleaved_item_writes_keep_both_offers(self):
+        # Setup
+        shop_id = self.db_.shops.insert_one({'username': 'shop', 'version': 1}).inserted_id
+        first = {'_id': ObjectId(), 'owner_id': shop_id, 'service_name': 'Banho'}
+        second = {'_id': ObjectId(), 'owner_id': shop_id, 'service_name': 'Tosa'}
+        self.db_.services.insert_many([first, second])
+
+        # Act
+        # Both items are inserted before either owner update, the second's lands first
+        self.adapter._touch_owner('shops', shop_id, {second['_id']: second}, added=True)
+        self.adapter._touch_owner('shops', shop_id, {first['_id']: first}, added=True)
+
+        # Assert
+        shop = self.db_.shops.find_one({'_id': shop_id})
+        self.assertCountEqual([offer['item_id'] for offer in shop['offers']],
+                              [first['_id'], second['_id']])
+        self.assertCountEqual(shop['service_names'], ['banho', 'tosa'])
+        self.assertEqual(shop['version'], 3)
+
+    def test_item_update_landing_after_its_removal_adds_no_offers(self):
+        # Setup
+        shop_id = self.db_.shops.insert_one({'username': 'shop'}).inserted_id
+        item = {'_id': ObjectId(), 'owner_id': shop_id, 'service_name': 'Banho'}
+        self.db_.services.insert_one(item)
+        self.adapter._touch_owner('shops', shop_id, {item['_id']: item}, added=True)
+        self.db_.services.delete_one({'_id': item['_id']})
+        self.adapter._touch_owner('shops', shop_id, {item['_id']: None})
+
+        # Act
+        self.adapter._touch_owner('shops', shop_id, {item['_id']: dict(item, price='20')})
+
+        # Assert
+        shop = self.db_.shops.find_one({'_id': shop_id})
+        self.assertEqual((shop['offers'], shop['service_names']), ([], []))
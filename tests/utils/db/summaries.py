@@ -0,0 +1,108 @@
+import unittest
+
+from users.utils.db.summaries import summarize_services, get_offers_query, get_offers_update, \
+    get_service_names, normalize_key, parse_price, replace_offers
+
+
+class SummariesTestCase(unittest.TestCase):
+
+    def test_summarize_services_one_offer_per_species(self):
+        # Setup
+        services = [
+            {'_id': 1, 'service_name': 'Tosa', 'service_id': 'groom',
+             'species': ['Cão', 'gato'], 'price': 'R$ 80,00'},
+            {'_id': 2, 'service_name': 'Banho', 'service_id': 'bath', 'price': '45.5'},
+            {'_id': 3, 'service_name': 'Tosa', 'service_id': 'groom', 'species': 'gato'},
+            {'_id': 4, 'service_name': 'Vacina', 'service_id': 'vaccine', 'species': []}
+        ]
+
+        # Act
+        summary = summarize_services(services)
+
+        # Assert
+        self.assertEqual(summary['service_names'], ['banho', 'tosa', 'vacina'])
+        self.assertEqual(summary['offers'], [
+            {'item_id': 1, 'service_id': 'groom', 'name': 'tosa', 'price': 80.0, 'species': 'cao'},
+            {'item_id': 1, 'service_id': 'groom', 'name': 'tosa', 'price': 80.0,
+             'species': 'gato'},
+            {'item_id': 2, 'service_id': 'bath', 'name': 'banho', 'price': 45.5, 'species': None},
+            {'item_id': 3, 'service_id': 'groom', 'name': 'tosa', 'price': None,
+             'species': 'gato'},
+            {'item_id': 4, 'service_id': 'vaccine', 'name': 'vacina', 'price': None,
+             'species': None}
+        ])
+
+    def test_summarize_services_no_services(self):
+        # Act & Assert
+        self.assertEqual(summarize_services([]), {'service_names': [], 'offers': []})
+
+    def test_get_service_names_distinct_and_sorted(self):
+        # Setup
+        offers = [{'name': 'tosa'}, {'name': None}, {'name': 'banho'}, {'name': 'tosa'}, {}]
+
+        # Act & Assert
+        self.assertEqual(get_service_names(offers), ['banho', 'tosa'])
+
+    def test_get_offers_update_keeps_other_items_offers(self):
+        # Act
+        update = get_offers_update([1], [{'item_id': 1}], added=True)
+
+        # Assert
+        self.assertEqual(update, {'$concatArrays': [
+            {'$filter': {'input': {'$ifNull': ['$offers', []]}, 'as': 'offer',
+                         'cond': {'$not': [{'$in': ['$$offer.item_id', [1]]}]}}},
+            {'$literal': [{'item_id': 1}]}
+        ]})
+
+    def test_get_offers_update_replaces_only_present_items(self):
+        # Act
+        update = get_offers_update([1], [{'item_id': 1}])
+
+        # Assert
+        replaced = {'$filter': {'input': {'$ifNull': ['$offers', []]}, 'as': 'offer',
+                                'cond': {'$in': ['$$offer.item_id', [1]]}}}
+        self.assertEqual(update['$concatArrays'][1], {'$cond': [
+            {'$gt': [{'$size': replaced}, 0]}, {'$literal': [{'item_id': 1}]}, []
+        ]})
+
+    def test_replace_offers(self):
+        # Setup
+        current = [{'item_id': 1, 'price': 10}, {'item_id': 2, 'price': 20}]
+
+        # Act & Assert
+        self.assertEqual(replace_offers(current, [1], [{'item_id': 1, 'price': 15}]),
+                         [{'item_id': 2, 'price': 20}, {'item_id': 1, 'price': 15}])
+        self.assertEqual(replace_offers(current, [2], []), [{'item_id': 1, 'price': 10}])
+        self.assertEqual(replace_offers(current, [3], [{'item_id': 3}]), current)
+        self.assertEqual(replace_offers(current, [3], [{'item_id': 3}], added=True),
+                         current + [{'item_id': 3}])
+
+    def test_get_offers_query_combines_filters_in_one_elem_match(self):
+        # Act
+        query = get_offers_query({'service_id': 'groom', 'service_name': 'Vacinação',
+                                  'species': 'Gato', 'min_price': 0.0, 'max_price': 80.0})
+
+        # Assert
+        self.assertEqual(query, {'offers': {'$elemMatch': {
+            'service_id': 'groom', 'name': 'vacinacao', 'species': 'gato',
+            'price': {'$gte': 0.0, '$lte': 80.0}
+        }}})
+
+    def test_get_offers_query_without_filters_is_empty(self):
+        # Act & Assert
+        self.assertEqual(get_offers_query({'service_id': None}), {})
+
+    def test_normalize_key_strips_case_accents_and_spaces(self):
+        # Act & Assert
+        self.assertEqual(normalize_key('  Banho  e TOSA Ção '), 'banho e tosa cao')
+        self.assertIsNone(normalize_key(''))
+        self.assertIsNone(normalize_key(None))
+
+    def test_parse_price_formats(self):
+        # Act & Assert
+        self.assertEqual(parse_price('R$ 1.200,50'), 1200.5)
+        self.assertEqual(parse_price('80,00'), 80.0)
+        self.assertEqual(parse_price('80.5'), 80.5)
+        self.assertEqual(parse_price(75), 75.0)
+        self.assertIsNone(parse_price('sob consulta'))
+        self.assertIsNone(parse_price(None))
@@ -0,0 +1,53 @@
+import unittest
+
+from flask import Flask, Response
+
+from users.utils.etag import get_not_modified, make_etag, set_etag
+
+
+class EtagTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+
+    def test_make_etag_same_parts_same_tag(self):
+        # Act
+        etag = make_etag('shops', 3, 10, None, ['name'])
+
+        # Assert
+        self.assertEqual(etag, make_etag('shops', 3, 10, None, ['name']))
+        self.assertNotEqual(etag, make_etag('shops', 4, 10, None, ['name']))
+        self.assertNotEqual(etag, make_etag('shops', 3, 10, None, None))
+
+    def test_get_not_modified_matching_tag_returns_304(self):
+        # Act
+        with self.app.test_request_context(headers={'If-None-Match': '"other", "tag"'}):
+            response = get_not_modified('tag')
+
+        # Assert
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], '"tag"')
+        self.assertEqual(response.data, b'')
+
+    def test_get_not_modified_weak_tag_matches(self):
+        # Act
+        with self.app.test_request_context(headers={'If-None-Match': 'W/"tag"'}):
+            response = get_not_modified('tag')
+
+        # Assert
+        self.assertEqual(response.status_code, 304)
+
+    def test_get_not_modified_other_or_no_tag_returns_none(self):
+        # Act & Assert
+        with self.app.test_request_context(headers={'If-None-Match': '"other"'}):
+            self.assertIsNone(get_not_modified('tag'))
+        with self.app.test_request_context():
+            self.assertIsNone(get_not_modified('tag'))
+
+    def test_set_etag_tags_response_for_revalidation(self):
+        # Act
+        response = set_etag(Response(b'[]'), 'tag')
+
+        # Assert
+        self.assertEqual(response.headers['ETag'], '"tag"')
+        self.assertEqual(response.headers['Cache-Control'], 'private, no-cache')
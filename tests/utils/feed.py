@@ -0,0 +1,155 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from users.utils.feed import ShopFeed, RESET_FRAME, get_event_id
+
+
+class ShopFeedTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.patches = []
+
+        shops_col_patch = patch('users.utils.feed.SHOPS_COLLECTION', new='shops')
+        shops_col_patch.start()
+        self.patches.append(shops_col_patch)
+
+        self.feed = ShopFeed(3)
+
+    def tearDown(self):
+        for patch_ in self.patches:
+            patch_.stop()
+
+    @staticmethod
+    def _get_change(operation, token='82aa', **extra):
+        return dict({
+            '_id': {'_data': token},
+            'operationType': operation,
+            'ns': {'db': 'petlife', 'coll': 'shops'},
+            'documentKey': {'_id': 'shop_id'}
+        }, **extra)
+
+    def test_on_change_update_lists_changed_fields(self):
+        # Setup
+        change = self._get_change('update', updateDescription={
+            'updatedFields': {'pics.profile': 'p.png', 'offers': [], 'service_names': [],
+                              'updated_at': 'now', 'version': 2},
+            'removedFields': ['hours']
+        })
+
+        # Act
+        self.feed.on_change(change)
+
+        # Assert
+        self.assertEqual(self.feed.read(0)[0], [
+            b'id: 82aa\ndata: {"_id":"shop_id","op":"update",'
+            b'"fields":["hours","pics","services"]}\n\n'
+        ])
+
+    def test_on_change_bookkeeping_update_adds_nothing(self):
+        # Setup
+        change = self._get_change('update', updateDescription={
+            'updatedFields': {'password': 'hash'}, 'removedFields': []
+        })
+
+        # Act
+        self.feed.on_change(change)
+
+        # Assert
+        self.assertEqual(self.feed.read(0), ([], 0, False))
+
+    def test_on_change_insert_has_no_fields(self):
+        # Setup
+        change = self._get_change('insert', fullDocument={'name': 'Pet'})
+
+        # Act
+        self.feed.on_change(change)
+
+        # Assert
+        self.assertEqual(self.feed.read(0)[0], [
+            b'id: 82aa\ndata: {"_id":"shop_id","op":"insert"}\n\n'
+        ])
+
+    def test_on_change_delete_has_no_fields(self):
+        # Act
+        self.feed.on_change(self._get_change('delete'))
+
+        # Assert
+        self.assertEqual(self.feed.read(0)[0], [
+            b'id: 82aa\ndata: {"_id":"shop_id","op":"delete"}\n\n'
+        ])
+
+    def test_on_change_other_collection_ignored(self):
+        # Setup
+        change = self._get_change('delete', ns={'db': 'petlife', 'coll': 'clients'})
+
+        # Act
+        self.feed.on_change(change)
+
+        # Assert
+        self.assertEqual(self.feed.read(0), ([], 0, False))
+
+    def test_on_change_collection_wide_event_resets(self):
+        # Setup
+        change = self._get_change('drop')
+        del change['documentKey']
+
+        # Act
+        self.feed.on_change(change)
+
+        # Assert
+        self.assertEqual(self.feed.read(0)[0], [RESET_FRAME])
+
+    def test_on_change_calls_listeners(self):
+        # Setup
+        listener = MagicMock()
+        self.feed.subscribe(listener)
+
+        # Act
+        self.feed.on_change(self._get_change('delete'))
+        self.feed.on_reset()
+
+        # Assert
+        self.assertEqual(listener.call_count, 2)
+
+    def test_get_position_finds_kept_event(self):
+        # Setup
+        for token in ('01', '02', '03'):
+            self.feed.on_change(self._get_change('delete', token))
+
+        # Act & Assert
+        self.assertEqual(self.feed.get_position('02'), (2, True))
+        self.assertEqual(self.feed.get_position('unknown'), (3, False))
+        self.assertEqual(self.feed.get_position(None), (3, False))
+
+    def test_read_returns_frames_after_position(self):
+        # Setup
+        for token in ('01', '02', '03'):
+            self.feed.on_change(self._get_change('delete', token))
+
+        # Act
+        frames, position, missed = self.feed.read(1)
+
+        # Assert
+        self.assertEqual(len(frames), 2)
+        self.assertTrue(frames[0].startswith(b'id: 02\n'))
+        self.assertEqual(position, 3)
+        self.assertFalse(missed)
+
+    def test_read_dropped_frames_reports_missed(self):
+        # Setup
+        for token in ('01', '02', '03', '04', '05'):
+            self.feed.on_change(self._get_change('delete', token))
+
+        # Act
+        frames, position, missed = self.feed.read(1)
+
+        # Assert
+        self.assertEqual(len(frames), 3)
+        self.assertEqual(position, 5)
+        self.assertTrue(missed)
+
+    def test_get_event_id_uses_token_data(self):
+        # Act & Assert
+        self.assertEqual(get_event_id({'_data': '8263'}), '8263')
+        self.assertEqual(get_event_id({'_data': b'\x01'}), get_event_id({'_data': b'\x01'}))
+        self.assertNotIn('\n', get_event_id({'_data': b'\x01'}))
@@ -0,0 +1,94 @@
+import unittest
+from unittest.mock import patch
+
+from users.utils.invalidation import CacheInvalidator
+
+
+class CacheInvalidatorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.patches = []
+        self.mocks = {}
+
+        cache_patch = patch('users.utils.invalidation.get_listing_cache')
+        self.mocks['cache'] = cache_patch.start()
+        self.patches.append(cache_patch)
+
+        name_index_patch = patch('users.utils.invalidation.get_name_index')
+        self.mocks['name_index'] = name_index_patch.start()
+        self.patches.append(name_index_patch)
+
+        mongo_patch = patch('users.utils.invalidation.get_mongo_adapter')
+        self.mocks['mongo'] = mongo_patch.start()
+        self.patches.append(mongo_patch)
+
+        shops_col_patch = patch('users.utils.invalidation.SHOPS_COLLECTION', new='shops')
+        shops_col_patch.start()
+        self.patches.append(shops_col_patch)
+
+    def tearDown(self):
+        for patch_ in self.patches:
+            patch_.stop()
+
+    @staticmethod
+    def _get_change(operation, **extra):
+        return dict({
+            'operationType': operation,
+            'ns': {'db': 'petlife', 'coll': 'shops'},
+            'documentKey': {'_id': 'shop_id'}
+        }, **extra)
+
+    def test_on_change_insert_invalidates_new_shop(self):
+        # Act
+        CacheInvalidator.on_change(self._get_change('insert', fullDocument={'name': 'Pet'}))
+
+        # Assert
+        self.mocks['cache'].return_value.invalidate_new_user.assert_called_with('shop_id')
+        self.mocks['name_index'].return_value.add.assert_called_with('shop_id', 'Pet')
+
+    def test_on_change_update_invalidates_shop(self):
+        # Act
+        CacheInvalidator.on_change(self._get_change('update', updateDescription={
+            'updatedFields': {'name': 'Pet', 'address': 'Rua'}, 'removedFields': []
+        }))
+
+        # Assert
+        self.mocks['cache'].return_value.invalidate_user.assert_called_with('shop_id')
+        self.mocks['name_index'].return_value.add.assert_called_with('shop_id', 'Pet')
+
+    def test_on_change_update_without_name_keeps_name_index(self):
+        # Act
+        CacheInvalidator.on_change(self._get_change('update', updateDescription={
+            'updatedFields': {'address': 'Rua'}, 'removedFields': []
+        }))
+
+        # Assert
+        self.mocks['cache'].return_value.invalidate_user.assert_called_with('shop_id')
+        self.mocks['name_index'].return_value.add.assert_not_called()
+
+    def test_on_change_delete_removes_shop(self):
+        # Act
+        CacheInvalidator.on_change(self._get_change('delete'))
+
+        # Assert
+        self.mocks['cache'].return_value.invalidate_user.assert_called_with('shop_id')
+        self.mocks['name_index'].return_value.remove.assert_called_with('shop_id')
+
+    def test_on_change_other_collection_ignored(self):
+        # Act
+        CacheInvalidator.on_change({'operationType': 'update', 'ns': {'coll': 'clients'},
+                                    'documentKey': {'_id': 'client_id'}})
+
+        # Assert
+        self.mocks['cache'].assert_not_called()
+        self.mocks['name_index'].assert_not_called()
+
+    def test_on_change_collection_event_resets(self):
+        # Act
+        CacheInvalidator.on_change({'operationType': 'drop', 'ns': {'coll': 'shops'}})
+
+        # Assert
+        self.mocks['cache'].return_value.clear.assert_called_once()
+        self.mocks['name_index'].return_value.build.assert_called_with(
+            self.mocks['mongo'].return_value.get_shop_names.return_value
+        )
@@ -0,0 +1,107 @@
+import json
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+import bson
+from bson.objectid import ObjectId
+from bson.raw_bson import RawBSONDocument
+from flask import Flask
+
+from users.utils.json_encoder import encode, jsonify, output_json, JSONEncoder
+
+
+class JsonEncoderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.doc = {
+            '_id': ObjectId('5f5b8d4e1c9d440000a1b2c3'),
+            'name': 'Pet Feliz',
+            'created_at': datetime(2020, 9, 11, 14, 30)
+        }
+        self.expected = {
+            '_id': '5f5b8d4e1c9d440000a1b2c3',
+            'name': 'Pet Feliz',
+            'created_at': '2020-09-11T14:30:00'
+        }
+
+    def test_encode_object_ids_and_dates(self):
+        # Act
+        body = encode(self.doc)
+
+        # Assert
+        self.assertEqual(json.loads(body), self.expected)
+
+    @patch('users.utils.json_encoder.orjson', new=None)
+    def test_encode_without_orjson_same_result(self):
+        # Act
+        body = encode(self.doc)
+
+        # Assert
+        self.assertEqual(json.loads(body), self.expected)
+
+    @patch('users.utils.json_encoder.orjson', new=None)
+    def test_encode_without_orjson_keeps_utf8(self):
+        # Act
+        body = encode({'name': 'Vacinação'})
+
+        # Assert
+        self.assertEqual(body, '{"name":"Vacinação"}'.encode('utf-8'))
+
+    def test_encode_unknown_type_raises_type_error(self):
+        # Act & Assert
+        with self.assertRaises(TypeError):
+            encode({'value': object()})
+
+    def test_jsonify_returns_json_response(self):
+        # Setup
+        app = Flask(__name__)
+
+        # Act
+        with app.app_context():
+            response = jsonify(self.doc)
+
+        # Assert
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(json.loads(response.data), self.expected)
+
+    def test_output_json_sets_code_and_headers(self):
+        # Setup
+        app = Flask(__name__)
+
+        # Act
+        with app.test_request_context():
+            response = output_json(self.doc, 201, {'X-Test': 'yes'})
+
+        # Assert
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.headers['X-Test'], 'yes')
+        self.assertEqual(json.loads(response.data), self.expected)
+
+    def test_flask_encoder_encodes_object_ids_and_dates(self):
+        # Act
+        body = json.dumps(self.doc, cls=JSONEncoder)
+
+        # Assert
+        self.assertEqual(json.loads(body), self.expected)
+
+    def test_encode_raw_bson_documents(self):
+        # Setup
+        raw = RawBSONDocument(bson.encode(self.doc))
+
+        # Act
+        body = encode([raw, {'nested': raw}])
+
+        # Assert
+        self.assertEqual(json.loads(body), [self.expected, {'nested': self.expected}])
+
+    @patch('users.utils.json_encoder.orjson', new=None)
+    def test_encode_raw_bson_documents_without_orjson(self):
+        # Setup
+        raw = RawBSONDocument(bson.encode(self.doc))
+
+        # Act
+        body = encode(raw)
+
+        # Assert
+        self.assertEqual(json.loads(body), self.expected)
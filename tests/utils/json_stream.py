@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import patch
+
+from bson.objectid import ObjectId
+
+from users.utils.json_stream import stream_json_list, stream_json_object, encode_json_list, \
+    json_response, _generate_json_list, _generate_json_object
+
+
+# pylint: disable=protected-access
+class JsonStreamTestCase(unittest.TestCase):
+
+    @patch('users.utils.json_stream.stream_with_context')
+    @patch('users.utils.json_stream.Response')
+    def test_stream_json_list_returns_json_response(self, response_mock, stream_mock):
+        # Act
+        response = stream_json_list([])
+
+        # Assert
+        response_mock.assert_called_with(
+            stream_mock.return_value,
+            mimetype='application/json'
+        )
+        self.assertEqual(response, response_mock.return_value)
+
+    def test_generate_json_list_writes_valid_array(self):
+        # Act
+        body = b''.join(_generate_json_list(iter([{'_id': '1'}, {'_id': '2'}])))
+
+        # Assert
+        self.assertEqual(body, b'[{"_id":"1"},{"_id":"2"}]\n')
+
+    def test_generate_json_list_encodes_object_ids(self):
+        # Act
+        body = b''.join(_generate_json_list(iter([{'_id': ObjectId('5f5b8d4e1c9d440000a1b2c3')}])))
+
+        # Assert
+        self.assertEqual(body, b'[{"_id":"5f5b8d4e1c9d440000a1b2c3"}]\n')
+
+    def test_generate_json_list_empty_writes_empty_array(self):
+        # Act
+        body = b''.join(_generate_json_list(iter([])))
+
+        # Assert
+        self.assertEqual(body, b'[]\n')
+
+    @patch('users.utils.json_stream.stream_with_context')
+    @patch('users.utils.json_stream.Response')
+    def test_stream_json_object_returns_json_response(self, response_mock, stream_mock):
+        # Act
+        response = stream_json_object({}, 'items', [])
+
+        # Assert
+        response_mock.assert_called_with(
+            stream_mock.return_value,
+            mimetype='application/json'
+        )
+        self.assertEqual(response, response_mock.return_value)
+
+    def test_generate_json_object_streams_list_last(self):
+        # Act
+        body = b''.join(_generate_json_object({'deleted': ['1']}, 'shops',
+                                              iter([{'_id': '2'}, {'_id': '3'}])))
+
+        # Assert
+        self.assertEqual(body, b'{"deleted":["1"],"shops":[{"_id":"2"},{"_id":"3"}]}\n')
+
+    def test_generate_json_object_only_list(self):
+        # Act
+        body = b''.join(_generate_json_object({}, 'shops', iter([])))
+
+        # Assert
+        self.assertEqual(body, b'{"shops":[]}\n')
+
+    def test_encode_json_list_same_as_streamed(self):
+        # Act
+        body = encode_json_list([{'_id': '1'}, {'_id': '2'}])
+
+        # Assert
+        self.assertEqual(body, b'[{"_id":"1"},{"_id":"2"}]\n')
+
+    @patch('users.utils.json_stream.Response')
+    def test_json_response_sends_body(self, response_mock):
+        # Act
+        response = json_response(b'[]\n')
+
+        # Assert
+        response_mock.assert_called_with(b'[]\n', mimetype='application/json')
+        self.assertEqual(response, response_mock.return_value)
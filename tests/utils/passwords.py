@@ -0,0 +1,167 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from users.utils.passwords import PasswordHasher, get_password_hasher
+
+
+# pylint: disable=protected-access, consider-using-with
+class PasswordHasherTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.hasher = PasswordHasher(iterations=1000, workers=0, max_pending=1)
+
+    def test_hash_encodes_algorithm_and_iterations(self):
+        # Act
+        stored = self.hasher.hash('secret')
+
+        # Assert
+        self.assertTrue(stored.startswith('pbkdf2_sha256$1000$'))
+        self.assertNotEqual(stored, self.hasher.hash('secret'))
+
+    def test_hash_many_one_hash_per_password(self):
+        # Act
+        stored = self.hasher.hash_many(['secret', 'other'])
+
+        # Assert
+        self.assertEqual(len(stored), 2)
+        self.assertEqual(self.hasher.verify('other', stored[1]), (True, False))
+
+    def test_dummy_hash_is_kept_and_matches_nothing(self):
+        # Act
+        dummy_hash = self.hasher.dummy_hash
+
+        # Assert
+        self.assertIs(self.hasher.dummy_hash, dummy_hash)
+        self.assertTrue(dummy_hash.startswith('pbkdf2_sha256$1000$'))
+        self.assertEqual(self.hasher.verify('', dummy_hash), (False, False))
+
+    def test_verify_right_password(self):
+        # Setup
+        stored = self.hasher.hash('secret')
+
+        # Act & Assert
+        self.assertEqual(self.hasher.verify('secret', stored), (True, False))
+
+    def test_verify_wrong_password(self):
+        # Setup
+        stored = self.hasher.hash('secret')
+
+        # Act & Assert
+        self.assertEqual(self.hasher.verify('guess', stored), (False, False))
+
+    def test_verify_weaker_hash_needs_rehash(self):
+        # Setup
+        stored = PasswordHasher(iterations=500, workers=0, max_pending=1).hash('secret')
+
+        # Act & Assert
+        self.assertEqual(self.hasher.verify('secret', stored), (True, True))
+
+    def test_verify_legacy_plain_text_needs_rehash(self):
+        # Act & Assert
+        self.assertEqual(self.hasher.verify('secret', 'secret'), (True, True))
+        self.assertEqual(self.hasher.verify('guess', 'secret'), (False, False))
+        self.assertEqual(self.hasher.verify('guess', None), (False, False))
+
+    @patch('users.utils.passwords.ProcessPoolExecutor')
+    def test_map_with_workers_uses_pool(self, executor_mock):
+        # Setup
+        hasher = PasswordHasher(iterations=1000, workers=2, max_pending=2)
+        executor_mock.return_value.map.return_value = iter([3, 2])
+
+        # Act
+        result = hasher._map(len, ['abc', 'de'])
+
+        # Assert
+        executor_mock.return_value.map.assert_called_with(len, ('abc', 'de'))
+        self.assertEqual(result, [3, 2])
+
+    @patch('users.utils.passwords.ProcessPoolExecutor')
+    def test_hash_many_takes_a_permit_per_hash(self, executor_mock):
+        # Setup
+        hasher = PasswordHasher(iterations=1000, workers=2, max_pending=2)
+        permits_left = []
+
+        def map_(func, *iterables):
+            permits_left.append(hasher._pending._value)
+            return map(func, *iterables)
+        executor_mock.return_value.map.side_effect = map_
+
+        # Act
+        stored = hasher.hash_many(['a', 'b', 'c', 'd', 'e'])
+
+        # Assert
+        self.assertEqual(len(stored), 5)
+        chunks = executor_mock.return_value.map.call_args_list
+        self.assertEqual([len(chunk[0][1]) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(permits_left, [0, 0, 1])
+        self.assertEqual(hasher._pending._value, 2)
+
+    @patch('users.utils.passwords.PENDING_TIMEOUT_SECONDS', new=0)
+    @patch('users.utils.passwords.ProcessPoolExecutor')
+    def test_map_partial_permits_released_on_timeout(self, _):
+        # Setup
+        hasher = PasswordHasher(iterations=1000, workers=2, max_pending=2)
+        hasher._pending.acquire()
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            hasher._map(len, ['abc', 'de'])
+        self.assertEqual(hasher._pending._value, 1)
+
+    @patch('users.utils.passwords.PENDING_TIMEOUT_SECONDS', new=0)
+    @patch('users.utils.passwords.ProcessPoolExecutor')
+    def test_map_too_many_pending_raises_runtime_error(self, _):
+        # Setup
+        hasher = PasswordHasher(iterations=1000, workers=2, max_pending=1)
+        hasher._pending.acquire()
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            hasher._map(len, ['abc'])
+
+
+class GetPasswordHasherTestCase(unittest.TestCase):
+
+    @staticmethod
+    @patch('users.utils.passwords.PasswordHasher')
+    def test_get_password_hasher_first_call(hasher_mock):
+        # Setup
+        get_password_hasher.hasher = None
+
+        # Act
+        get_password_hasher()
+
+        # Assert
+        hasher_mock.assert_called()
+
+    @staticmethod
+    @patch('users.utils.passwords.PasswordHasher')
+    def test_get_password_hasher_subsequent_calls(hasher_mock):
+        # Setup
+        get_password_hasher.hasher = True
+
+        # Act
+        get_password_hasher()
+
+        # Assert
+        hasher_mock.assert_not_called()
+
+    @staticmethod
+    @patch('users.utils.passwords.PasswordHasher')
+    def test_get_password_hasher_concurrent_calls_create_one(hasher_mock):
+        # Setup
+        get_password_hasher.hasher = None
+        hasher_mock.side_effect = lambda *_: time.sleep(0.05) or MagicMock()
+        threads = [threading.Thread(target=get_password_hasher) for _ in range(4)]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        hasher_mock.assert_called_once()
+        get_password_hasher.hasher = None
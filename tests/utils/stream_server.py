@@ -0,0 +1,191 @@
+import socket
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from jwt.exceptions import DecodeError
+
+from users.utils.feed import ShopFeed, RESET_FRAME
+from users.utils.stream_server import StreamServer, STREAM_HEADERS, HEARTBEAT_FRAME, \
+    parse_head, get_error_response
+
+
+class StreamServerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.patches = []
+        self.mocks = {}
+        self.sockets = []
+
+        decode_patch = patch('users.utils.stream_server.decode_token')
+        self.mocks['decode'] = decode_patch.start()
+        self.mocks['decode'].side_effect = lambda token: {
+            'valid': {'type': 'access'}, 'refresh': {'type': 'refresh'}
+        }.get(token) or self._raise(DecodeError)
+        self.patches.append(decode_patch)
+
+        shops_col_patch = patch('users.utils.feed.SHOPS_COLLECTION', new='shops')
+        shops_col_patch.start()
+        self.patches.append(shops_col_patch)
+
+        for name, value in (('STREAM_HEARTBEAT_SECONDS', 60),
+                            ('STREAM_MAX_CONNECTIONS', 2),
+                            ('SERVER_TIMEOUT', 5)):
+            setting_patch = patch(f'users.utils.stream_server.{name}', new=value)
+            setting_patch.start()
+            self.patches.append(setting_patch)
+
+        self.feed = ShopFeed(3)
+        self.server = StreamServer(MagicMock(), self.feed, 0)
+        self.server.start()
+
+    def tearDown(self):
+        for socket_ in self.sockets:
+            socket_.close()
+        self.server.stop()
+        for patch_ in self.patches:
+            patch_.stop()
+
+    @staticmethod
+    def _raise(error):
+        raise error
+
+    def _request(self, target, headers='', method='GET'):
+        socket_ = socket.create_connection(('127.0.0.1', self.server.port))
+        socket_.sendall(f'{method} {target} HTTP/1.1\r\nHost: test\r\n{headers}\r\n'.encode())
+        self.sockets.append(socket_)
+        return socket_
+
+    @staticmethod
+    def _receive(socket_, until):
+        # Reads until the expected bytes arrived or the server stopped sending
+        received = b''
+        deadline = time.monotonic() + 2
+        while until not in received and time.monotonic() < deadline:
+            socket_.settimeout(max(deadline - time.monotonic(), 0.01))
+            try:
+                data = socket_.recv(65536)
+            except socket.timeout:
+                break
+            if not data:
+                break
+            received += data
+        return received
+
+    def _add_event(self, token):
+        self.feed.on_change({
+            '_id': {'_data': token},
+            'operationType': 'delete',
+            'ns': {'db': 'petlife', 'coll': 'shops'},
+            'documentKey': {'_id': 'shop_id'}
+        })
+
+    def test_stream_sends_new_events(self):
+        # Setup
+        socket_ = self._request('/shops/stream?access_token=valid')
+        self._receive(socket_, STREAM_HEADERS)
+
+        # Act
+        self._add_event('01')
+        self._add_event('02')
+
+        # Assert
+        self.assertIn(b'id: 02\n', self._receive(socket_, b'id: 02\n'))
+
+    def test_stream_authorization_header_accepted(self):
+        # Act
+        socket_ = self._request('/shops/stream', 'Authorization: Bearer valid\r\n')
+
+        # Assert
+        self.assertEqual(self._receive(socket_, STREAM_HEADERS), STREAM_HEADERS)
+
+    def test_stream_resumes_after_last_event_id(self):
+        # Setup
+        for token in ('01', '02', '03'):
+            self._add_event(token)
+
+        # Act
+        socket_ = self._request('/shops/stream?access_token=valid', 'Last-Event-ID: 01\r\n')
+
+        # Assert
+        self.assertEqual(self._receive(socket_, b'id: 03\n'), STREAM_HEADERS + (
+            b'id: 02\ndata: {"_id":"shop_id","op":"delete"}\n\n'
+            b'id: 03\ndata: {"_id":"shop_id","op":"delete"}\n\n'
+        ))
+
+    def test_stream_unknown_last_event_id_resets(self):
+        # Setup
+        self._add_event('01')
+
+        # Act
+        socket_ = self._request('/shops/stream?access_token=valid', 'Last-Event-ID: gone\r\n')
+
+        # Assert
+        self.assertEqual(self._receive(socket_, RESET_FRAME), STREAM_HEADERS + RESET_FRAME)
+
+    def test_stream_idle_sends_heartbeat(self):
+        # Setup
+        with patch('users.utils.stream_server.STREAM_HEARTBEAT_SECONDS', new=0.05):
+            # Act
+            socket_ = self._request('/shops/stream?access_token=valid')
+
+            # Assert
+            self.assertIn(HEARTBEAT_FRAME, self._receive(socket_, HEARTBEAT_FRAME))
+
+    def test_stream_invalid_token_401(self):
+        # Act
+        for target in ('/shops/stream', '/shops/stream?access_token=nope',
+                       '/shops/stream?access_token=refresh'):
+            socket_ = self._request(target)
+
+            # Assert
+            self.assertTrue(self._receive(socket_, b'\n\n').startswith(
+                b'HTTP/1.1 401 Unauthorized\r\n'
+            ))
+
+    def test_other_path_404_and_method_405(self):
+        # Act
+        not_found = self._receive(self._request('/shops?access_token=valid'), b'}\n')
+        not_allowed = self._receive(self._request('/shops/stream', method='POST'), b'}\n')
+
+        # Assert
+        self.assertTrue(not_found.startswith(b'HTTP/1.1 404 Not Found\r\n'))
+        self.assertTrue(not_allowed.startswith(b'HTTP/1.1 405 Method Not Allowed\r\n'))
+
+    def test_too_many_streams_503(self):
+        # Setup
+        for _ in range(2):
+            self._receive(self._request('/shops/stream?access_token=valid'), STREAM_HEADERS)
+
+        # Act
+        response = self._receive(self._request('/shops/stream?access_token=valid'), b'}\n')
+
+        # Assert
+        self.assertTrue(response.startswith(b'HTTP/1.1 503 Service Unavailable\r\n'))
+
+    def test_parse_head_reads_line_arguments_and_headers(self):
+        # Act
+        method, path, args, headers = parse_head(
+            b'GET /shops/stream?access_token=t HTTP/1.1\r\nLast-Event-ID: 01\r\n\r\n'
+        )
+
+        # Assert
+        self.assertEqual((method, path), ('GET', '/shops/stream'))
+        self.assertEqual(args, {'access_token': ['t']})
+        self.assertEqual(headers, {'last-event-id': '01'})
+
+    def test_parse_head_malformed_raises_value_error(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            parse_head(b'nonsense\r\n\r\n')
+
+    def test_get_error_response_is_complete(self):
+        # Act
+        response = get_error_response(404, 'Nope')
+
+        # Assert
+        self.assertEqual(response, (
+            b'HTTP/1.1 404 Not Found\r\nContent-Type: application/json\r\n'
+            b'Content-Length: 17\r\nConnection: close\r\nAccess-Control-Allow-Origin: *\r\n'
+            b'\r\n{"extra":"Nope"}\n'
+        ))
@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import patch
+
+from users.utils.suggest import NameIndex, get_name_index
+
+
+class NameIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.index = NameIndex()
+        self.index.build([('1', 'Pet Feliz'), ('2', 'Petshop São João'), ('3', None)])
+
+    def test_build_skips_shops_without_name(self):
+        # Act & Assert
+        self.assertEqual(len(self.index), 2)
+
+    def test_suggest_matches_any_word_start(self):
+        # Act
+        suggestions = self.index.suggest('fel')
+
+        # Assert
+        self.assertEqual(suggestions, [{'_id': '1', 'name': 'Pet Feliz'}])
+
+    def test_suggest_case_and_accent_insensitive(self):
+        # Act
+        suggestions = self.index.suggest('SAO jo')
+
+        # Assert
+        self.assertEqual(suggestions, [{'_id': '2', 'name': 'Petshop São João'}])
+
+    def test_suggest_limit_and_unique_shops(self):
+        # Act
+        suggestions = self.index.suggest('pet', limit=1)
+
+        # Assert
+        self.assertEqual(suggestions, [{'_id': '1', 'name': 'Pet Feliz'}])
+        self.assertEqual(len(self.index.suggest('pet')), 2)
+
+    def test_suggest_blank_prefix_returns_nothing(self):
+        # Act & Assert
+        self.assertEqual(self.index.suggest('  '), [])
+
+    def test_add_renames_shop(self):
+        # Act
+        self.index.add('1', 'Banho Bom')
+
+        # Assert
+        self.assertEqual(self.index.suggest('feliz'), [])
+        self.assertEqual(self.index.suggest('banho'), [{'_id': '1', 'name': 'Banho Bom'}])
+
+    def test_add_new_shop(self):
+        # Act
+        self.index.add('4', 'Felino Feliz')
+
+        # Assert
+        self.assertEqual([shop['_id'] for shop in self.index.suggest('feli')], ['4', '1'])
+
+    def test_remove_drops_every_key(self):
+        # Act
+        self.index.remove('2')
+        self.index.remove('missing')
+
+        # Assert
+        self.assertEqual(self.index.suggest('sao'), [])
+        self.assertEqual(self.index.suggest('petshop'), [])
+        self.assertEqual(len(self.index), 1)
+
+    @staticmethod
+    @patch('users.utils.suggest.get_mongo_adapter')
+    def test_get_name_index_first_call_builds_from_shops(mongo_mock):
+        # Setup
+        get_name_index.index = None
+        mongo_mock.return_value.get_shop_names.return_value = [('1', 'Pet Feliz')]
+
+        # Act
+        index = get_name_index()
+
+        # Assert
+        assert index.suggest('pet') == [{'_id': '1', 'name': 'Pet Feliz'}]
+        assert get_name_index() is index
+        mongo_mock.return_value.get_shop_names.assert_called_once()
+        get_name_index.index = None
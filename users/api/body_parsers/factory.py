@@ -2,7 +2,9 @@ from users.api.body_parsers.parser import BodyParser
 from users.api.body_parsers.fields import AUTH_FIELDS, \
     CLIENTS_REGISTRATION_FIELDS, CLIENTS_UPDATE_FIELDS, PET_REMOVAL, \
     SHOPS_REGISTRATION_FIELDS, SHOPS_UPDATE_FIELDS, \
-    SERVICE_REMOVAL
+    SERVICE_REMOVAL, SHOP_LISTING, BATCH_REGISTRATION, ITEM_LISTING, \
+    SERVICE_PATCH, PET_PATCH, SHOP_NEARBY, SHOP_SEARCH, \
+    SHOP_SUGGEST, USER_LOOKUP, SHOP_CHANGES
 
 
 class BodyParserFactory:
@@ -17,11 +19,21 @@ class BodyParserFactory:
             'client_update': CLIENTS_UPDATE_FIELDS,
             'shop_update': SHOPS_UPDATE_FIELDS,
             'service_removal': SERVICE_REMOVAL,
-            'pet_removal': PET_REMOVAL
+            'pet_removal': PET_REMOVAL,
+            'shop_listing': SHOP_LISTING,
+            'batch_registration': BATCH_REGISTRATION,
+            'item_listing': ITEM_LISTING,
+            'service_patch': SERVICE_PATCH,
+            'pet_patch': PET_PATCH,
+            'shop_nearby': SHOP_NEARBY,
+            'shop_search': SHOP_SEARCH,
+            'shop_suggest': SHOP_SUGGEST,
+            'user_lookup': USER_LOOKUP,
+            'shop_changes': SHOP_CHANGES
         }
 
-    def get_parser(self, type_):
-        return BodyParser(self.types[type_])
+    def get_parser(self, type_, source=None):
+        return BodyParser(self.types[type_], source)
 
 
 FACTORY = BodyParserFactory()
@@ -1,3 +1,4 @@
+from flask_restful.inputs import datetime_from_iso8601, natural
 from werkzeug.datastructures import FileStorage
 
 
@@ -17,11 +18,13 @@ SHOPS_UPDATE_FIELDS = [
     {'name': 'phone_number', 'type': str, 'location': 'json', 'required': False,
      'store_missing': False},
     {'name': 'services', 'type': dict, 'location': 'json', 'required': False,
-     'store_missing': False},
+     'store_missing': False, 'action': 'append'},
     {'name': 'description', 'type': str, 'location': 'json', 'required': False,
      'store_missing': False},
     {'name': 'hours', 'type': str, 'location': 'json', 'required': False,
      'store_missing': False},
+    {'name': 'location', 'type': dict, 'location': 'json', 'required': False,
+     'store_missing': False},
     {'name': 'profile_pic', 'type': FileStorage, 'location': 'files', 'required': False,
      'store_missing': False},
     {'name': 'banner_pic', 'type': FileStorage, 'location': 'files', 'required': False,
@@ -35,7 +38,8 @@ CLIENTS_UPDATE_FIELDS = [
     {'name': 'address', 'type': str, 'location': 'json', 'required': False, 'store_missing': False},
     {'name': 'phone_number', 'type': str, 'location': 'json', 'required': False,
      'store_missing': False},
-    {'name': 'pets', 'type': dict, 'location': 'json', 'required': False, 'store_missing': False}
+    {'name': 'pets', 'type': dict, 'location': 'json', 'required': False, 'store_missing': False,
+     'action': 'append'}
 ]
 
 
@@ -46,7 +50,9 @@ SHOPS_REGISTRATION_FIELDS = [
     {'name': 'email', 'type': str, 'location': 'json', 'required': True},
     {'name': 'address', 'type': str, 'location': 'json', 'required': True},
     {'name': 'phone_number', 'type': str, 'location': 'json', 'required': True},
-    {'name': 'cnpj', 'type': str, 'location': 'json', 'required': True}
+    {'name': 'cnpj', 'type': str, 'location': 'json', 'required': True},
+    {'name': 'location', 'type': dict, 'location': 'json', 'required': False,
+     'store_missing': False}
 ]
 
 
@@ -63,10 +69,115 @@ CLIENTS_REGISTRATION_FIELDS = [
 
 
 SERVICE_REMOVAL = [
-    {'name': 'service_id', 'type': str, 'location': 'args', 'required': True}
+    {'name': 'service_id', 'type': str, 'location': 'args', 'required': False,
+     'store_missing': False},
+    {'name': 'item_id', 'type': str, 'location': 'args', 'required': False,
+     'store_missing': False}
 ]
 
 
 PET_REMOVAL = [
-    {'name': 'pet_name', 'type': str, 'location': 'args', 'required': True}
+    {'name': 'pet_name', 'type': str, 'location': 'args', 'required': False,
+     'store_missing': False},
+    {'name': 'item_id', 'type': str, 'location': 'args', 'required': False,
+     'store_missing': False}
+]
+
+
+SERVICE_PATCH = [
+    {'name': 'item_id', 'type': str, 'location': 'args', 'required': True},
+    {'name': 'service_name', 'type': str, 'location': 'json', 'required': False,
+     'store_missing': False},
+    {'name': 'service_id', 'type': str, 'location': 'json', 'required': False,
+     'store_missing': False},
+    {'name': 'price', 'type': str, 'location': 'json', 'required': False,
+     'store_missing': False},
+    {'name': 'species', 'type': str, 'location': 'json', 'required': False,
+     'store_missing': False, 'action': 'append'}
+]
+
+
+PET_PATCH = [
+    {'name': 'item_id', 'type': str, 'location': 'args', 'required': True},
+    {'name': 'name', 'type': str, 'location': 'json', 'required': False,
+     'store_missing': False},
+    {'name': 'species', 'type': str, 'location': 'json', 'required': False,
+     'store_missing': False},
+    {'name': 'breed', 'type': str, 'location': 'json', 'required': False,
+     'store_missing': False},
+    {'name': 'age_years', 'type': int, 'location': 'json', 'required': False,
+     'store_missing': False},
+    {'name': 'weight_kilos', 'type': float, 'location': 'json', 'required': False,
+     'store_missing': False}
+]
+
+
+SHOP_LISTING = [
+    {'name': 'limit', 'type': natural, 'location': 'args', 'required': False, 'default': 0},
+    {'name': 'after', 'type': str, 'location': 'args', 'required': False,
+     'store_missing': False},
+    {'name': 'fields', 'type': str, 'location': 'args', 'required': False,
+     'store_missing': False},
+    {'name': 'service_id', 'type': str, 'location': 'args', 'required': False,
+     'store_missing': False},
+    {'name': 'service_name', 'type': str, 'location': 'args', 'required': False,
+     'store_missing': False},
+    {'name': 'species', 'type': str, 'location': 'args', 'required': False,
+     'store_missing': False},
+    {'name': 'min_price', 'type': float, 'location': 'args', 'required': False,
+     'store_missing': False},
+    {'name': 'max_price', 'type': float, 'location': 'args', 'required': False,
+     'store_missing': False}
+]
+
+
+SHOP_CHANGES = [
+    {'name': 'updated_since', 'type': datetime_from_iso8601, 'location': 'args',
+     'required': True},
+    {'name': 'fields', 'type': str, 'location': 'args', 'required': False,
+     'store_missing': False}
+]
+
+
+BATCH_REGISTRATION = [
+    {'name': 'users', 'type': dict, 'location': 'json', 'required': True, 'action': 'append'}
+]
+
+
+ITEM_LISTING = [
+    {'name': 'limit', 'type': natural, 'location': 'args', 'required': False, 'default': 0},
+    {'name': 'after', 'type': str, 'location': 'args', 'required': False,
+     'store_missing': False},
+    {'name': 'shop_id', 'type': str, 'location': 'args', 'required': False,
+     'store_missing': False}
+]
+
+
+SHOP_NEARBY = [
+    {'name': 'lat', 'type': float, 'location': 'args', 'required': True},
+    {'name': 'lng', 'type': float, 'location': 'args', 'required': True},
+    {'name': 'radius', 'type': float, 'location': 'args', 'required': False, 'default': 5000},
+    {'name': 'limit', 'type': natural, 'location': 'args', 'required': False, 'default': 0},
+    {'name': 'skip', 'type': natural, 'location': 'args', 'required': False, 'default': 0}
+]
+
+
+SHOP_SEARCH = [
+    {'name': 'q', 'type': str, 'location': 'args', 'required': True},
+    {'name': 'limit', 'type': natural, 'location': 'args', 'required': False, 'default': 0},
+    {'name': 'skip', 'type': natural, 'location': 'args', 'required': False, 'default': 0}
+]
+
+
+SHOP_SUGGEST = [
+    {'name': 'prefix', 'type': str, 'location': 'args', 'required': True},
+    {'name': 'limit', 'type': natural, 'location': 'args', 'required': False, 'default': 10}
+]
+
+
+USER_LOOKUP = [
+    {'name': 'ids', 'type': str, 'location': 'args', 'required': False,
+     'store_missing': False},
+    {'name': 'fields', 'type': str, 'location': 'args', 'required': False,
+     'store_missing': False}
 ]
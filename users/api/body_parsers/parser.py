@@ -5,10 +5,12 @@ class BodyParser:
     """ Class for parsing the fields provided in the list
     """
 
-    def __init__(self, fields):
+    def __init__(self, fields, source=None):
         self.fields = fields
         parser = self._create_parser()
-        self.fields = parser.parse_args()
+        # The source defaults to the current request, any object with the
+        # fields' location attributes (e.g. "json") can be parsed instead
+        self.fields = parser.parse_args(req=source)
 
     def _create_parser(self):
         parser = RequestParser()
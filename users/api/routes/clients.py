@@ -3,10 +3,18 @@ from flask_jwt_extended import jwt_required
 
 from users.api.services.data_input import DataInputService
 from users.api.services.removal import RemovalService
+from users.api.services.items import ItemsService
+from users.api.services.lookup import LookupService
 
 
 class Clients(Resource):
-    """ For registering and updating clients' data."""
+    """ For registering, looking up and updating clients' data."""
+
+    @staticmethod
+    @jwt_required
+    def get():
+        service = LookupService()
+        return service.get('client')
 
     @staticmethod
     def post():
@@ -24,3 +32,38 @@ class Clients(Resource):
     def delete():
         service = RemovalService()
         return service.remove('client')
+
+
+class ClientsLookup(Resource):
+    """ For looking up a client by its id."""
+
+    @staticmethod
+    @jwt_required
+    def get(user_id):
+        service = LookupService()
+        return service.get('client', user_id)
+
+
+class ClientsBatch(Resource):
+    """ For registering many clients at once."""
+
+    @staticmethod
+    def post():
+        service = DataInputService()
+        return service.register_batch('client')
+
+
+class ClientPets(Resource):
+    """ For listing and editing a client's pets."""
+
+    @staticmethod
+    @jwt_required
+    def get():
+        service = ItemsService()
+        return service.get('client')
+
+    @staticmethod
+    @jwt_required
+    def patch():
+        service = ItemsService()
+        return service.patch('client')
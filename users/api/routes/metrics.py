@@ -0,0 +1,14 @@
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required
+
+from users.api.services.metrics import MetricsService
+
+
+class Metrics(Resource):
+    """ For reading the internal counters (connection pool, caches)."""
+
+    @staticmethod
+    @jwt_required
+    def get():
+        service = MetricsService()
+        return service.get()
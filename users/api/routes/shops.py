@@ -1,17 +1,30 @@
+from flask import request
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required
 
+from users.api.services.changes import ChangesService
 from users.api.services.data_input import DataInputService
 from users.api.services.removal import RemovalService
 from users.api.services.get_all import GetAllService
+from users.api.services.items import ItemsService
+from users.api.services.lookup import LookupService
+from users.api.services.nearby import NearbyService
+from users.api.services.search import SearchService
+from users.api.services.suggest import SuggestService
 
 
 class Shops(Resource):
-    """ For registering and updating shops' data."""
+    """ For registering, listing and updating shops' data."""
 
     @staticmethod
     @jwt_required
     def get():
+        if 'ids' in request.args:
+            service = LookupService()
+            return service.get('shop')
+        if 'updated_since' in request.args:
+            service = ChangesService()
+            return service.get()
         service = GetAllService()
         return service.get()
 
@@ -31,3 +44,68 @@ class Shops(Resource):
     def delete():
         service = RemovalService()
         return service.remove('shop')
+
+
+class ShopsLookup(Resource):
+    """ For looking up a shop by its id."""
+
+    @staticmethod
+    @jwt_required
+    def get(user_id):
+        service = LookupService()
+        return service.get('shop', user_id)
+
+
+class ShopsBatch(Resource):
+    """ For registering many shops at once."""
+
+    @staticmethod
+    def post():
+        service = DataInputService()
+        return service.register_batch('shop')
+
+
+class ShopServices(Resource):
+    """ For listing and editing a shop's services."""
+
+    @staticmethod
+    @jwt_required
+    def get():
+        service = ItemsService()
+        return service.get('shop')
+
+    @staticmethod
+    @jwt_required
+    def patch():
+        service = ItemsService()
+        return service.patch('shop')
+
+
+class ShopsNearby(Resource):
+    """ For finding the shops around a point."""
+
+    @staticmethod
+    @jwt_required
+    def get():
+        service = NearbyService()
+        return service.get()
+
+
+class ShopsSearch(Resource):
+    """ For searching shops by name, description and services."""
+
+    @staticmethod
+    @jwt_required
+    def get():
+        service = SearchService()
+        return service.get()
+
+
+class ShopsSuggest(Resource):
+    """ For autocompleting shop names."""
+
+    @staticmethod
+    @jwt_required
+    def get():
+        service = SuggestService()
+        return service.get()
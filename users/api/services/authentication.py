@@ -1,12 +1,19 @@
 from flask_restful import abort
-from flask.json import jsonify
 from flask_jwt_extended import create_access_token, get_jwt_identity
 
 from users.api.body_parsers.factory import FACTORY
+from users.utils.cache import get_listing_cache
+from users.utils.suggest import get_name_index
 from users.utils.db.adapter_factory import get_mongo_adapter
 from users.utils.env_vars import CLIENTS_COLLECTION, SHOPS_COLLECTION
+from users.utils.json_encoder import jsonify
+from users.utils.passwords import get_password_hasher
 
 
+# User fields kept in the access token's identity, so the token
+# stays the same size whatever else is kept on the user
+IDENTITY_FIELDS = ('_id', 'username', 'type', 'name')
+
 # pylint: disable=inconsistent-return-statements
 class AuthenticationService:
     def __init__(self):
@@ -20,29 +27,62 @@ class AuthenticationService:
     def authenticate(self):
         """ Authenticates the user with the information they provided
 
+            Legacy plain text passwords are replaced by their
+            hash the first time the user logs in.
+
             Args:
                 The fields parsed can be found in the auth body parser,
                 they include username, password and type, so the process
                 knows where to look for that user
 
             Returns:
-                db_data (json): The whole user object, except for the password
+                access_token (json): The token, identifying the user by their IDENTITY_FIELDS
         """
         request_data = self.parser.fields
         collection = self.collections[request_data['type']]
 
         mongo = get_mongo_adapter()
+        hasher = get_password_hasher()
         try:
-            user = mongo.get_user_by_username(
-                collection, request_data['username'], request_data['password']
+            try:
+                user = mongo.get_user_by_username(collection, request_data['username'])
+            except KeyError:
+                # Still verified, so the timing doesn't tell which usernames exist
+                user = {'password': hasher.dummy_hash}
+            valid, needs_rehash = hasher.verify(
+                request_data['password'], user.pop('password', None)
             )
-            return jsonify(create_access_token(user))
+            if not valid:
+                raise KeyError('Invalid username or password')
+
+            if needs_rehash:
+                self._rehash(collection, user['_id'], request_data['password'])
+            return jsonify(create_access_token(
+                {field: user[field] for field in IDENTITY_FIELDS if field in user}
+            ))
+
         except KeyError as error:
             abort(401, extra=str(error))
 
+        except RuntimeError as error:
+            abort(503, extra=str(error))
+
     def delete_user(self):
         user = get_jwt_identity()
         collection = self.collections[user['type']]
 
         mongo = get_mongo_adapter()
-        return mongo.delete(collection, user['_id'])
+        deleted = mongo.delete(collection, user['_id'])
+        if user['type'] == 'shop':
+            get_listing_cache().invalidate_user(user['_id'])
+            get_name_index().remove(user['_id'])
+        return deleted
+
+    @staticmethod
+    def _rehash(collection, user_id, password):
+        try:
+            password_hash = get_password_hasher().hash(password)
+            get_mongo_adapter().set_password(collection, user_id, password_hash)
+        except RuntimeError as error:
+            # The login is still valid, the hash is upgraded on a later one
+            print(f'Error when rehashing password: {error}')
@@ -0,0 +1,70 @@
+from datetime import timedelta, timezone
+
+from flask_restful import abort
+from flask_jwt_extended import get_jwt_identity
+
+from users.api.body_parsers.factory import FACTORY
+from users.utils.db.adapter_factory import get_mongo_adapter
+from users.utils.db.mongo_adapter import utc_now
+from users.utils.env_vars import SHOPS_COLLECTION, SYNC_TOMBSTONES_TTL_DAYS, \
+    SYNC_OVERLAP_SECONDS
+from users.utils.json_stream import stream_json_object
+
+
+# pylint: disable=inconsistent-return-statements
+class ChangesService:
+    """ Service for syncing the shops changed since
+        a client's last sync.
+    """
+    def __init__(self):
+        self.parser_factory = FACTORY
+
+    def get(self):
+        """ Lists the shops written and the ids of the shops deleted
+            since a time, so clients keep a local copy in sync without
+            reading every shop again
+
+            "synced_at" is the "updated_since" of the next sync. It's set
+            a little before the request, as writes from other replicas
+            or behind on a secondary may carry an earlier "updated_at",
+            so shops near the boundary may be sent twice. Deletions are
+            kept for a limited time, older syncs must list all the shops.
+
+            Args:
+                The fields parsed can be found in the shop changes parser,
+                "updated_since" is an ISO 8601 time, UTC when it has no
+                offset, and "fields" is a comma separated list of the
+                fields to be returned
+
+            Returns:
+                (JSON): The "synced_at" time, the "deleted" shop ids and
+                    the streamed "shops", oldest write first
+        """
+        args = self.parser_factory.get_parser('shop_changes').fields
+        since = args['updated_since']
+        if since.tzinfo:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+
+        now = utc_now()
+        if since < now - timedelta(days=SYNC_TOMBSTONES_TTL_DAYS):
+            abort(410, extra=f'Deletions are kept for {SYNC_TOMBSTONES_TTL_DAYS} days, '
+                             'list all the shops instead')
+
+        mongo = get_mongo_adapter()
+        try:
+            shops, deleted = mongo.get_changes(
+                SHOPS_COLLECTION, since, self._split_fields(args.get('fields')),
+                get_jwt_identity()['_id']
+            )
+
+        except ValueError as error:
+            abort(400, extra=f'{error}')
+
+        synced_at = max(since, now - timedelta(seconds=SYNC_OVERLAP_SECONDS))
+        return stream_json_object({'synced_at': synced_at, 'deleted': deleted}, 'shops', shops)
+
+    @staticmethod
+    def _split_fields(fields):
+        if not fields:
+            return None
+        return [field.strip() for field in fields.split(',') if field.strip()]
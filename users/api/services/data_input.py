@@ -1,14 +1,19 @@
 # pylint: disable = import-error, inconsistent-return-statements
 import re
+from types import SimpleNamespace
 
 from flask_restful import abort
-from flask.json import jsonify
 from flask_jwt_extended import get_jwt_identity
 from validate_docbr import CNPJ, CPF
+from werkzeug.exceptions import HTTPException
 
 from users.api.body_parsers.factory import FACTORY
+from users.utils.cache import get_listing_cache
 from users.utils.db.adapter_factory import get_mongo_adapter, get_cos_adapter
-from users.utils.env_vars import CLIENTS_COLLECTION, SHOPS_COLLECTION
+from users.utils.env_vars import CLIENTS_COLLECTION, SHOPS_COLLECTION, BATCH_MAX_SIZE
+from users.utils.json_encoder import jsonify
+from users.utils.passwords import get_password_hasher
+from users.utils.suggest import get_name_index
 
 
 class DataInputService:
@@ -26,14 +31,14 @@ class DataInputService:
             'cpf': self._validate_cpf,
             'cnpj': self._validate_cnpj,
             'profile_pic': self._validate_pics,
-            'banner_pic': self._validate_pics
+            'banner_pic': self._validate_pics,
+            'location': self._validate_location
         }
 
     def register(self, type_):
         """ Registers a new user on the app
 
-            It validates the fields that require validation and
-            creates the array fields for each type of user, saving it
+            It validates the fields that require validation, saving it
             on the database and returning the new user afterwards
 
             Args:
@@ -46,23 +51,79 @@ class DataInputService:
         parser = self.parser_factory.get_parser(f'{type_}_registration')
         doc = parser.fields
         self._validate_fields(doc)
-        self._create_array_fields(doc, type_)
         doc['type'] = type_
 
         mongo = get_mongo_adapter()
         try:
+            doc['password'] = get_password_hasher().hash(doc['password'])
             mongo.create(collection, doc)
         except KeyError as error:
             abort(409, extra=f'{error}')
 
+        except RuntimeError as error:
+            abort(503, extra=f'{error}')
+
+        if type_ == 'shop':
+            shop_id = str(doc['_id'])
+            get_listing_cache().invalidate_new_user(shop_id)
+            get_name_index().add(shop_id, doc['name'])
+
         return jsonify(doc)
 
+    def register_batch(self, type_):
+        """ Registers many users on the app at once
+
+            Every user goes through the same validations as in register,
+            the valid ones are saved with a single bulk insert
+
+            Args:
+                type_ (str): The type of user, hardcoded for each route
+
+            Returns:
+                (list/JSON): One result per sent user, in the same order, with
+                    the index, the status (created, invalid, duplicate or error)
+                    and either the created user or the error
+        """
+        collection = self.types[type_]
+        records = self.parser_factory.get_parser('batch_registration').fields['users']
+        if len(records) > BATCH_MAX_SIZE:
+            abort(400, extra=f'At most {BATCH_MAX_SIZE} users per batch')
+
+        results = [None] * len(records)
+        docs, positions = [], []
+        for index, record in enumerate(records):
+            try:
+                docs.append(self._parse_batch_record(record, type_))
+                positions.append(index)
+            except HTTPException as error:
+                results[index] = {
+                    'index': index, 'status': 'invalid', 'error': self._get_error_message(error)
+                }
+
+        try:
+            created = self._create_batch(collection, docs)
+        except RuntimeError as error:
+            abort(503, extra=f'{error}')
+
+        for index, result in zip(positions, created):
+            results[index] = {'index': index, **result}
+
+        if type_ == 'shop' and docs:
+            get_listing_cache().clear()
+            name_index = get_name_index()
+            for result in created:
+                if result['status'] == 'created':
+                    name_index.add(str(result['user']['_id']), result['user']['name'])
+
+        return jsonify(results)
+
     def update(self, type_):
         """ Updates a user with the sent properties
 
             Validates any fields if required and saves it
             on the database, returning the updated user object
-            to the requester
+            to the requester. Sent services or pets are added
+            to the user's items, listed through their own routes
 
             Args:
                 type_ (str): The type of user, hardcoded for each route
@@ -79,6 +140,9 @@ class DataInputService:
         user = get_jwt_identity()
         try:
             updated = mongo.update(collection, doc, user['_id'])
+            if type_ == 'shop':
+                get_listing_cache().invalidate_user(user['_id'])
+                get_name_index().add(user['_id'], updated.get('name'))
             return jsonify(updated)
 
         except KeyError as error:
@@ -88,11 +152,27 @@ class DataInputService:
             abort(500, extra=f'Error when updating, {error}')
 
     @staticmethod
-    def _create_array_fields(doc, type_):
-        if type_ == 'client':
-            doc['pets'] = []
-        if type_ == 'shop':
-            doc['services'] = []
+    def _create_batch(collection, docs):
+        hashes = get_password_hasher().hash_many([doc['password'] for doc in docs])
+        for doc, password_hash in zip(docs, hashes):
+            doc['password'] = password_hash
+
+        mongo = get_mongo_adapter()
+        return mongo.create_many(collection, docs)
+
+    def _parse_batch_record(self, record, type_):
+        parser = self.parser_factory.get_parser(
+            f'{type_}_registration', SimpleNamespace(json=record)
+        )
+        doc = parser.fields
+        self._validate_fields(doc)
+        doc['type'] = type_
+        return doc
+
+    @staticmethod
+    def _get_error_message(error):
+        data = getattr(error, 'data', None) or {}
+        return data.get('extra') or data.get('message') or error.description
 
     def _validate_fields(self, doc):
         if not doc:
@@ -114,6 +194,20 @@ class DataInputService:
             doc['pics']['banner'] = cos.upload(doc['banner_pic'])
             del doc['banner_pic']
 
+    @staticmethod
+    def _validate_location(doc):
+        location = doc['location']
+        coordinates = location.get('coordinates')
+
+        valid = location.get('type') == 'Point' and isinstance(coordinates, list) \
+            and len(coordinates) == 2 \
+            and all(isinstance(value, (int, float)) and not isinstance(value, bool)
+                    for value in coordinates) \
+            and -180 <= coordinates[0] <= 180 and -90 <= coordinates[1] <= 90
+        if not valid:
+            abort(400, extra='Invalid location, expected a GeoJSON Point [lng, lat]')
+        doc['location'] = {'type': 'Point', 'coordinates': coordinates}
+
     @staticmethod
     def _validate_email(doc):
         email = doc['email']
@@ -1,7 +1,14 @@
 from flask_restful import abort
+from flask_jwt_extended import get_jwt_identity
 
+from users.api.body_parsers.factory import FACTORY
+from users.utils.cache import get_listing_cache
 from users.utils.db.adapter_factory import get_mongo_adapter
+from users.utils.db.mongo_adapter import get_document_id
+from users.utils.db.summaries import OFFER_FILTERS
 from users.utils.env_vars import SHOPS_COLLECTION
+from users.utils.etag import get_not_modified, make_etag, set_etag
+from users.utils.json_stream import encode_json_list, json_response, stream_json_list
 
 
 # pylint: disable=inconsistent-return-statements
@@ -9,11 +16,79 @@ class GetAllService:
     """ Service responsible for getting a list of
         all the shops registered in the system.
     """
-    @staticmethod
-    def get():
+    def __init__(self):
+        self.parser_factory = FACTORY
+
+    def get(self):  # pylint: disable=too-many-locals
+        """ Lists the shops, one page at a time
+
+            Shops can be filtered by what they offer: the filters must
+            all match one same service, with a price in the range. Pages
+            with a limit and no filters are served from the listing cache
+            when possible, the shop write paths invalidate it. Pages that
+            get cached are read from the primary, so a lagging secondary
+            can't put back a page the writes invalidated. Other reads from
+            the database see the requester's own previous writes.
+            Shops are read as raw BSON, only decoded while encoded, and
+            cached pages are kept encoded.
+
+            Responses are tagged with the shops collection's version, a
+            request whose If-None-Match holds the current tag gets a 304
+            before any shop is read.
+
+            Args:
+                The fields parsed can be found in the shop listing parser,
+                "limit" is the page size, "after" is the _id of the
+                last shop of the previous page, "fields" is a comma
+                separated list of the fields to be returned and the
+                offer filters are "service_id", "service_name", "species",
+                "min_price" and "max_price"
+
+            Returns:
+                (JSON): Streamed list of shops, empty when not modified
+        """
+        args = self.parser_factory.get_parser('shop_listing').fields
+        limit, after = args['limit'], args.get('after')
+        fields = self._split_fields(args.get('fields'))
+        # Filtered pages aren't cached, a write can add a shop to any of them
+        filters = {name: args[name] for name in OFFER_FILTERS if args.get(name) is not None}
+
+        cache = get_listing_cache()
+        page = cache.get_page(limit, after, fields) if limit and not filters else None
+        if page is not None:
+            return get_not_modified(page[2]) or set_etag(json_response(page[1]), page[2])
+
         mongo = get_mongo_adapter()
+        causal_key = get_jwt_identity()['_id']
+        cached = bool(limit and not filters)
         try:
-            return mongo.get_users(SHOPS_COLLECTION)
+            etag = make_etag(SHOPS_COLLECTION,
+                             mongo.get_version(SHOPS_COLLECTION, causal_key=causal_key,
+                                               primary=cached),
+                             limit, after, fields, sorted(filters.items()))
+            not_modified = get_not_modified(etag)
+            if not_modified:
+                return not_modified
+
+            shops = mongo.get_users(SHOPS_COLLECTION, limit, after, fields, filters=filters,
+                                    causal_key=causal_key, raw=True, primary=cached)
+            if not cached:
+                return set_etag(stream_json_list(shops), etag)
+
+            shops = list(shops)
+            body = encode_json_list(shops)
+            cache.set_page(limit, after, fields,
+                           ([get_document_id(shop) for shop in shops], body, etag))
+            return set_etag(json_response(body), etag)
 
         except KeyError as error:
             abort(404, extra=f'{error}')
+
+        except ValueError as error:
+            abort(400, extra=f'{error}')
+
+    @staticmethod
+    def _split_fields(fields):
+        if not fields:
+            return None
+        return [field.strip() for field in fields.split(',') if field.strip()]
@@ -0,0 +1,107 @@
+from flask_restful import abort
+from flask_jwt_extended import get_jwt_identity
+
+from users.api.body_parsers.factory import FACTORY
+from users.utils.cache import get_listing_cache
+from users.utils.db.adapter_factory import get_mongo_adapter
+from users.utils.env_vars import CLIENTS_COLLECTION, SHOPS_COLLECTION
+from users.utils.etag import get_not_modified, make_etag, set_etag
+from users.utils.json_encoder import jsonify
+from users.utils.json_stream import stream_json_list
+
+
+# pylint: disable=inconsistent-return-statements
+class ItemsService:
+    """ Service for listing the users' items, the shops'
+        services and the clients' pets, one page at a time.
+    """
+    def __init__(self):
+        self.parser_factory = FACTORY
+        self.collections = {
+            'client': CLIENTS_COLLECTION,
+            'shop': SHOPS_COLLECTION
+        }
+        self.parser_type = {
+            'client': 'pet_patch',
+            'shop': 'service_patch'
+        }
+
+    def get(self, type_):
+        """ Lists a page of a user's items
+
+            Any user may list a shop's services by its "shop_id",
+            pets are only listed to their own client. Responses are
+            tagged with the owner's version, which every item write
+            increments, a request whose If-None-Match holds the current
+            tag gets a 304 before any item is read.
+
+            Args:
+                type_ (str): The type of user owning the items
+                The fields parsed can be found in the item listing parser,
+                "limit" is the page size and "after" is the _id of the
+                last item of the previous page
+
+            Returns:
+                (JSON): Streamed list of items, empty when not modified
+        """
+        collection = self.collections[type_]
+        args = self.parser_factory.get_parser('item_listing').fields
+        user = get_jwt_identity()
+        owner_id = args.get('shop_id') if type_ == 'shop' else None
+        if not owner_id:
+            if user['type'] != type_:
+                abort(403, extra=f'Only a {type_} has these items')
+            owner_id = user['_id']
+
+        mongo = get_mongo_adapter()
+        try:
+            version = mongo.get_version(collection, owner_id, user['_id'])
+            etag = make_etag(collection, owner_id, version, args['limit'], args.get('after'))
+            not_modified = get_not_modified(etag)
+            if not_modified:
+                return not_modified
+
+            items = mongo.get_items(collection, owner_id, args['limit'], args.get('after'),
+                                    user['_id'])
+            return set_etag(stream_json_list(items), etag)
+
+        except ValueError as error:
+            abort(400, extra=f'{error}')
+
+    def patch(self, type_):
+        """ Changes some fields of one of the user's items
+
+            Args:
+                type_ (str): The type of user owning the item
+                The fields parsed can be found in the pet and service
+                patch parsers, "item_id" is the _id of the item
+
+            Returns:
+                (dict/JSON): The updated item
+        """
+        collection = self.collections[type_]
+        changes = self.parser_factory.get_parser(self.parser_type[type_]).fields
+        item_id = changes.pop('item_id')
+        if not changes:
+            abort(400, extra='At least one field is required for updates!')
+
+        user = get_jwt_identity()
+        if user['type'] != type_:
+            abort(403, extra=f'Only a {type_} has these items')
+
+        mongo = get_mongo_adapter()
+        try:
+            updated = mongo.update_item(collection, user['_id'], item_id, changes)
+            if type_ == 'shop':
+                # The listing pages hold the shops' services summary
+                get_listing_cache().invalidate_user(user['_id'])
+            return jsonify(updated)
+
+        except KeyError as error:
+            abort(404, extra=str(error))
+
+        except ValueError as error:
+            abort(400, extra=f'{error}')
+
+        except RuntimeError as error:
+            abort(500, extra=f'Error when updating, {error}')
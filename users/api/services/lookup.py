@@ -0,0 +1,88 @@
+from flask_restful import abort
+from flask_jwt_extended import get_jwt_identity
+
+from users.api.body_parsers.factory import FACTORY
+from users.utils.db.adapter_factory import get_mongo_adapter
+from users.utils.env_vars import CLIENTS_COLLECTION, SHOPS_COLLECTION, LOOKUP_MAX_IDS
+from users.utils.json_encoder import jsonify
+
+
+# What shops may read of clients, no contact or document details
+CLIENT_FIELDS_FOR_SHOPS = ['username', 'type', 'name']
+
+
+# pylint: disable=inconsistent-return-statements
+class LookupService:
+    """ Service for looking up one user or a batch of
+        them by their ids.
+    """
+    def __init__(self):
+        self.parser_factory = FACTORY
+        self.collections = {
+            'client': CLIENTS_COLLECTION,
+            'shop': SHOPS_COLLECTION
+        }
+
+    def get(self, type_, user_id=None):
+        """ Looks up a user by the id in the path, or a batch of
+            users by the comma separated "ids", with a single query
+
+            Any user may look up shops. Clients may look themselves up,
+            shops may look clients up but only read their public fields.
+
+            Args:
+                type_ (str): The type of the looked up users
+                user_id (str): The user's id, for single lookups
+                The fields parsed can be found in the user lookup parser,
+                "ids" are the batch's ids and "fields" is a comma
+                separated list of the fields to be returned
+
+            Returns:
+                (dict/JSON): The user, or the found "users" in the order of
+                    the ids and the "missing" ids
+        """
+        args = self.parser_factory.get_parser('user_lookup').fields
+        ids = [user_id] if user_id else self._split(args.get('ids'))
+        if not ids:
+            abort(400, extra='At least one id is required')
+        if len(ids) > LOOKUP_MAX_IDS:
+            abort(400, extra=f'At most {LOOKUP_MAX_IDS} ids per lookup')
+
+        user = get_jwt_identity()
+        fields = self._split(args.get('fields'))
+        if type_ == 'client' and user['type'] == 'client' and ids != [user['_id']]:
+            abort(403, extra='Clients may only look themselves up')
+        if type_ == 'client' and user['type'] == 'shop':
+            fields = self._get_client_fields_for_shops(fields)
+
+        mongo = get_mongo_adapter()
+        try:
+            users, missing = mongo.get_users_by_ids(
+                self.collections[type_], ids, fields, user['_id']
+            )
+
+        except ValueError as error:
+            abort(400, extra=f'{error}')
+
+        if not user_id:
+            return jsonify({'users': users, 'missing': missing})
+
+        if missing:
+            abort(404, extra=f'No {type_} with id {user_id}')
+        return jsonify(users[0])
+
+    @staticmethod
+    def _get_client_fields_for_shops(fields):
+        if not fields:
+            return CLIENT_FIELDS_FOR_SHOPS
+        private = [field for field in fields if field not in CLIENT_FIELDS_FOR_SHOPS]
+        if private:
+            abort(403, extra=f'Shops may not read the clients\' {", ".join(private)}')
+        return fields
+
+    @staticmethod
+    def _split(value):
+        # Repeated values are dropped, the first one keeps its position
+        if not value:
+            return None
+        return list(dict.fromkeys(item.strip() for item in value.split(',') if item.strip()))
@@ -0,0 +1,19 @@
+from users.utils.cache import get_listing_cache
+from users.utils.db.adapter_factory import get_mongo_adapter
+
+
+class MetricsService:
+    """ Service exposing the process' internal counters,
+        used for sizing the Mongo pool and the caches.
+    """
+    @staticmethod
+    def get():
+        """ Gets a snapshot of the counters
+
+            Returns:
+                (dict): Mongo connection pool and shop listing cache metrics
+        """
+        return {
+            'mongo_pool': get_mongo_adapter().pool_metrics.stats(),
+            'shops_cache': get_listing_cache().stats()
+        }
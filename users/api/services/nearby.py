@@ -0,0 +1,42 @@
+from flask_restful import abort
+
+from users.api.body_parsers.factory import FACTORY
+from users.utils.db.adapter_factory import get_mongo_adapter
+from users.utils.json_stream import stream_json_list
+
+
+# pylint: disable=inconsistent-return-statements
+class NearbyService:
+    """ Service responsible for finding the shops
+        around a point, nearest first.
+    """
+    def __init__(self):
+        self.parser_factory = FACTORY
+
+    def get(self):
+        """ Lists the shops within a radius of a point
+
+            Args:
+                The fields parsed can be found in the shop nearby parser,
+                "lat" and "lng" are the point, "radius" the max distance in
+                meters, "limit" the page size and "skip" the number of
+                nearer shops already seen
+
+            Returns:
+                (JSON): Streamed list of shops, sorted by distance
+        """
+        args = self.parser_factory.get_parser('shop_nearby').fields
+        if not -90 <= args['lat'] <= 90 or not -180 <= args['lng'] <= 180:
+            abort(400, extra='Invalid coordinates')
+        if args['radius'] <= 0:
+            abort(400, extra='Radius must be positive')
+
+        mongo = get_mongo_adapter()
+        try:
+            shops = mongo.get_nearby_shops(
+                args['lng'], args['lat'], args['radius'], args['limit'], args['skip']
+            )
+            return stream_json_list(shops)
+
+        except RuntimeError as error:
+            abort(500, extra=f'Error when searching, {error}')
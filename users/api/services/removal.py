@@ -1,10 +1,11 @@
 from flask_restful import abort
-from flask.json import jsonify
 from flask_jwt_extended import get_jwt_identity
 
 from users.utils.db.adapter_factory import get_mongo_adapter
 from users.api.body_parsers.factory import FACTORY
+from users.utils.cache import get_listing_cache
 from users.utils.env_vars import CLIENTS_COLLECTION, SHOPS_COLLECTION
+from users.utils.json_encoder import jsonify
 
 
 # pylint: disable=inconsistent-return-statements
@@ -21,14 +22,14 @@ class RemovalService:
         }
 
     def remove(self, type_):
-        """ Removes one item from the array fields (pets and services)
+        """ Removes one of the user's items (pets or services)
             according to the user type
 
             Args:
                 type_ (str): The user type
 
             Returns:
-                The updated user object
+                The removed item
         """
         collection = self.collections[type_]
         parser = self.parser_factory.get_parser(self.parser_type[type_])
@@ -37,11 +38,17 @@ class RemovalService:
         mongo = get_mongo_adapter()
         user = get_jwt_identity()
         try:
-            updated_user = mongo.remove(collection, doc, user['_id'])
-            return jsonify(updated_user)
+            removed = mongo.remove(collection, doc, user['_id'])
+            if type_ == 'shop':
+                # The listing pages hold the shops' services summary
+                get_listing_cache().invalidate_user(user['_id'])
+            return jsonify(removed)
 
         except KeyError as error:
-            abort(404)
+            abort(404, extra=f'{error}')
+
+        except ValueError as error:
+            abort(400, extra=f'{error}')
 
         except RuntimeError as error:
             abort(500, extra=f'Error when updating, {error}')
@@ -0,0 +1,37 @@
+from flask_restful import abort
+
+from users.api.body_parsers.factory import FACTORY
+from users.utils.db.adapter_factory import get_mongo_adapter
+from users.utils.json_stream import stream_json_list
+
+
+# pylint: disable=inconsistent-return-statements
+class SearchService:
+    """ Service responsible for the shops' full text search.
+    """
+    def __init__(self):
+        self.parser_factory = FACTORY
+
+    def get(self):
+        """ Lists the shops matching the searched text, most relevant first
+
+            Args:
+                The fields parsed can be found in the shop search parser,
+                "q" is the searched text, "limit" the page size and "skip"
+                the number of more relevant shops already seen
+
+            Returns:
+                (JSON): Streamed list of shops, sorted by relevance
+        """
+        args = self.parser_factory.get_parser('shop_search').fields
+        text = args['q'].strip()
+        if not text:
+            abort(400, extra='The search text is required')
+
+        mongo = get_mongo_adapter()
+        try:
+            shops = mongo.search_shops(text, args['limit'], args['skip'])
+            return stream_json_list(shops)
+
+        except RuntimeError as error:
+            abort(500, extra=f'Error when searching, {error}')
@@ -0,0 +1,23 @@
+from users.api.body_parsers.factory import FACTORY
+from users.utils.suggest import get_name_index
+
+
+class SuggestService:
+    """ Service responsible for autocompleting shop names
+        from the in-process name index.
+    """
+    def __init__(self):
+        self.parser_factory = FACTORY
+
+    def get(self):
+        """ Lists the shops whose name has a word starting with the prefix
+
+            Args:
+                The fields parsed can be found in the shop suggest parser,
+                "prefix" is the typed text and "limit" the max suggestions
+
+            Returns:
+                (list): The suggested shops' "_id" and "name"
+        """
+        args = self.parser_factory.get_parser('shop_suggest').fields
+        return get_name_index().suggest(args['prefix'], args['limit'])
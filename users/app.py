@@ -10,13 +10,27 @@ from flask_jwt_extended import JWTManager
 from cheroot.wsgi import PathInfoDispatcher
 from cheroot.wsgi import Server as WSGIServer
 
-from users.api.routes.clients import Clients
-from users.api.routes.shops import Shops
+from users.api.routes.clients import Clients, ClientsBatch, ClientsLookup, ClientPets
+from users.api.routes.shops import Shops, ShopsBatch, ShopServices, ShopsNearby, \
+    ShopsSearch, ShopsSuggest, ShopsLookup
 from users.api.routes.auth import Auth
+from users.api.routes.metrics import Metrics
 
-from users.utils.env_vars import JWT_SECRET, JWT_TOKEN_TTL
+from users.utils.db.adapter_factory import get_mongo_adapter
+from users.utils.db.change_watcher import ChangeWatcher
+from users.utils.db.indexes import IndexManager
+from users.utils.feed import get_shop_feed
+from users.utils.invalidation import CacheInvalidator
+from users.utils.json_encoder import JSONEncoder, output_json
+from users.utils.stream_server import StreamServer
+from users.utils.suggest import get_name_index
+from users.utils.env_vars import JWT_SECRET, JWT_TOKEN_TTL, MONGO_SYNC_INDEXES, \
+    SERVER_THREADS, SERVER_MAX_THREADS, SERVER_REQUEST_QUEUE_SIZE, SERVER_ACCEPTED_QUEUE_SIZE, \
+    SERVER_TIMEOUT, SHOPS_COLLECTION, CHANGE_STREAM_ENABLED, \
+    CHANGE_STREAM_TOKEN_FILE, DB_BACKEND, STREAM_PORT
 
 APP = Flask(__name__)
+APP.json_encoder = JSONEncoder
 
 APP.config['JWT_SECRET_KEY'] = JWT_SECRET
 APP.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(minutes=JWT_TOKEN_TTL)
@@ -24,15 +38,50 @@ JWTManager(APP)
 
 CORS(APP)
 API = Api(APP)
+API.representations['application/json'] = output_json
 PORT = int(os.getenv('PORT', '8080'))
 
 DISPATCHER = PathInfoDispatcher({'/': APP})
-SERVER = WSGIServer(('0.0.0.0', PORT), DISPATCHER)
+# Requests mostly wait on MongoDB/COS, so the worker pool is sized for
+# in-flight requests rather than CPU cores (see MONGO_MAX_POOL_SIZE)
+SERVER = WSGIServer(
+    ('0.0.0.0', PORT),
+    DISPATCHER,
+    numthreads=SERVER_THREADS,
+    max=SERVER_MAX_THREADS,
+    request_queue_size=SERVER_REQUEST_QUEUE_SIZE,
+    accepted_queue_size=SERVER_ACCEPTED_QUEUE_SIZE,
+    timeout=SERVER_TIMEOUT
+)
 
 API.add_resource(Clients, '/clients')
+API.add_resource(ClientsBatch, '/clients/batch')
+API.add_resource(ClientPets, '/clients/pets')
+API.add_resource(ClientsLookup, '/clients/<string:user_id>')
 API.add_resource(Shops, '/shops')
+API.add_resource(ShopsBatch, '/shops/batch')
+API.add_resource(ShopServices, '/shops/services')
+API.add_resource(ShopsNearby, '/shops/nearby')
+API.add_resource(ShopsSearch, '/shops/search')
+API.add_resource(ShopsSuggest, '/shops/suggest')
+API.add_resource(ShopsLookup, '/shops/<string:user_id>')
 API.add_resource(Auth, '/auth')
+API.add_resource(Metrics, '/metrics')
 
 if __name__ == '__main__':
-    print(f'Server running on port {PORT}')
+    if MONGO_SYNC_INDEXES and DB_BACKEND == 'mongo':
+        IndexManager(get_mongo_adapter().db_).sync()
+    print(f'Shop name index built with {len(get_name_index())} shops')
+    if CHANGE_STREAM_ENABLED and DB_BACKEND == 'mongo':
+        WATCHER = ChangeWatcher(
+            get_mongo_adapter().db_, [SHOPS_COLLECTION], CHANGE_STREAM_TOKEN_FILE
+        )
+        WATCHER.subscribe(CacheInvalidator())
+        WATCHER.subscribe(get_shop_feed())
+        WATCHER.start()
+    if STREAM_PORT:
+        # Shop changes are only streamed while the change watcher runs
+        StreamServer(APP, get_shop_feed(), STREAM_PORT).start()
+        print(f'Shop stream running on port {STREAM_PORT}')
+    print(f'Server running on port {PORT} with {SERVER_THREADS} worker threads')
     SERVER.safe_start()
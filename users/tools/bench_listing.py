@@ -0,0 +1,121 @@
+import argparse
+import sys
+import time
+import tracemalloc
+
+import bson
+from bson.objectid import ObjectId
+
+from users.utils.db.mongo_adapter import RAW_CODEC_OPTIONS
+from users.utils.json_encoder import encode
+
+try:
+    import bsonjs
+except ImportError:
+    bsonjs = None
+
+
+def main(argv=None):
+    """ Compares the shop listing paths, from the BSON batch read from
+        MongoDB to the JSON written in the response
+
+        Usage:
+            python -m users.tools.bench_listing [--shops N] [--rounds N]
+
+        The "dict" path decodes the batch into dicts, the "raw" path into
+        RawBSONDocuments (get_users with raw=True). When python-bsonjs is
+        installed, its BSON to extended JSON transcoding is measured too.
+
+        Returns:
+            (int): Exit code
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the shop listing encoding paths')
+    parser.add_argument('--shops', type=int, default=1000, help='shops per page')
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    batch = b''.join(bson.encode(shop) for shop in generate_shops(args.shops))
+    paths = {'dict': read_dicts, 'raw': read_raw}
+    if bsonjs:
+        paths['raw+bsonjs'] = read_raw_bsonjs
+
+    print(f'{args.shops} shops per page, {len(batch) // 1024} KiB of BSON')
+    print(f'{"path":<12}{"ms/page":>10}{"peak KiB":>10}{"held KiB":>10}')
+    for name, path in paths.items():
+        result = measure(path, batch, args.rounds)
+        print(f'{name:<12}{result["ms"]:>10.2f}{result["peak_kib"]:>10}{result["held_kib"]:>10}')
+    return 0
+
+
+def generate_shops(count):
+    """ Shops shaped like the registered ones, listing fields included
+
+        Args:
+            count (int): Number of shops
+
+        Returns:
+            (generator): The shop documents
+    """
+    for index in range(count):
+        yield {
+            '_id': ObjectId(),
+            'username': f'shop{index}',
+            'type': 'shop',
+            'name': f'Pet Shop {index}',
+            'pics': {'profile': f'{index}-profile.png', 'banner': f'{index}-banner.png'},
+            'email': f'shop{index}@petlife.com',
+            'address': 'Rua das Flores, 123 - São Paulo, SP',
+            'cnpj': '11222333000181',
+            'phone_number': '11999999999',
+            'description': 'Banho, tosa, vacinação e consultas veterinárias. ' * 4,
+            'hours': 'Seg-Sex 8h-18h',
+            'location': {'type': 'Point', 'coordinates': [-46.63 + index / 1e4, -23.55]},
+            'service_names': ['Banho', 'Tosa', 'Vacinação']
+        }
+
+
+def measure(path, batch, rounds):
+    """ Times a listing path and traces its allocations
+
+        Args:
+            path (callable): Receives the BSON batch, returns the page
+                and the encoded documents
+            batch (bytes): The BSON documents
+            rounds (int): Timed runs, the average is reported
+
+        Returns:
+            (dict): Milliseconds per page, peak KiB while reading and
+                encoding and KiB held by the page itself, like a cached one
+    """
+    started = time.perf_counter()
+    for _ in range(rounds):
+        path(batch)
+    elapsed = (time.perf_counter() - started) / rounds
+
+    tracemalloc.start()
+    page, encoded = path(batch)
+    peak = tracemalloc.get_traced_memory()[1]
+    del encoded
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del page
+    return {'ms': elapsed * 1000, 'peak_kib': peak // 1024, 'held_kib': held // 1024}
+
+
+def read_dicts(batch):
+    page = bson.decode_all(batch)
+    return page, [encode(shop) for shop in page]
+
+
+def read_raw(batch):
+    page = bson.decode_all(batch, RAW_CODEC_OPTIONS)
+    return page, [encode(shop) for shop in page]
+
+
+def read_raw_bsonjs(batch):
+    page = bson.decode_all(batch, RAW_CODEC_OPTIONS)
+    return page, [bsonjs.dumps(shop.raw) for shop in page]  # pylint: disable=c-extension-no-member
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from pymongo import ASCENDING
+
+from users.tools.ndjson import COLLECTIONS, Checkpoint, NdjsonWriter, batched, encode, \
+    part_path
+from users.utils.db.mongo_adapter import MongoAdapter
+
+
+def main(argv=None):
+    """ Streams a users or items collection to NDJSON files
+
+        Usage:
+            python -m users.tools.dump {clients,pets,services,shops} OUTPUT[.gz]
+                [--workers N] [--batch-size N] [--checkpoint FILE]
+
+        With more than one worker the collection is split into
+        _id ranges of about the same size, each written to its own
+        file (see ndjson.part_path). Running again with the same
+        checkpoint resumes where the previous run stopped.
+
+        Returns:
+            (int): Exit code
+    """
+    parser = argparse.ArgumentParser(description='Dump a collection to NDJSON')
+    parser.add_argument('collection', choices=sorted(COLLECTIONS))
+    parser.add_argument('output', help='output file, gzipped when it ends with .gz')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--checkpoint', help='progress file, used to resume the dump')
+    args = parser.parse_args(argv)
+
+    collection = MongoAdapter().db_[COLLECTIONS[args.collection]]
+    checkpoint = Checkpoint(args.checkpoint)
+    ranges = checkpoint.get('ranges')
+    if ranges is None:
+        ranges = split_ranges(collection, args.workers)
+        checkpoint.set('ranges', ranges)
+
+    with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = [
+            executor.submit(
+                dump_range, collection, range_, part_path(args.output, index, len(ranges)),
+                args.batch_size, checkpoint
+            )
+            for index, range_ in enumerate(ranges)
+        ]
+        total = sum(future.result() for future in futures)
+
+    print(f'Dumped {total} documents from {args.collection} to {len(ranges)} file(s)')
+    return 0
+
+
+def split_ranges(collection, workers):
+    """ Splits the collection into _id ranges with about
+        the same number of documents each
+
+        Args:
+            collection (pymongo.collection.Collection): The dumped collection
+            workers (int): Number of ranges wanted
+
+        Returns:
+            ranges (list): Dicts with the "lower" (inclusive) and
+                "upper" (exclusive) _id bounds, None when unbounded
+    """
+    if workers <= 1:
+        return [{'lower': None, 'upper': None}]
+
+    buckets = collection.aggregate([
+        {'$bucketAuto': {'groupBy': '$_id', 'buckets': workers}}
+    ])
+    lowers = [bucket['_id']['min'] for bucket in buckets]
+    if not lowers:
+        return [{'lower': None, 'upper': None}]
+
+    return [
+        {'lower': lower, 'upper': upper}
+        for lower, upper in zip(lowers, lowers[1:] + [None])
+    ]
+
+
+def range_query(range_, after=None):
+    bounds = {}
+    if after is not None:
+        bounds['$gt'] = after
+    elif range_['lower'] is not None:
+        bounds['$gte'] = range_['lower']
+    if range_['upper'] is not None:
+        bounds['$lt'] = range_['upper']
+    return {'_id': bounds} if bounds else {}
+
+
+def dump_range(collection, range_, path, batch_size, checkpoint):
+    """ Writes one _id range to its file, batch by batch
+
+        Args:
+            collection (pymongo.collection.Collection): The dumped collection
+            range_ (dict): The _id bounds, see split_ranges
+            path (str): The file written by this range
+            batch_size (int): Documents per cursor batch and per write
+            checkpoint (Checkpoint): Progress of the dump, per file
+
+        Returns:
+            count (int): Number of documents in the file
+    """
+    progress = checkpoint.get_part(path)
+    if progress.get('done'):
+        return progress['count']
+
+    cursor = collection.find(
+        range_query(range_, progress.get('last_id')),
+        sort=[('_id', ASCENDING)],
+        batch_size=batch_size
+    )
+    count = progress.get('count', 0)
+    with NdjsonWriter(path, progress.get('offset')) as writer:
+        for batch in batched(cursor, batch_size):
+            writer.write([encode(doc) for doc in batch])
+            count += len(batch)
+            progress = {'last_id': batch[-1]['_id'], 'offset': writer.offset, 'count': count}
+            checkpoint.set_part(path, progress)
+
+    checkpoint.set_part(path, dict(progress, count=count, done=True))
+    return count
+
+
+if __name__ == '__main__':
+    sys.exit(main())
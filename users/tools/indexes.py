@@ -0,0 +1,38 @@
+import argparse
+import sys
+
+from users.utils.db.mongo_adapter import MongoAdapter
+from users.utils.db.indexes import IndexManager
+
+
+def main(argv=None):
+    """ Syncs the declared indexes or checks them for drift
+
+        Usage:
+            python -m users.tools.indexes [--check] [--drop]
+
+        Returns:
+            (int): Exit code, 1 when --check finds drift
+    """
+    parser = argparse.ArgumentParser(description='Sync users collections indexes')
+    parser.add_argument('--check', action='store_true',
+                        help='only report drift from the declared indexes')
+    parser.add_argument('--drop', action='store_true',
+                        help='drop extra indexes and rebuild changed ones')
+    args = parser.parse_args(argv)
+
+    manager = IndexManager(MongoAdapter().db_)
+    if args.check:
+        drift = manager.diff()
+        for collection, found in drift.items():
+            for kind, names in found.items():
+                if names:
+                    print(f'{collection} {kind}: {", ".join(names)}')
+        return 1 if manager.has_drift(drift) else 0
+
+    manager.sync(drop=args.drop)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from pymongo import InsertOne, ReplaceOne
+from pymongo.errors import BulkWriteError
+
+from users.tools.ndjson import COLLECTIONS, Checkpoint, batched, decode, read_lines
+from users.utils.db.mongo_adapter import ITEM_COLLECTIONS, MongoAdapter, utc_now
+
+
+# Item collection and the user collection owning its items
+OWNER_COLLECTIONS = {item_collection: collection
+                     for collection, (_, item_collection) in ITEM_COLLECTIONS.items()}
+
+
+def main(argv=None):
+    """ Streams NDJSON files into a users or items collection
+
+        Usage:
+            python -m users.tools.load {clients,pets,services,shops} INPUT[.gz] [INPUT ...]
+                [--workers N] [--batch-size N] [--checkpoint FILE] [--insert]
+
+        Files are loaded in parallel, one per worker. Documents are
+        upserted by _id unless --insert is set, so resuming or loading
+        the same file twice is safe. Loaded users get a new
+        "updated_at", so delta syncs list them, and loaded items bump
+        their owners' versions and "updated_at". The shops' services
+        summary is recomputed with "split_items shops --summaries".
+
+        Returns:
+            (int): Exit code, 1 when any document failed
+    """
+    parser = argparse.ArgumentParser(description='Load NDJSON files into a collection')
+    parser.add_argument('collection', choices=sorted(COLLECTIONS))
+    parser.add_argument('inputs', nargs='+', help='input files, gzipped when ending with .gz')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--checkpoint', help='progress file, used to resume the load')
+    parser.add_argument('--insert', action='store_true',
+                        help='insert instead of upserting, existing _ids fail')
+    args = parser.parse_args(argv)
+
+    mongo = MongoAdapter()
+    collection = mongo.db_[COLLECTIONS[args.collection]]
+    owner_collection = OWNER_COLLECTIONS.get(COLLECTIONS[args.collection])
+    owners = mongo.db_[owner_collection] if owner_collection else None
+    checkpoint = Checkpoint(args.checkpoint)
+
+    with ThreadPoolExecutor(max_workers=max(args.workers, 1)) as executor:
+        futures = [
+            executor.submit(load_file, collection, path, args.batch_size, checkpoint,
+                            not args.insert, owners=owners)
+            for path in args.inputs
+        ]
+        results = [future.result() for future in futures]
+
+    written = sum(result[0] for result in results)
+    failed = sum(result[1] for result in results)
+    if written:
+        # Listings tagged before the load must not be reported unchanged
+        mongo.bump_version(owner_collection or COLLECTIONS[args.collection])
+    print(f'Loaded {written} documents into {args.collection}, {failed} failed')
+    return 1 if failed else 0
+
+
+def load_file(collection, path, batch_size, checkpoint, upsert=True, *,  # pylint: disable=too-many-arguments
+              owners=None):
+    """ Writes the documents of one file with a bulk write per batch
+
+        Args:
+            collection (pymongo.collection.Collection): The loaded collection
+            path (str): The NDJSON file
+            batch_size (int): Lines per bulk write
+            checkpoint (Checkpoint): Progress of the load
+            upsert (bool): Replace documents by _id instead of inserting them
+            owners (pymongo.collection.Collection): The owners of the loaded
+                items, whose versions are bumped, if an items collection
+
+        Returns:
+            (tuple): Number of written and failed documents
+    """
+    done_lines = checkpoint.get_part(path).get('lines', 0)
+    lines, written, failed = 0, 0, 0
+
+    for batch in batched(read_lines(path), batch_size):
+        skip = max(done_lines - lines, 0)
+        lines += len(batch)
+        docs = [decode(line) for line in batch[skip:] if line]
+        if not docs:
+            continue
+        if owners is None:
+            _stamp_updated_at(docs)
+
+        errors = _write_batch(collection, docs, upsert, path)
+        if owners is not None:
+            _bump_owners(owners, docs)
+        written += len(docs) - errors
+        failed += errors
+        checkpoint.set_part(path, {'lines': lines})
+
+    return written, failed
+
+
+def _write_batch(collection, docs, upsert, path):
+    operations = [
+        ReplaceOne({'_id': doc['_id']}, doc, upsert=True) if upsert else InsertOne(doc)
+        for doc in docs
+    ]
+    try:
+        collection.bulk_write(operations, ordered=False)
+        return 0
+    except BulkWriteError as error:
+        write_errors = error.details.get('writeErrors', [])
+        print(f'{len(write_errors)} documents failed in {path}: {write_errors[:1]}')
+        return len(write_errors)
+
+
+def _stamp_updated_at(docs):
+    # A delta sync since before the load must list the loaded users
+    updated_at = utc_now()
+    for doc in docs:
+        doc['updated_at'] = updated_at
+
+
+def _bump_owners(owners, docs):
+    # The owners' items listings are tagged with their version
+    owner_ids = list({doc['owner_id'] for doc in docs if 'owner_id' in doc})
+    if owner_ids:
+        owners.update_many({'_id': {'$in': owner_ids}},
+                           {'$inc': {'version': 1}, '$set': {'updated_at': utc_now()}})
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import gzip
+import os
+import threading
+from itertools import islice
+
+from bson import json_util
+
+from users.utils.env_vars import CLIENTS_COLLECTION, PETS_COLLECTION, SERVICES_COLLECTION, \
+    SHOPS_COLLECTION
+
+
+USER_COLLECTIONS = {
+    'clients': CLIENTS_COLLECTION,
+    'shops': SHOPS_COLLECTION
+}
+
+COLLECTIONS = dict(USER_COLLECTIONS, pets=PETS_COLLECTION, services=SERVICES_COLLECTION)
+
+
+def encode(doc):
+    """ Encodes a document as one line of relaxed extended JSON,
+        so ObjectIds and dates survive the round trip
+    """
+    return json_util.dumps(doc, json_options=json_util.RELAXED_JSON_OPTIONS)
+
+
+def decode(line):
+    return json_util.loads(line)
+
+
+def batched(iterable, size):
+    """ Yields lists of at most "size" items from the iterable """
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def read_lines(path):
+    """ Yields the lines of a NDJSON file, gzipped or not
+
+        Blank lines are yielded too, so line numbers stay stable for checkpoints.
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as file_:
+        for line in file_:
+            yield line.strip()
+
+
+def part_path(path, index, total):
+    """ Name of the file written by one of the dump workers,
+        e.g. shops.ndjson.gz -> shops.002.ndjson.gz
+    """
+    if total <= 1:
+        return path
+    directory, name = os.path.split(path)
+    stem, dot, extensions = name.partition('.')
+    return os.path.join(directory, f'{stem}.{index:03d}{dot}{extensions}')
+
+
+class NdjsonWriter:
+    """ Appends batches of lines to a NDJSON file
+
+        With a .gz path each batch is written as its own gzip member,
+        so the file is valid after every batch and can be truncated
+        back to the last checkpointed offset when resuming.
+    """
+
+    def __init__(self, path, offset=None):
+        self.path = path
+        self.compress = path.endswith('.gz')
+        # pylint: disable=consider-using-with
+        if offset is None:
+            self._file = open(path, 'wb')
+        else:
+            self._file = open(path, 'r+b')
+            self._file.truncate(offset)
+            self._file.seek(offset)
+
+    def write(self, lines):
+        data = ''.join(f'{line}\n' for line in lines).encode('utf-8')
+        self._file.write(gzip.compress(data) if self.compress else data)
+        self._file.flush()
+
+    @property
+    def offset(self):
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class Checkpoint:
+    """ Progress of a dump or load, saved to a JSON file after every
+        batch so an interrupted run can be resumed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.state = {}
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as file_:
+                self.state = json_util.loads(file_.read())
+
+    @property
+    def resuming(self):
+        return bool(self.state)
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self.state.get(key, default)
+
+    def set(self, key, value):
+        with self._lock:
+            self.state[key] = value
+            self._save()
+
+    def get_part(self, part):
+        with self._lock:
+            return dict(self.state.get('parts', {}).get(str(part), {}))
+
+    def set_part(self, part, progress):
+        with self._lock:
+            self.state.setdefault('parts', {})[str(part)] = progress
+            self._save()
+
+    def _save(self):
+        if not self.path:
+            return
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file_:
+            file_.write(encode(self.state))
+        os.replace(temp_path, self.path)
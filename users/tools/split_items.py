@@ -0,0 +1,118 @@
+import argparse
+import sys
+
+from pymongo import ReplaceOne
+from pymongo.errors import PyMongoError
+
+from users.tools.ndjson import USER_COLLECTIONS
+from users.utils.db.mongo_adapter import ITEM_COLLECTIONS, MongoAdapter
+from users.utils.db.summaries import ITEM_SUMMARIES
+
+
+def main(argv=None):
+    """ Moves the embedded services/pets arrays into their own collections
+
+        Usage:
+            python -m users.tools.split_items {clients,shops} [--batch-size N] [--summaries]
+
+        Items are upserted by owner and position in the old array before the
+        array is unset, so an interrupted run can simply be started again.
+        Once every user is split, the position is unset from the items.
+        With --summaries the items summary of every user (the shops'
+        "service_names" and "offers") is recomputed from their items too.
+
+        Returns:
+            (int): Exit code, 1 when any user failed
+    """
+    parser = argparse.ArgumentParser(description='Split embedded services/pets arrays')
+    parser.add_argument('collection', choices=sorted(USER_COLLECTIONS))
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--summaries', action='store_true',
+                        help='recompute the items summary of every user')
+    args = parser.parse_args(argv)
+
+    mongo = MongoAdapter()
+    db_ = mongo.db_
+    collection = USER_COLLECTIONS[args.collection]
+    field, item_collection = ITEM_COLLECTIONS[collection]
+    summarize = ITEM_SUMMARIES.get(collection)
+
+    moved, failed = 0, 0
+    users = db_[collection].find({field: {'$exists': True}}, projection={field: True},
+                                 batch_size=args.batch_size)
+    for user in users:
+        try:
+            moved += split_user(db_[collection], db_[item_collection], field, user, summarize)
+        except PyMongoError as error:
+            print(f'Error when splitting {field} of user {user["_id"]}: {error}')
+            failed += 1
+
+    if not failed:
+        # Only needed to resume, it must not reach the items' responses
+        db_[item_collection].update_many({'legacy_index': {'$exists': True}},
+                                         {'$unset': {'legacy_index': ''}})
+
+    summarized = 0
+    if args.summaries and summarize:
+        users = db_[collection].find({}, projection={'_id': True}, batch_size=args.batch_size)
+        for user in users:
+            try:
+                summarize_user(db_[collection], db_[item_collection], user['_id'], summarize)
+                summarized += 1
+            except PyMongoError as error:
+                print(f'Error when summarizing {field} of user {user["_id"]}: {error}')
+                failed += 1
+
+    if moved or summarized:
+        mongo.bump_version(collection)
+    print(f'Moved {moved} {field} into {item_collection}, {failed} users failed')
+    return 1 if failed else 0
+
+
+def split_user(users, items, field, user, summarize=None):
+    """ Moves one user's array items and unsets the array
+
+        Args:
+            users (pymongo.collection.Collection): The users collection
+            items (pymongo.collection.Collection): The items collection
+            field (str): The array field, "services" or "pets"
+            user (dict): The user's _id and array
+            summarize (callable): The collection's items summary, if it has one
+
+        Returns:
+            (int): Number of moved items
+    """
+    requests = [
+        ReplaceOne(
+            {'owner_id': user['_id'], 'legacy_index': index},
+            dict(item, owner_id=user['_id'], legacy_index=index),
+            upsert=True
+        )
+        for index, item in enumerate(user.get(field) or [])
+    ]
+    if requests:
+        items.bulk_write(requests, ordered=False)
+
+    update = {'$unset': {field: ''}}
+    if summarize:
+        # The summary is kept on the user for the text index and the filters,
+        # read back from the items so the offers carry their ids
+        update['$set'] = summarize(items.find({'owner_id': user['_id']}))
+    users.update_one({'_id': user['_id']}, update)
+    return len(requests)
+
+
+def summarize_user(users, items, user_id, summarize):
+    """ Recomputes one user's items summary from its items
+
+        Args:
+            users (pymongo.collection.Collection): The users collection
+            items (pymongo.collection.Collection): The items collection
+            user_id (ObjectId): The user's _id
+            summarize (callable): The collection's items summary
+    """
+    users.update_one({'_id': user_id}, {'$set': summarize(items.find({'owner_id': user_id}))})
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict
+
+from users.utils.env_vars import SHOPS_CACHE_SIZE, SHOPS_CACHE_TTL
+
+
+class TTLCache:
+    """ Thread safe in-process cache whose entries expire after
+        a fixed time and are evicted least recently used first
+        when the cache is full.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """ Gets a value from the cache
+
+            Args:
+                key (hashable): The entry's key
+
+            Returns:
+                The cached value or None when missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.counters['hits'] += 1
+                return entry[1]
+
+            if entry:
+                del self._entries[key]
+            self.counters['misses'] += 1
+            return None
+
+    def set(self, key, value):
+        """ Stores a value, evicting the least recently used
+            entry if the cache is full. Does nothing when the
+            cache is disabled (size or ttl set to 0).
+
+            Args:
+                key (hashable): The entry's key
+                value (obj): The value to be cached
+        """
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.counters['evictions'] += 1
+
+    def invalidate(self, predicate):
+        """ Removes every entry matching the predicate
+
+            Args:
+                predicate (callable): Receives key and value, returns bool
+        """
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if predicate(key, entry[1])]
+            for key in stale:
+                del self._entries[key]
+            self.counters['invalidations'] += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self.counters['invalidations'] += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, size=len(self._entries))
+
+
+class ListingCache(TTLCache):
+    """ Cache of listing pages, keyed by the listing parameters
+
+        Only pages with a limit are cached so memory stays bounded.
+        Pages are kept already encoded, so hits are served without
+        encoding anything, along with their entity tag. Each page keeps
+        the ids it holds, so writes only drop the pages that could have
+        changed.
+    """
+
+    def get_page(self, limit, after, fields):
+        """ Reads a cached listing page
+
+            Returns:
+                (tuple): The page's ids, JSON body and entity tag,
+                    None when not cached
+        """
+        return self.get((limit, after, tuple(fields or ())))
+
+    def set_page(self, limit, after, fields, page):
+        """ Caches a listing page
+
+            Args:
+                limit (int): The page size, pages without limit aren't cached
+                after (str): The _id the page starts after
+                fields (list): The projected fields
+                page (tuple): The _ids of the page's documents, as strings in
+                    order, the page encoded as a JSON array and its entity tag
+        """
+        if limit:
+            self.set((limit, after, tuple(fields or ())), page)
+
+    def invalidate_user(self, user_id):
+        """ Drops the pages holding an updated or deleted user """
+        self.invalidate(lambda key, page: user_id in page[0])
+
+    def invalidate_new_user(self, user_id):
+        """ Drops the pages a newly created user would be listed on
+
+            Those are the pages that weren't full or whose range
+            goes past the new id. Ids are compared as hex strings
+            of the same length, which keeps the ObjectId order.
+        """
+        def would_hold(key, page):
+            limit, after, ids = key[0], key[1], page[0]
+            if after and user_id <= after.lower():
+                return False
+            return len(ids) < limit or ids[-1] > user_id
+
+        self.invalidate(would_hold)
+
+
+def get_listing_cache():
+    if not get_listing_cache.cache:
+        get_listing_cache.cache = ListingCache(SHOPS_CACHE_SIZE, SHOPS_CACHE_TTL)
+    return get_listing_cache.cache
+
+
+get_listing_cache.cache = None
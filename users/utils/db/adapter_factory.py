@@ -1,18 +1,30 @@
+from users.utils.db.memory_adapter import MemoryAdapter
+from users.utils.db.memory_storage_adapter import MemoryStorageAdapter
 from users.utils.db.mongo_adapter import MongoAdapter
 from users.utils.db.storage_adapter import StorageAdapter
+from users.utils.env_vars import DB_BACKEND, FILES_BACKEND
 
 
 def get_mongo_adapter():
     if not get_mongo_adapter.adapter:
-        get_mongo_adapter.adapter = MongoAdapter()
+        backend = _check_backend('DB_BACKEND', DB_BACKEND, ('mongo', 'memory'))
+        get_mongo_adapter.adapter = MemoryAdapter() if backend == 'memory' else MongoAdapter()
     return get_mongo_adapter.adapter
 
 
 def get_cos_adapter():
     if not get_cos_adapter.adapter:
-        get_cos_adapter.adapter = StorageAdapter()
+        backend = _check_backend('FILES_BACKEND', FILES_BACKEND, ('cos', 'memory'))
+        get_cos_adapter.adapter = MemoryStorageAdapter() if backend == 'memory' \
+            else StorageAdapter()
     return get_cos_adapter.adapter
 
 
+def _check_backend(setting, backend, choices):
+    if backend not in choices:
+        raise ValueError(f'Invalid {setting} {backend}, expected one of {", ".join(choices)}')
+    return backend
+
+
 get_mongo_adapter.adapter = None
 get_cos_adapter.adapter = None
@@ -0,0 +1,84 @@
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, \
+    SecondaryPreferred
+
+from users.utils.cache import TTLCache
+
+
+READ_PREFERENCES = {
+    'primary': Primary,
+    'primaryPreferred': PrimaryPreferred,
+    'secondary': Secondary,
+    'secondaryPreferred': SecondaryPreferred,
+    'nearest': Nearest
+}
+
+
+def get_read_preference(name, max_staleness=-1):
+    """ Builds a read preference from its name
+
+        Args:
+            name (str): One of READ_PREFERENCES' keys
+            max_staleness (int): Seconds a secondary may lag behind, -1 for no limit
+
+        Raises:
+            ValueError: When the name is unknown
+
+        Returns:
+            (pymongo.read_preferences._ServerMode): The read preference
+    """
+    if name not in READ_PREFERENCES:
+        raise ValueError(f'Invalid read preference {name}')
+    if name == 'primary':
+        return Primary()
+    return READ_PREFERENCES[name](max_staleness=max_staleness)
+
+
+# How long tokens are kept when secondaries have no max staleness
+NO_STALENESS_LIMIT_TTL = 3600
+
+
+class CausalTokens:
+    """ Latest cluster and operation times seen per user (by id or
+        username), so a user's next causally consistent session reads
+        their own writes even from a lagging secondary.
+
+        Tokens expire after the max staleness, since by then any
+        secondary that may be read from has caught up.
+    """
+
+    def __init__(self, client, max_size, max_staleness=-1):
+        self.client = client
+        ttl = max_staleness if max_staleness > 0 else NO_STALENESS_LIMIT_TTL
+        self.tokens = TTLCache(max_size, ttl)
+
+    def start_session(self, key):
+        """ Starts a causally consistent session after the key's last operation
+
+            Args:
+                key (str): The user's id or username, no session when empty
+
+            Returns:
+                (pymongo.client_session.ClientSession): The session or None
+        """
+        if not key:
+            return None
+        session = self.client.start_session(causal_consistency=True)
+        times = self.tokens.get(key)
+        if times:
+            session.advance_cluster_time(times[0])
+            session.advance_operation_time(times[1])
+        return session
+
+    def end_session(self, session, *keys):
+        """ Keeps the session's times for the keys and ends it
+
+            Args:
+                session (pymongo.client_session.ClientSession): The session or None
+                keys (str): The user's id and/or username
+        """
+        if session is None:
+            return
+        if session.operation_time is not None:
+            for key in filter(None, keys):
+                self.tokens.set(key, (session.cluster_time, session.operation_time))
+        session.end_session()
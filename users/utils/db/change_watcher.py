@@ -0,0 +1,121 @@
+import os
+import threading
+
+from bson import json_util
+from pymongo.errors import OperationFailure, PyMongoError
+
+from users.utils.env_vars import CHANGE_STREAM_RETRY_SECONDS
+
+
+# Server errors meaning change streams won't work on this deployment
+# (not a replica set or sharded cluster, or no $changeStream support)
+UNSUPPORTED_CODES = (40573, 40324, 115)
+
+# The resume token fell off the oplog, some changes can't be replayed
+HISTORY_LOST_CODES = (286, 280)
+
+# What subscribers get of each change: the changed fields' names come in the
+# update description, and of the documents only the name is kept. Updates
+# aren't looked up, so no other field, passwords included, is read again
+CHANGE_PROJECTION = {
+    'operationType': True,
+    'ns': True,
+    'documentKey': True,
+    'updateDescription': True,
+    'fullDocument.name': True
+}
+
+
+class ChangeWatcher:
+    """ Background change stream on a database's collections that
+        publishes every change to the subscribers, so each replica
+        can drop what its in-process caches hold about it.
+
+        The last resume token is kept in a file, when given, to pick up
+        after a restart. When change streams aren't available the watcher
+        stops and the caches rely on their TTL expiry alone.
+
+        Subscribers implement on_change(change), called with every change
+        event, and on_reset(), called when changes may have been missed.
+    """
+
+    def __init__(self, db_, collections, token_path=''):
+        self.db_ = db_
+        self.collections = list(collections)
+        self.token_path = token_path
+        self.subscribers = []
+        self.available = None
+        self.resume_token = self._load_token()
+        self._stop = threading.Event()
+
+    def subscribe(self, subscriber):
+        self.subscribers.append(subscriber)
+
+    def start(self):
+        """ Starts watching on a daemon thread
+        """
+        threading.Thread(target=self.run, name='change-watcher', daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        """ Watches until stopped, reopening the stream on transient errors
+
+            Returns when stopped or when change streams aren't supported.
+        """
+        while not self._stop.is_set():
+            try:
+                self._watch()
+            except OperationFailure as error:
+                if error.code in UNSUPPORTED_CODES:
+                    print(f'Change streams unavailable, caches fall back to TTL: {error}')
+                    self.available = False
+                    return
+                if error.code in HISTORY_LOST_CODES:
+                    print(f'Change stream history lost, resetting caches: {error}')
+                    self._set_token(None)
+                    self._publish('on_reset')
+                    continue
+                print(f'Error on change stream: {error}')
+            except PyMongoError as error:
+                print(f'Error on change stream: {error}')
+            self._stop.wait(CHANGE_STREAM_RETRY_SECONDS)
+
+    def _watch(self):
+        pipeline = [
+            {'$match': {'ns.coll': {'$in': self.collections}}},
+            {'$project': CHANGE_PROJECTION}
+        ]
+        with self.db_.watch(pipeline, resume_after=self.resume_token,
+                            max_await_time_ms=1000) as stream:
+            self.available = True
+            while not self._stop.is_set() and stream.alive:
+                change = stream.try_next()
+                if change is None:
+                    continue
+                self._publish('on_change', change)
+                self._set_token(change['_id'])
+
+    def _publish(self, method, *args):
+        for subscriber in self.subscribers:
+            try:
+                getattr(subscriber, method)(*args)
+            except Exception as error:  # pylint: disable=broad-except
+                # A failing subscriber must not stop the others nor the stream
+                print(f'Error when publishing a change: {error}')
+
+    def _load_token(self):
+        if not self.token_path or not os.path.exists(self.token_path):
+            return None
+        with open(self.token_path, encoding='utf-8') as file_:
+            return json_util.loads(file_.read()) or None
+
+    def _set_token(self, token):
+        self.resume_token = token
+        if not self.token_path:
+            return
+        temp_path = f'{self.token_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file_:
+            file_.write(json_util.dumps(token))
+        os.replace(temp_path, self.token_path)
@@ -0,0 +1,141 @@
+from pymongo import ASCENDING, GEOSPHERE, TEXT, IndexModel
+from pymongo.errors import PyMongoError
+
+from users.utils.env_vars import CLIENTS_COLLECTION, SHOPS_COLLECTION, SERVICES_COLLECTION, \
+    PETS_COLLECTION, TOMBSTONES_COLLECTION, SYNC_TOMBSTONES_TTL_DAYS
+
+
+# Declared indexes per collection, the source of truth for sync and drift reports
+INDEXES = {
+    CLIENTS_COLLECTION: [
+        IndexModel([('username', ASCENDING)], name='username_unique', unique=True)
+    ],
+    SHOPS_COLLECTION: [
+        IndexModel([('username', ASCENDING)], name='username_unique', unique=True),
+        IndexModel([('location', GEOSPHERE)], name='location_2dsphere'),
+        IndexModel([('name', TEXT), ('description', TEXT), ('service_names', TEXT)],
+                   name='search', weights={'name': 10, 'service_names': 5, 'description': 1},
+                   default_language='portuguese'),
+        # Listing filters, every offer filter combination has an equality
+        # prefix followed by the price range
+        IndexModel([('offers.service_id', ASCENDING), ('offers.species', ASCENDING),
+                    ('offers.price', ASCENDING)], name='offers_service_id'),
+        IndexModel([('offers.name', ASCENDING), ('offers.species', ASCENDING),
+                    ('offers.price', ASCENDING)], name='offers_name'),
+        IndexModel([('offers.species', ASCENDING), ('offers.price', ASCENDING)],
+                   name='offers_species'),
+        # Delta sync, the shops written since a time in write order
+        IndexModel([('updated_at', ASCENDING), ('_id', ASCENDING)], name='updated_at')
+    ],
+    SERVICES_COLLECTION: [
+        IndexModel([('owner_id', ASCENDING), ('_id', ASCENDING)], name='owner_id'),
+        IndexModel([('owner_id', ASCENDING), ('service_id', ASCENDING)],
+                   name='owner_service_id')
+    ],
+    PETS_COLLECTION: [
+        IndexModel([('owner_id', ASCENDING), ('_id', ASCENDING)], name='owner_id'),
+        IndexModel([('owner_id', ASCENDING), ('name', ASCENDING)], name='owner_name')
+    ],
+    TOMBSTONES_COLLECTION: [
+        IndexModel([('collection', ASCENDING), ('deleted_at', ASCENDING)],
+                   name='collection_deleted_at'),
+        IndexModel([('deleted_at', ASCENDING)], name='deleted_at_ttl',
+                   expireAfterSeconds=SYNC_TOMBSTONES_TTL_DAYS * 24 * 60 * 60)
+    ]
+}
+
+# Index options that make two indexes with the same keys different
+COMPARED_OPTIONS = ('unique', 'sparse', 'partialFilterExpression', 'expireAfterSeconds')
+
+
+class IndexManager:
+    """ Keeps the collections' indexes in line with the declared ones
+    """
+
+    def __init__(self, db_, registry=None):
+        self.db_ = db_
+        self.registry = INDEXES if registry is None else registry
+
+    def diff(self):
+        """ Compares the declared indexes with the ones in the database
+
+            Raises:
+                RuntimeError: If any errors occur while reading the indexes
+
+            Returns:
+                drift (dict): Per collection, the names of the "missing",
+                    "changed" (same name, other keys or options) and
+                    "extra" (not declared) indexes
+        """
+        drift = {}
+        for collection, models in self.registry.items():
+            try:
+                existing = self.db_[collection].index_information()
+            except PyMongoError as error:
+                print(f'Error when reading indexes from MongoDB: {error}')
+                raise RuntimeError from error
+
+            declared = {model.document['name']: model.document for model in models}
+            drift[collection] = {
+                'missing': [name for name in declared if name not in existing],
+                'changed': [
+                    name for name, spec in declared.items()
+                    if name in existing and not self._matches(spec, existing[name])
+                ],
+                'extra': [name for name in existing if name not in declared and name != '_id_']
+            }
+        return drift
+
+    def sync(self, drop=False):
+        """ Creates the missing indexes
+
+            Args:
+                drop (bool): Also drop the extra indexes and rebuild the changed ones
+
+            Raises:
+                RuntimeError: If any errors occur while doing the operation
+
+            Returns:
+                drift (dict): The drift found before syncing, see diff
+        """
+        drift = self.diff()
+        for collection, found in drift.items():
+            to_create = list(found['missing'])
+            to_drop = []
+            if drop:
+                to_drop = found['extra'] + found['changed']
+                to_create += found['changed']
+
+            models = [model for model in self.registry[collection]
+                      if model.document['name'] in to_create]
+            try:
+                for name in to_drop:
+                    self.db_[collection].drop_index(name)
+                if models:
+                    self.db_[collection].create_indexes(models)
+            except PyMongoError as error:
+                print(f'Error when syncing indexes on MongoDB: {error}')
+                raise RuntimeError from error
+
+            for kind in ('missing', 'changed', 'extra'):
+                if found[kind]:
+                    print(f'Index drift on {collection}, {kind}: {", ".join(found[kind])}')
+        return drift
+
+    @staticmethod
+    def has_drift(drift):
+        return any(names for found in drift.values() for names in found.values())
+
+    @staticmethod
+    def _matches(declared, existing):
+        declared_key = list(declared['key'].items())
+        text_fields = {field for field, kind in declared_key if kind == TEXT}
+        if text_fields:
+            # Text indexes are stored as _fts/_ftsx keys, the fields are in the weights
+            same_key = set(existing.get('weights', {})) == text_fields
+        else:
+            same_key = declared_key == list(existing['key'])
+
+        return same_key and all(
+            declared.get(option) == existing.get(option) for option in COMPARED_OPTIONS
+        )
@@ -0,0 +1,397 @@
+import bisect
+import copy
+import math
+import re
+import threading
+import unicodedata
+
+import bson
+from bson.objectid import ObjectId
+from bson.raw_bson import RawBSONDocument
+
+from users.utils.db.indexes import INDEXES
+from users.utils.db.mongo_adapter import MongoAdapter, HIDDEN_FIELDS, ITEM_COLLECTIONS, \
+    ITEM_KEYS, LISTING_FIELDS, utc_now
+from users.utils.db.pool_metrics import PoolMetricsListener
+from users.utils.db.summaries import ITEM_SUMMARIES, get_offers_query, get_service_names, \
+    replace_offers
+from users.utils.env_vars import SHOPS_COLLECTION
+
+
+# Earth radius used by MongoDB for spherical distances, in meters
+EARTH_RADIUS = 6378100
+
+# The shops' text index weights, per field
+SEARCH_WEIGHTS = next(
+    model.document['weights'] for model in INDEXES[SHOPS_COLLECTION]
+    if model.document['name'] == 'search'
+)
+
+
+class MemoryAdapter(MongoAdapter):
+    """ Keeps the users and their items in process memory, with the same
+        operations, results and errors as MongoAdapter. Meant for load
+        tests and local runs without MongoDB, nothing is persisted.
+
+        Users are kept per collection in dicts by ObjectId, along with the
+        sorted ids for keyset pages and a username index, items in dicts
+        by owner, the collections' versions and the deleted users'
+        tombstones. Stored documents are
+        copied in and out, like they would be (de)serialized by the driver.
+
+        Only MongoAdapter's id, projection and paging helpers are inherited,
+        its __init__ isn't called as there is no client. Every public method
+        is overridden (the adapter tests check it), a MongoDB path reached
+        anyway fails on db_ with a clear error instead of an AttributeError.
+    """
+
+    # pylint: disable=super-init-not-called
+    def __init__(self):
+        self.pool_metrics = PoolMetricsListener(0)
+        self.users = {}
+        self.items = {}
+        self.versions = {}
+        self.tombstones = {}
+        self._lock = threading.Lock()
+
+    @property
+    def db_(self):
+        raise RuntimeError('The memory backend has no MongoDB database, '
+                           'MemoryAdapter must override every method reading db_')
+
+    def create(self, collection, doc):
+        username = doc.get('username')
+        with self._lock:
+            users = self._get_users(collection)
+            if username in users['usernames']:
+                raise KeyError(f'User {username} already exists in {collection}')
+            self._insert(users, doc)
+            self.bump_version(collection)
+        for field in HIDDEN_FIELDS:
+            doc.pop(field, None)
+
+    def create_many(self, collection, docs):
+        results = []
+        with self._lock:
+            users = self._get_users(collection)
+            for doc in docs:
+                username = doc.get('username')
+                duplicate = username in users['usernames']
+                if not duplicate:
+                    self._insert(users, doc)
+                for field in HIDDEN_FIELDS:
+                    doc.pop(field, None)
+                if duplicate:
+                    results.append({
+                        'status': 'duplicate',
+                        'error': f'User {username} already exists in {collection}'
+                    })
+                else:
+                    results.append({'status': 'created', 'user': doc})
+            if any(result['status'] == 'created' for result in results):
+                self.bump_version(collection)
+        return results
+
+    def update(self, collection, doc, user_id):
+        user_oid = self._get_id_filter(user_id)['_id']
+        field = ITEM_COLLECTIONS.get(collection, (None, None))[0]
+        items = doc.pop(field, None) if field else None
+        with self._lock:
+            users = self._get_users(collection)
+            stored = users['docs'].get(user_oid)
+            if not stored or not (doc or items):
+                raise KeyError('Invalid user id')
+
+            username = doc.get('username', stored.get('username'))
+            if username != stored.get('username'):
+                if username in users['usernames']:
+                    raise RuntimeError(f'User {username} already exists in {collection}')
+                users['usernames'].pop(stored.get('username'), None)
+                users['usernames'][username] = user_oid
+            if doc:
+                stored.update(copy.deepcopy(doc), updated_at=utc_now())
+                stored['version'] = stored.get('version', 0) + 1
+                self.bump_version(collection)
+            updated = self._project(stored, dict.fromkeys(HIDDEN_FIELDS, False))
+
+        if items:
+            self.add_items(collection, user_id, items)
+
+        return updated
+
+    def add_items(self, collection, user_id, items):
+        item_collection = ITEM_COLLECTIONS[collection][1]
+        owner_id = self._get_id_filter(user_id)['_id']
+        docs = [dict(item, owner_id=owner_id, _id=ObjectId())
+                for item in (items if isinstance(items, list) else [items])]
+        with self._lock:
+            owned = self._get_owned(item_collection, owner_id)
+            for doc in docs:
+                owned[doc['_id']] = copy.deepcopy(doc)
+            self._touch_owner(collection, owner_id, {doc['_id']: doc for doc in docs},
+                              added=True)
+        return docs
+
+    def remove(self, collection, doc, user_id):
+        item_collection = ITEM_COLLECTIONS[collection][1]
+        owner_id = self._get_id_filter(user_id)['_id']
+        query = {ITEM_KEYS[key]: value for key, value in doc.items()
+                 if key in ITEM_KEYS and value}
+        if doc.get('item_id'):
+            query['_id'] = self._get_object_id(doc['item_id'])
+        if not query:
+            raise KeyError('No object found with set name/id')
+
+        with self._lock:
+            owned = self._get_owned(item_collection, owner_id)
+            item_oid = next((item_oid for item_oid, item in owned.items()
+                             if all(item.get(key) == value for key, value in query.items())),
+                            None)
+            if item_oid is None:
+                raise KeyError('No object found with set name/id')
+            removed = owned.pop(item_oid)
+            self._touch_owner(collection, owner_id, {item_oid: None})
+        return removed
+
+    def update_item(self, collection, user_id, item_id, changes):
+        item_collection = ITEM_COLLECTIONS[collection][1]
+        item_oid = self._get_object_id(item_id)
+        owner_id = self._get_id_filter(user_id)['_id']
+        with self._lock:
+            item = self._get_owned(item_collection, owner_id).get(item_oid)
+            if not item:
+                raise KeyError('No object found with set id')
+            item.update(copy.deepcopy(changes))
+            self._touch_owner(collection, owner_id, {item['_id']: item})
+            updated = copy.deepcopy(item)
+        return updated
+
+    def get_items(self, collection, user_id, limit=0, after=None, causal_key=None):
+        item_collection = ITEM_COLLECTIONS[collection][1]
+        owner_id = self._get_object_id(user_id)
+        after_oid = self._get_object_id(after) if after else None
+        with self._lock:
+            page = [copy.deepcopy(item)
+                    for item_oid, item in self._get_owned(item_collection, owner_id).items()
+                    if after_oid is None or item_oid > after_oid]
+        return iter(page[:limit or None])
+
+    def delete(self, collection, user_id):
+        user_oid = self._get_id_filter(user_id)['_id']
+        with self._lock:
+            users = self._get_users(collection)
+            stored = users['docs'].pop(user_oid, None)
+            if stored:
+                users['usernames'].pop(stored.get('username'), None)
+                users['ids'].remove(user_oid)
+                self.tombstones.setdefault(collection, {})[user_oid] = utc_now()
+            if collection in ITEM_COLLECTIONS:
+                self.items.get(ITEM_COLLECTIONS[collection][1], {}).pop(user_oid, None)
+            self.bump_version(collection)
+        return True
+
+    def get_user_by_username(self, collection, username):
+        with self._lock:
+            users = self._get_users(collection)
+            user_oid = users['usernames'].get(username)
+            user = copy.deepcopy(users['docs'][user_oid]) if user_oid else None
+
+        if not user:
+            raise KeyError('Invalid username or password')
+
+        return user
+
+    def set_password(self, collection, user_id, password_hash):
+        user_oid = self._get_id_filter(user_id)['_id']
+        with self._lock:
+            stored = self._get_users(collection)['docs'].get(user_oid)
+            if stored:
+                stored['password'] = password_hash
+
+    def bump_version(self, collection, session=None):
+        # Called with the lock held by the write paths
+        self.versions[collection] = self.versions.get(collection, 0) + 1
+
+    def get_version(self, collection, user_id=None, causal_key=None, primary=False):
+        user_oid = self._get_object_id(user_id) if user_id else None
+        with self._lock:
+            if user_oid:
+                return self._get_users(collection)['docs'].get(user_oid, {}).get('version', 0)
+            return self.versions.get(collection, 0)
+
+    def get_users(self, collection, limit=0, after=None, fields=None, *,  # pylint: disable=too-many-arguments
+                  filters=None, causal_key=None, raw=False, primary=False):
+        start = 0
+        projection = self._get_projection(collection, fields)
+        offers_query = get_offers_query(filters or {})
+        with self._lock:
+            users = self._get_users(collection)
+            if after:
+                start = bisect.bisect_right(users['ids'], self._get_object_id(after))
+            ids = [user_oid for user_oid in users['ids'][start:]
+                   if self._has_offer(users['docs'][user_oid], offers_query)]
+            ids = ids[:limit or None]
+            page = [self._project(users['docs'][user_oid], projection) for user_oid in ids]
+
+        if not page and not after and not filters:
+            raise KeyError('No users yet')
+
+        if raw:
+            return (RawBSONDocument(bson.encode(user)) for user in page)
+        return iter(page)
+
+    def get_users_by_ids(self, collection, user_ids, fields=None, causal_key=None):
+        object_ids = self._get_unique_object_ids(user_ids)
+        projection = self._get_projection(collection, fields)
+        with self._lock:
+            docs = self._get_users(collection)['docs']
+            users = [self._project(docs[object_id], projection)
+                     for object_id in object_ids if object_id in docs]
+            missing = [user_id for object_id, user_id in object_ids.items()
+                       if object_id not in docs]
+        return users, missing
+
+    def get_changes(self, collection, since, fields=None, causal_key=None):
+        projection = self._get_projection(collection, fields)
+        if fields:
+            projection['updated_at'] = True
+        else:
+            del projection['updated_at']
+        with self._lock:
+            docs = self._get_users(collection)['docs']
+            changed = sorted(
+                (doc for doc in docs.values()
+                 if doc.get('updated_at') and doc['updated_at'] >= since),
+                key=lambda doc: (doc['updated_at'], doc['_id'])
+            )
+            users = [self._project(doc, projection) for doc in changed]
+            deleted = [str(user_oid) for user_oid, deleted_at
+                       in self.tombstones.get(collection, {}).items() if deleted_at >= since]
+        return (RawBSONDocument(bson.encode(user)) for user in users), deleted
+
+    def get_nearby_shops(self, lng, lat, radius, limit=0, skip=0):
+        projection = dict.fromkeys(LISTING_FIELDS, True)
+        with self._lock:
+            shops = [
+                (self._get_distance((lng, lat), shop['location']['coordinates']), shop)
+                for shop in self._get_users(SHOPS_COLLECTION)['docs'].values()
+                if shop.get('location')
+            ]
+            shops = sorted((item for item in shops if item[0] <= radius), key=lambda item: item[0])
+            shops = shops[skip:skip + limit if limit else None]
+            page = [dict(self._project(shop, projection), distance=distance)
+                    for distance, shop in shops]
+        return iter(page)
+
+    def get_shop_names(self):
+        with self._lock:
+            shops = [(str(shop['_id']), shop.get('name'))
+                     for shop in self._get_users(SHOPS_COLLECTION)['docs'].values()]
+        return iter(shops)
+
+    def search_shops(self, text, limit=0, skip=0):
+        """ Approximates the text index search: shops are scored by the
+            weighted count of searched words in their fields, without
+            stemming or stop words, and must have every "quoted phrase"
+        """
+        phrases = [self._normalize(phrase) for phrase in re.findall(r'"([^"]+)"', text)]
+        words = self._normalize(re.sub(r'"[^"]*"', ' ', text)).split() + \
+            [word for phrase in phrases for word in phrase.split()]
+        projection = dict.fromkeys(LISTING_FIELDS, True)
+        with self._lock:
+            scored = []
+            for shop in self._get_users(SHOPS_COLLECTION)['docs'].values():
+                texts = {field: self._normalize(self._get_text(shop.get(field)))
+                         for field in SEARCH_WEIGHTS}
+                if not all(any(phrase in value for value in texts.values())
+                           for phrase in phrases):
+                    continue
+                score = sum(weight * texts[field].split().count(word)
+                            for field, weight in SEARCH_WEIGHTS.items() for word in words)
+                if score:
+                    scored.append((score, shop))
+            scored.sort(key=lambda item: item[0], reverse=True)
+            scored = scored[skip:skip + limit if limit else None]
+            page = [dict(self._project(shop, projection), score=score)
+                    for score, shop in scored]
+        return iter(page)
+
+    def _touch_owner(self, collection, owner_id, items, session=None, *,  # pylint: disable=too-many-arguments
+                     added=False):
+        # Called with the lock held
+        self.bump_version(collection)
+        stored = self._get_users(collection)['docs'].get(owner_id)
+        if not stored:
+            return
+        stored.update(updated_at=utc_now(), version=stored.get('version', 0) + 1)
+        if collection in ITEM_SUMMARIES:
+            offers = ITEM_SUMMARIES[collection](
+                copy.deepcopy([item for item in items.values() if item])
+            )
+            stored['offers'] = replace_offers(stored.get('offers', []), list(items),
+                                              offers['offers'], added)
+            stored['service_names'] = get_service_names(stored['offers'])
+
+    def _get_users(self, collection):
+        return self.users.setdefault(collection, {'docs': {}, 'ids': [], 'usernames': {}})
+
+    def _get_owned(self, item_collection, owner_id):
+        return self.items.setdefault(item_collection, {}).setdefault(owner_id, {})
+
+    @staticmethod
+    def _insert(users, doc):
+        doc.update(_id=ObjectId(), version=1, updated_at=utc_now())
+        users['docs'][doc['_id']] = copy.deepcopy(doc)
+        users['usernames'][doc.get('username')] = doc['_id']
+        # Ids are generated in increasing order, append keeps them sorted
+        users['ids'].append(doc['_id'])
+
+    @staticmethod
+    def _has_offer(doc, offers_query):
+        if not offers_query:
+            return True
+        match = offers_query['offers']['$elemMatch']
+        return any(all(MemoryAdapter._matches(offer.get(key), condition)
+                       for key, condition in match.items())
+                   for offer in doc.get('offers', []))
+
+    @staticmethod
+    def _matches(value, condition):
+        if not isinstance(condition, dict):
+            return value == condition
+        return value is not None and \
+            condition.get('$gte', value) <= value <= condition.get('$lte', value)
+
+    @staticmethod
+    def _project(doc, projection):
+        if not any(projection.values()):
+            return copy.deepcopy({key: value for key, value in doc.items()
+                                  if key not in projection})
+
+        projected = {'_id': doc['_id']}
+        for field in projection:
+            parent, _, child = field.partition('.')
+            if parent not in doc:
+                continue
+            if not child:
+                projected[parent] = copy.deepcopy(doc[parent])
+            elif isinstance(doc[parent], dict) and child in doc[parent]:
+                projected.setdefault(parent, {})[child] = copy.deepcopy(doc[parent][child])
+        return projected
+
+    @staticmethod
+    def _get_distance(point, other):
+        lng, lat, other_lng, other_lat = map(math.radians, (*point, *other))
+        haversine = math.sin((other_lat - lat) / 2) ** 2 + \
+            math.cos(lat) * math.cos(other_lat) * math.sin((other_lng - lng) / 2) ** 2
+        return 2 * EARTH_RADIUS * math.asin(math.sqrt(haversine))
+
+    @staticmethod
+    def _get_text(value):
+        return ' '.join(value) if isinstance(value, list) else str(value or '')
+
+    @staticmethod
+    def _normalize(text):
+        decomposed = unicodedata.normalize('NFKD', text.casefold())
+        return ''.join(char if char.isalnum() or char.isspace() else ' '
+                       for char in decomposed if not unicodedata.combining(char))
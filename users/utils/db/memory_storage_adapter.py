@@ -0,0 +1,96 @@
+import io
+import os
+import threading
+
+from users.utils.id_generator import generate_id
+
+
+class MemoryStorageAdapter:
+    """ Keeps the uploaded files' bytes in process memory, with the same
+        operations, results and errors as StorageAdapter. Meant for load
+        tests and local runs without IBM COS, nothing is persisted.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self._lock = threading.Lock()
+
+    def upload(self, file_obj, existing_file_id=None):
+        """ Stores a file with a generated name
+
+            Args:
+                file_obj (werkzeug.datastructures.FileStorage):
+                    An object representing a file from the request
+
+            Raises:
+                RuntimeError: If the file can't be read
+
+            Returns:
+                file_id (str): The name of the stored file
+        """
+        file_id = existing_file_id if existing_file_id \
+            else f'{generate_id()}{os.path.splitext(file_obj.filename)[1]}'
+        file_obj.filename = file_id
+
+        try:
+            content = file_obj.read()
+            file_obj.close()
+        except Exception as error:
+            error_message = f'Unexpected error occurred when uploading to memory: {error}'
+            print(error_message)
+            raise RuntimeError(error_message) from error
+
+        with self._lock:
+            self.objects[file_id] = content
+        return file_id
+
+    def download(self, file_id):
+        """ Reads a stored file
+
+            Args:
+                file_id (str): The name of the file
+
+            Raises:
+                RuntimeError: If there's no such file
+
+            Returns:
+                file (obj): File object representing a binary
+        """
+        with self._lock:
+            content = self.objects.get(file_id)
+        if content is None:
+            error_message = f'Error when downloading file from memory: no such key {file_id}'
+            print(error_message)
+            raise RuntimeError(error_message)
+        return io.BytesIO(content)
+
+    def delete(self, file_id):
+        """ Deletes a stored file, like COS deleting a missing file succeeds
+
+            Args:
+                file_id (str): The name of the file
+
+            Returns:
+                bool: Deleted or not
+        """
+        with self._lock:
+            self.objects.pop(file_id, None)
+        return True
+
+    def replace(self, file_id, new_file):
+        """ Replaces a stored file
+
+            Args:
+                file_id (str): The file's name
+                new_file (werkzeug.datastructures.FileStorage):
+                    An object representing a file from the request
+
+            Raises:
+                RuntimeError: If the new file can't be read
+
+            Returns:
+                new_ (str): New file's id, the same id
+        """
+        if self.delete(file_id):
+            return self.upload(new_file, file_id)
+        raise RuntimeError(f'Not able to delete {file_id}')
@@ -1,10 +1,94 @@
+import itertools
+from datetime import datetime, timezone
+
+from bson.codec_options import CodecOptions
+from bson.errors import InvalidId
 from bson.objectid import ObjectId
+from bson.raw_bson import RawBSONDocument
 
-from pymongo import MongoClient
+from pymongo import ASCENDING, MongoClient, ReadPreference
 from pymongo.collection import ReturnDocument
-from pymongo.errors import DuplicateKeyError, PyMongoError
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+
+from users.utils.db.causal import CausalTokens, get_read_preference
+from users.utils.db.pool_metrics import PoolMetricsListener
+from users.utils.db.summaries import ITEM_SUMMARIES, SERVICE_NAMES_UPDATE, get_offers_query, \
+    get_offers_update
+from users.utils.env_vars import MONGO_CONNECTION_STRING, CLIENTS_COLLECTION, \
+    SHOPS_COLLECTION, SERVICES_COLLECTION, PETS_COLLECTION, MONGO_MAX_POOL_SIZE, \
+    MONGO_MIN_POOL_SIZE, MONGO_WAIT_QUEUE_TIMEOUT_MS, MONGO_SERVER_SELECTION_TIMEOUT_MS, \
+    MONGO_COMPRESSORS, MONGO_READ_PREFERENCE, MONGO_MAX_STALENESS_SECONDS, \
+    MONGO_CAUSAL_TOKENS_SIZE, VERSIONS_COLLECTION, TOMBSTONES_COLLECTION
+
+
+DUPLICATE_KEY_CODE = 11000
+
+# Read-only listings keep the documents as the BSON bytes read from the
+# server, they're only decoded when encoded to JSON
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+# ObjectId type byte and "_id" name, right after the document length
+RAW_ID_HEADER = b'\x07_id\x00'
+
+# Fields that can be requested with sparse fieldsets, per collection
+PROJECTABLE_FIELDS = {
+    CLIENTS_COLLECTION: [
+        'username', 'type', 'name', 'email', 'address', 'cpf', 'phone_number'
+    ],
+    SHOPS_COLLECTION: [
+        'username', 'type', 'name', 'pics', 'pics.profile', 'pics.banner', 'email',
+        'address', 'cnpj', 'phone_number', 'description', 'hours', 'location'
+    ]
+}
+
+# Fields returned by the nearby and search queries, besides _id and distance or score
+LISTING_FIELDS = ['username', 'name', 'pics.profile', 'address', 'phone_number', 'hours',
+                  'location']
+
+# Fields kept out of the users' responses: the password hash, the items
+# summary kept for the search and filters, and the version and time of the
+# last write, kept for the entity tags and delta syncs
+HIDDEN_FIELDS = ['password', 'offers', 'service_names', 'version', 'updated_at']
+
+# Per user collection, the array field whose items are kept as documents
+# of their own collection (keyed by owner_id) and that collection
+ITEM_COLLECTIONS = {
+    CLIENTS_COLLECTION: ('pets', PETS_COLLECTION),
+    SHOPS_COLLECTION: ('services', SERVICES_COLLECTION)
+}
+
+# Removal arguments and the item field they match
+ITEM_KEYS = {
+    'service_id': 'service_id',
+    'pet_name': 'name'
+}
+
+
+def get_document_id(doc):
+    """ Reads a document's _id as a string
+
+        Raw documents read from MongoDB start with their _id, so
+        it's taken from the BSON header without decoding the rest.
+
+        Args:
+            doc (dict/RawBSONDocument): The document
+
+        Returns:
+            (str): The _id
+    """
+    if isinstance(doc, RawBSONDocument) and doc.raw[4:9] == RAW_ID_HEADER:
+        return str(ObjectId(doc.raw[9:21]))
+    return str(doc['_id'])
 
-from users.utils.env_vars import MONGO_CONNECTION_STRING
+
+def utc_now():
+    """ The current UTC time as MongoDB stores it, naive and in milliseconds
+
+        Returns:
+            (datetime): The time
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
 
 
 class MongoAdapter:
@@ -12,11 +96,25 @@ class MongoAdapter:
     """
 
     def __init__(self):
+        self.pool_metrics = PoolMetricsListener(MONGO_MAX_POOL_SIZE)
         self.client = MongoClient(
             MONGO_CONNECTION_STRING,
-            connect=True
+            connect=True,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            compressors=MONGO_COMPRESSORS,
+            event_listeners=[self.pool_metrics]
         )
         self.db_ = self.client.petlife
+        # Listing and lookup reads may go to secondaries, writes always go to the primary
+        self.read_preference = get_read_preference(
+            MONGO_READ_PREFERENCE, MONGO_MAX_STALENESS_SECONDS
+        )
+        self.causal_tokens = CausalTokens(
+            self.client, MONGO_CAUSAL_TOKENS_SIZE, MONGO_MAX_STALENESS_SECONDS
+        )
 
     def create(self, collection, doc):
         """ Creates a document on set collection
@@ -32,10 +130,13 @@ class MongoAdapter:
                 doc with id
         """
         username = doc.get('username')
+        doc.update(version=1, updated_at=utc_now())
+        session = self.causal_tokens.start_session(username)
         try:
-            self.db_[collection].insert_one(doc)
-            doc['_id'] = str(doc['_id'])
-            del doc['password']
+            self.db_[collection].insert_one(doc, session=session)
+            self.bump_version(collection, session)
+            for field in HIDDEN_FIELDS:
+                doc.pop(field, None)
             # PyMongo's insert_one modifies the input value
             # instead of returning a modified version (yikes)
             # so there's no need to return the value, as the "doc"
@@ -44,103 +145,284 @@ class MongoAdapter:
         except DuplicateKeyError as error:
             raise KeyError(f'User {username} already exists in {collection}') from error
 
+        finally:
+            # The new user's next login and reads see the user
+            user_id = str(doc['_id']) if '_id' in doc else None
+            self.causal_tokens.end_session(session, username, user_id)
+
+    def create_many(self, collection, docs):
+        """ Creates many documents on set collection in one unordered
+            bulk insert, so one failure doesn't stop the others
+
+            Args:
+                collection (str): The collection to be appended
+                docs (list): The documents being inserted
+
+            Raises:
+                RuntimeError: If any errors other than write errors occur
+
+            Returns:
+                results (list): Per document, in the same order, either
+                    {'status': 'created', 'user': doc with id} or
+                    {'status': 'duplicate' | 'error', 'error': message}
+        """
+        if not docs:
+            return []
+
+        updated_at = utc_now()
+        for doc in docs:
+            doc.update(version=1, updated_at=updated_at)
+
+        write_errors = {}
+        try:
+            try:
+                self.db_[collection].insert_many(docs, ordered=False)
+
+            except BulkWriteError as error:
+                write_errors = {
+                    write_error['index']: write_error
+                    for write_error in error.details.get('writeErrors', [])
+                }
+
+            if len(write_errors) < len(docs):
+                self.bump_version(collection)
+
+        except PyMongoError as error:
+            print(f'Error when performing bulk insert on MongoDB: {error}')
+            raise RuntimeError from error
+
+        results = []
+        for index, doc in enumerate(docs):
+            for field in HIDDEN_FIELDS:
+                doc.pop(field, None)
+            write_error = write_errors.get(index)
+            if not write_error:
+                results.append({'status': 'created', 'user': doc})
+            elif write_error.get('code') == DUPLICATE_KEY_CODE:
+                results.append({
+                    'status': 'duplicate',
+                    'error': f'User {doc.get("username")} already exists in {collection}'
+                })
+            else:
+                results.append({'status': 'error', 'error': write_error.get('errmsg')})
+        return results
+
     def update(self, collection, doc, user_id):
         """ Finds and updates a document in a collection
 
+            Items of the array fields ("services" or "pets") are
+            added to their own collection instead of the user document.
+
             Args:
                 collection (str): The collection where the document is
-                doc (dict): The document or partial document to be updated
-                            (must contain username field)
+                doc (dict): The document or partial document to be updated,
+                            "services" and "pets" may hold one item or a list of them
+                user_id (str): The user's id
 
             Raises:
+                KeyError: If the user isn't found or there's nothing to update
                 RuntimeError: If any errors occur while doing the operation
 
             Returns:
-                Operation's acknowledgement (bool)
+                updated (dict): The updated user object
         """
         filter_ = self._get_id_filter(user_id)
+        field = ITEM_COLLECTIONS.get(collection, (None, None))[0]
+        items = doc.pop(field, None) if field else None
+        session = self.causal_tokens.start_session(user_id)
         try:
             updated = None
-            if doc.get('services'):
-                updated = self.db_[collection].find_one_and_update(
-                    filter_,
-                    {'$push': {'services': doc.get('services')}},
-                    projection={'password': False},
-                    return_document=ReturnDocument.AFTER
-                )
-                del doc['services']
-
-            if doc.get('pets'):
-                updated = self.db_[collection].find_one_and_update(
-                    filter_,
-                    {'$push': {'pets': doc.get('pets')}},
-                    projection={'password': False},
-                    return_document=ReturnDocument.AFTER
-                )
-                del doc['pets']
-
             if doc:
                 updated = self.db_[collection].find_one_and_update(
                     filter_,
-                    {'$set': doc},
-                    projection={'password': False},
-                    return_document=ReturnDocument.AFTER
+                    {'$set': dict(doc, updated_at=utc_now()), '$inc': {'version': 1}},
+                    projection=dict.fromkeys(HIDDEN_FIELDS, False),
+                    return_document=ReturnDocument.AFTER,
+                    session=session
+                )
+            elif items:
+                updated = self.db_[collection].find_one(
+                    filter_, projection=dict.fromkeys(HIDDEN_FIELDS, False), session=session
                 )
 
             if not updated:
                 raise KeyError('Invalid user id')
 
-            updated['_id'] = str(updated['_id'])
+            if doc:
+                self.bump_version(collection, session)
+            if items:
+                self.add_items(collection, user_id, items)
+
             return updated
 
         except PyMongoError as error:
             print(f'Error when performing update on MongoDB: {error}')
             raise RuntimeError from error
 
+        finally:
+            self.causal_tokens.end_session(session, user_id)
+
+    def add_items(self, collection, user_id, items):
+        """ Adds items (services or pets) to a user with a single insert
+
+            Args:
+                collection (str): The user's collection
+                user_id (str): The owner's id
+                items (dict/list): One item or a list of them
+
+            Raises:
+                RuntimeError: If any errors occur while doing the operation
+
+            Returns:
+                (list): The created items, with their ids
+        """
+        item_collection = ITEM_COLLECTIONS[collection][1]
+        owner_id = self._get_id_filter(user_id)['_id']
+        docs = [dict(item, owner_id=owner_id)
+                for item in (items if isinstance(items, list) else [items])]
+        session = self.causal_tokens.start_session(user_id)
+        try:
+            self.db_[item_collection].insert_many(docs, session=session)
+            self._touch_owner(collection, owner_id, {doc.get('_id'): doc for doc in docs},
+                              session, added=True)
+            return docs
+
+        except PyMongoError as error:
+            print(f'Error when performing insert on MongoDB: {error}')
+            raise RuntimeError from error
+
+        finally:
+            self.causal_tokens.end_session(session, user_id)
+
     def remove(self, collection, doc, user_id):
-        """ Finds and updates a document in a collection
+        """ Finds and deletes one of the user's items (service or pet)
 
             Args:
-                collection (str): The collection where the document is
-                doc (dict): The document or partial document to be updated
-                            (must contain username field)
+                collection (str): The user's collection
+                doc (dict): Holds the "item_id", "service_id" or "pet_name"
+                            of the item to be removed
+                user_id (str): The owner's id
 
             Raises:
+                KeyError: If no item matches
+                ValueError: When the item id is not a valid id
                 RuntimeError: If any errors occur while doing the operation
 
             Returns:
-                Operation's acknowledgement (bool)
+                removed (dict): The removed item
         """
-        filter_ = self._get_id_filter(user_id)
+        item_collection = ITEM_COLLECTIONS[collection][1]
+        query = {'owner_id': self._get_id_filter(user_id)['_id']}
+        query.update({ITEM_KEYS[key]: value for key, value in doc.items()
+                      if key in ITEM_KEYS and value})
+        if doc.get('item_id'):
+            query['_id'] = self._get_object_id(doc['item_id'])
+        if len(query) == 1:
+            raise KeyError('No object found with set name/id')
+
+        session = self.causal_tokens.start_session(user_id)
         try:
-            if doc.get('service_id'):
-                alteration = {'$pull': {'services': {'service_id': doc['service_id']}}}
-            elif doc.get('pet_name'):
-                alteration = {'$pull': {'pets': {'name': doc['pet_name']}}}
+            removed = self.db_[item_collection].find_one_and_delete(query, session=session)
+
+            if not removed:
+                raise KeyError('No object found with set name/id')
+
+            self._touch_owner(collection, query['owner_id'], {removed['_id']: None}, session)
+            return removed
+
+        except PyMongoError as error:
+            print(f'Error when performing deletion on MongoDB: {error}')
+            raise RuntimeError from error
 
-            updated = self.db_[collection].find_one_and_update(
-                filter_,
-                alteration,
-                projection={'password': False},
-                return_document=ReturnDocument.AFTER
+        finally:
+            self.causal_tokens.end_session(session, user_id)
+
+    def update_item(self, collection, user_id, item_id, changes):
+        """ Finds and updates one of the user's items (service or pet)
+
+            Args:
+                collection (str): The user's collection
+                user_id (str): The owner's id
+                item_id (str): The item's id
+                changes (dict): The fields to be set on the item
+
+            Raises:
+                KeyError: If the user has no such item
+                ValueError: When the item id is not a valid id
+                RuntimeError: If any errors occur while doing the operation
+
+            Returns:
+                updated (dict): The updated item
+        """
+        item_collection = ITEM_COLLECTIONS[collection][1]
+        query = {
+            '_id': self._get_object_id(item_id),
+            'owner_id': self._get_id_filter(user_id)['_id']
+        }
+        session = self.causal_tokens.start_session(user_id)
+        try:
+            updated = self.db_[item_collection].find_one_and_update(
+                query,
+                {'$set': changes},
+                return_document=ReturnDocument.AFTER,
+                session=session
             )
 
             if not updated:
-                raise KeyError('No object found with set name/id')
+                raise KeyError('No object found with set id')
 
-            updated['_id'] = str(updated['_id'])
+            self._touch_owner(collection, query['owner_id'], {updated['_id']: updated}, session)
             return updated
 
         except PyMongoError as error:
             print(f'Error when performing update on MongoDB: {error}')
             raise RuntimeError from error
 
+        finally:
+            self.causal_tokens.end_session(session, user_id)
+
+    def get_items(self, collection, user_id, limit=0, after=None, causal_key=None):
+        """ Search for a page of a user's items (services or pets)
+
+            Keyset paginated by _id like get_users, the items
+            are yielded as the cursor produces them.
+
+            Args:
+                collection (str): The user's collection
+                user_id (str): The owner's id
+                limit (int): Max number of items, 0 means no limit
+                after (str): The _id of the last item of the previous page
+                causal_key (str): The requester's id, to read their own writes
+
+            Raises:
+                ValueError: When the user id or "after" is not a valid id
+
+            Returns:
+                items (generator): The found items
+        """
+        item_collection = ITEM_COLLECTIONS[collection][1]
+        query = {'owner_id': self._get_object_id(user_id)}
+        if after:
+            query['_id'] = {'$gt': self._get_object_id(after)}
+
+        session = self.causal_tokens.start_session(causal_key)
+        cursor = self._reader(item_collection).find(
+            query,
+            sort=[('_id', ASCENDING)],
+            limit=limit,
+            session=session
+        )
+        return self._end_session_after(cursor, session, causal_key)
+
     def delete(self, collection, user_id):
-        """ Finds and deletes a document in a collection
+        """ Finds and deletes a document in a collection, along with its items
+
+            A tombstone with the deletion time is left in its place, so
+            delta syncs report the deletion until the tombstone expires.
 
             Args:
                 collection (str): The collection where the document is
-                doc (dict): The document to be deleted (must contain username field)
+                user_id (str): The user's id
 
             Raises:
                 RuntimeError: If any errors occur while doing the operation
@@ -150,51 +432,419 @@ class MongoAdapter:
         """
         filter_ = self._get_id_filter(user_id)
         try:
-            self.db_[collection].delete_one(filter_)
+            deleted = self.db_[collection].delete_one(filter_).deleted_count
+            if collection in ITEM_COLLECTIONS:
+                item_collection = ITEM_COLLECTIONS[collection][1]
+                self.db_[item_collection].delete_many({'owner_id': filter_['_id']})
+            if deleted:
+                self.db_[TOMBSTONES_COLLECTION].replace_one(
+                    {'_id': filter_['_id']},
+                    {'collection': collection, 'deleted_at': utc_now()},
+                    upsert=True
+                )
+            self.bump_version(collection)
             return True
 
         except PyMongoError as error:
             print(f'Error when performing deletion on MongoDB: {error}')
             raise RuntimeError from error
 
-    def get_user_by_username(self, collection, username, password):
-        """ Search for an specific user by username and password
+    def get_user_by_username(self, collection, username):
+        """ Search for an specific user by username
+
+            Read from the primary, so the password verified is never one
+            a lagging secondary still has after a password change.
 
             Args:
                 collection (str): The collection to be searched on
                 username (str): The username to search
-                password (str): Must be exact match
+
+            Raises:
+                KeyError: When the user isn't found
 
             Returns:
-                user_obejct (dict): The whole user object stored in MongoDB
+                user_obejct (dict): The whole user object stored in MongoDB,
+                    including the password hash so it can be verified
         """
-        query = {'username': username, 'password': password}
-        user = self.db_[collection].find_one(query, projection={'password': False})
+        session = self.causal_tokens.start_session(username)
+        try:
+            user = self._reader(collection, primary=True).find_one(
+                {'username': username}, session=session
+            )
+        finally:
+            self.causal_tokens.end_session(session, username)
 
         if not user:
             raise KeyError('Invalid username or password')
 
-        user['_id'] = str(user['_id'])
         return user
 
-    def get_users(self, collection):
-        """ Search for all the users in a collection
+    def set_password(self, collection, user_id, password_hash):
+        """ Replaces a user's stored password hash
+
+            Args:
+                collection (str): The collection where the document is
+                user_id (str): The user's id
+                password_hash (str): The new encoded hash
+
+            Raises:
+                RuntimeError: If any errors occur while doing the operation
+        """
+        filter_ = self._get_id_filter(user_id)
+        try:
+            self.db_[collection].update_one(filter_, {'$set': {'password': password_hash}})
+
+        except PyMongoError as error:
+            print(f'Error when performing update on MongoDB: {error}')
+            raise RuntimeError from error
+
+    def bump_version(self, collection, session=None):
+        """ Increments a user collection's version, invalidating the
+            entity tags of its listings
+
+            Called after the write it versions, so a reader never pairs a
+            new version with documents older than it. The write paths call
+            it, bulk tools writing to the collection directly must too.
+
+            Args:
+                collection (str): The user collection
+                session (ClientSession): The write's session, if any
+        """
+        self.db_[VERSIONS_COLLECTION].update_one(
+            {'_id': collection},
+            {'$inc': {'version': 1}, '$set': {'updated_at': utc_now()}},
+            upsert=True,
+            session=session
+        )
+
+    def get_version(self, collection, user_id=None, causal_key=None, primary=False):
+        """ Reads the version of a collection or of one of its users
+
+            Every write to a user collection increments its version, and
+            the written user's, along with their "updated_at". Only the
+            version is read, so it's cheap enough to be checked on every
+            request, before any document is fetched.
+
+            Args:
+                collection (str): The user collection
+                user_id (str): The user's id, the collection's version if empty
+                causal_key (str): The requester's id, to read their own writes
+                primary (bool): Read from the primary, whatever the read preference
+
+            Raises:
+                ValueError: When the user id is not a valid id
+
+            Returns:
+                (int): The version, 0 when nothing was written yet
+        """
+        session = self.causal_tokens.start_session(causal_key)
+        try:
+            if user_id:
+                doc = self._reader(collection, primary=primary).find_one(
+                    {'_id': self._get_object_id(user_id)},
+                    projection={'version': True},
+                    session=session
+                )
+            else:
+                doc = self._reader(VERSIONS_COLLECTION, primary=primary).find_one(
+                    {'_id': collection}, session=session
+                )
+        finally:
+            self.causal_tokens.end_session(session, causal_key)
+
+        return doc.get('version', 0) if doc else 0
+
+    def get_users(self, collection, limit=0, after=None, fields=None, *,  # pylint: disable=too-many-arguments
+                  filters=None, causal_key=None, raw=False, primary=False):
+        """ Search for a page of users in a collection
+
+            Pages are keyset based: documents are sorted by _id and
+            the next page starts right after the last _id of the previous
+            one, so no documents are skipped server side. The documents are
+            yielded as the cursor produces them instead of being loaded
+            into a list.
 
             Args:
                 collection (str): The collection to be searched on
+                limit (int): Max number of documents, 0 means no limit
+                after (str): The _id of the last document of the previous page
+                fields (list): Only return these fields, all but the hidden ones if empty
+                filters (dict): Any of the offer filters, matched by one same offer
+                causal_key (str): The requester's id, to read their own writes
+                raw (bool): Return read-only RawBSONDocuments, for listings that
+                    are only encoded to JSON
+                primary (bool): Read from the primary, whatever the read preference,
+                    for pages that are cached
+
+            Raises:
+                KeyError: When there are no users in the collection (unfiltered listings)
+                ValueError: When "after" is not a valid id or a field can't be requested
 
             Returns:
-                result_list (list): List of found documents
+                users (generator): The found documents
         """
-        result_list = list(self.db_[collection].find({}, projection={'password': False}))
+        query = get_offers_query(filters or {})
+        if after:
+            query['_id'] = {'$gt': self._get_object_id(after)}
+
+        projection = self._get_projection(collection, fields)
+        session = self.causal_tokens.start_session(causal_key)
+        try:
+            cursor = self._reader(collection, raw, primary).find(
+                query,
+                projection=projection,
+                sort=[('_id', ASCENDING)],
+                limit=limit,
+                session=session
+            )
+            first = next(cursor, None)
+        except PyMongoError:
+            self.causal_tokens.end_session(session)
+            raise
 
-        if not result_list:
+        if not first and not after and not filters:
+            self.causal_tokens.end_session(session, causal_key)
             raise KeyError('No users yet')
 
-        for user in result_list:
-            user['_id'] = str(user['_id'])
+        return self._end_session_after(self._resume(first, cursor), session, causal_key)
+
+    def get_users_by_ids(self, collection, user_ids, fields=None, causal_key=None):
+        """ Looks users up by their ids with a single $in query
+
+            Ids are case insensitive hex, so repeated ones are dropped once
+            parsed, the first one keeps its position.
+
+            Args:
+                collection (str): The collection to be searched on
+                user_ids (list): The users' ids
+                fields (list): Only return these fields, all but the hidden ones if empty
+                causal_key (str): The requester's id, to read their own writes
+
+            Raises:
+                ValueError: When an id is not a valid id or a field can't be requested
+
+            Returns:
+                (tuple): The found users, in the order of their ids, and
+                    the ids that weren't found
+        """
+        object_ids = self._get_unique_object_ids(user_ids)
+        projection = self._get_projection(collection, fields)
+        session = self.causal_tokens.start_session(causal_key)
+        try:
+            found = {
+                user['_id']: user for user in self._reader(collection).find(
+                    {'_id': {'$in': list(object_ids)}}, projection=projection, session=session
+                )
+            }
+        finally:
+            self.causal_tokens.end_session(session, causal_key)
+
+        users = [found[object_id] for object_id in object_ids if object_id in found]
+        missing = [user_id for object_id, user_id in object_ids.items()
+                   if object_id not in found]
+        return users, missing
 
-        return result_list
+    def get_changes(self, collection, since, fields=None, causal_key=None):
+        """ Reads what changed in a collection since a time, for delta syncs
+
+            Every write path sets the users' "updated_at" and deletions
+            leave tombstones, so both are read from their own indexes.
+            Users are read as raw BSON, oldest write first, and always
+            carry their "updated_at".
+
+            Args:
+                collection (str): The collection to be read
+                since (datetime): Naive UTC time, changes at or after it are read
+                fields (list): Only return these fields, all but the hidden ones if empty
+                causal_key (str): The requester's id, to read their own writes
+
+            Raises:
+                ValueError: When a field can't be requested
+
+            Returns:
+                (tuple): The users written since, as a generator of
+                    RawBSONDocuments, and the ids of the users deleted since
+        """
+        projection = self._get_projection(collection, fields)
+        # Delta syncs resume from the last change's "updated_at"
+        if fields:
+            projection['updated_at'] = True
+        else:
+            del projection['updated_at']
+
+        session = self.causal_tokens.start_session(causal_key)
+        try:
+            deleted = [
+                str(tombstone['_id']) for tombstone in self._reader(TOMBSTONES_COLLECTION).find(
+                    {'collection': collection, 'deleted_at': {'$gte': since}},
+                    projection={'_id': True},
+                    session=session
+                )
+            ]
+            cursor = self._reader(collection, True).find(
+                {'updated_at': {'$gte': since}},
+                projection=projection,
+                sort=[('updated_at', ASCENDING), ('_id', ASCENDING)],
+                session=session
+            )
+            first = next(cursor, None)
+        except PyMongoError:
+            self.causal_tokens.end_session(session)
+            raise
+
+        users = self._end_session_after(self._resume(first, cursor), session, causal_key)
+        return users, deleted
+
+    def get_nearby_shops(self, lng, lat, radius, limit=0, skip=0):
+        """ Search for the shops around a point, nearest first
+
+            Uses $geoNear on the shops' 2dsphere location index,
+            only the listing fields are returned.
+
+            Args:
+                lng (float): The point's longitude
+                lat (float): The point's latitude
+                radius (float): Max distance from the point, in meters
+                limit (int): Max number of shops, 0 means no limit
+                skip (int): Number of nearer shops to skip
+
+            Raises:
+                RuntimeError: If any errors occur while doing the operation
+
+            Returns:
+                shops (generator): The found shops, with their "distance" in meters
+        """
+        pipeline = [
+            {'$geoNear': {
+                'near': {'type': 'Point', 'coordinates': [lng, lat]},
+                'distanceField': 'distance',
+                'maxDistance': radius,
+                'spherical': True
+            }},
+            {'$project': dict({field: True for field in LISTING_FIELDS}, distance=True)}
+        ]
+        if skip:
+            pipeline.insert(1, {'$skip': skip})
+        if limit:
+            pipeline.insert(-1, {'$limit': limit})
+
+        try:
+            cursor = self._reader(SHOPS_COLLECTION).aggregate(pipeline)
+            return self._resume(next(cursor, None), cursor)
+
+        except PyMongoError as error:
+            print(f'Error when performing aggregation on MongoDB: {error}')
+            raise RuntimeError from error
+
+    def get_shop_names(self):
+        """ Reads every shop's name, for the in-process name index
+
+            Returns:
+                (generator): The (shop id, name) pairs
+        """
+        cursor = self._reader(SHOPS_COLLECTION).find({}, projection={'name': True})
+        return ((str(shop['_id']), shop.get('name')) for shop in cursor)
+
+    def search_shops(self, text, limit=0, skip=0):
+        """ Full text search on the shops' name, description and service names
+
+            Uses the shops' text index, the most relevant shops come first
+            and only the listing fields are returned.
+
+            Args:
+                text (str): The searched words or "quoted phrases"
+                limit (int): Max number of shops, 0 means no limit
+                skip (int): Number of more relevant shops to skip
+
+            Raises:
+                RuntimeError: If any errors occur while doing the operation
+
+            Returns:
+                shops (generator): The found shops, with their relevance "score"
+        """
+        score = {'$meta': 'textScore'}
+        try:
+            cursor = self._reader(SHOPS_COLLECTION).find(
+                {'$text': {'$search': text}},
+                projection=dict({field: True for field in LISTING_FIELDS}, score=score),
+                sort=[('score', score)],
+                skip=skip,
+                limit=limit
+            )
+            return self._resume(next(cursor, None), cursor)
+
+        except PyMongoError as error:
+            print(f'Error when performing search on MongoDB: {error}')
+            raise RuntimeError from error
+
+    def _touch_owner(self, collection, owner_id, items, session=None, *,  # pylint: disable=too-many-arguments
+                     added=False):
+        # Item writes are writes to their owner: its version is incremented
+        # and the written items' summary, if the collection has one, synced
+        # by a single update, without reading the owner or its other items.
+        # "items" are the written items by id, None when removed
+        update = {'$set': {'updated_at': utc_now()}, '$inc': {'version': 1}}
+        if collection in ITEM_SUMMARIES:
+            offers = ITEM_SUMMARIES[collection]([item for item in items.values() if item])
+            update = [
+                {'$set': {
+                    'updated_at': utc_now(),
+                    'version': {'$add': [{'$ifNull': ['$version', 0]}, 1]},
+                    'offers': get_offers_update(list(items), offers['offers'], added)
+                }},
+                {'$set': {'service_names': SERVICE_NAMES_UPDATE}}
+            ]
+        self.db_[collection].update_one({'_id': owner_id}, update, session=session)
+        self.bump_version(collection, session)
+
+    def _reader(self, collection, raw=False, primary=False):
+        return self.db_.get_collection(
+            collection,
+            codec_options=RAW_CODEC_OPTIONS if raw else None,
+            read_preference=ReadPreference.PRIMARY if primary else self.read_preference
+        )
+
+    def _end_session_after(self, documents, session, causal_key):
+        try:
+            yield from documents
+        finally:
+            self.causal_tokens.end_session(session, causal_key)
+
+    def _get_unique_object_ids(self, user_ids):
+        # Parsed ids by the first of their repeated ids, in order
+        object_ids = {}
+        for user_id in user_ids:
+            object_ids.setdefault(self._get_object_id(user_id), user_id)
+        return object_ids
+
+    @staticmethod
+    def _get_projection(collection, fields):
+        if not fields:
+            return dict.fromkeys(HIDDEN_FIELDS, False)
+
+        allowed = PROJECTABLE_FIELDS.get(collection, [])
+        invalid = [field for field in fields if field not in allowed]
+        if invalid:
+            raise ValueError(f'Invalid fields {", ".join(invalid)}')
+
+        # Requesting a subfield along with its parent is a path collision for Mongo
+        return {
+            field: True for field in fields
+            if '.' not in field or field.split('.')[0] not in fields
+        }
+
+    @staticmethod
+    def _resume(first, cursor):
+        # The first document is read early so errors and empty results
+        # surface before streaming, the rest are yielded as read
+        return itertools.chain([first], cursor) if first else iter(())
+
+    @staticmethod
+    def _get_object_id(id_):
+        try:
+            return ObjectId(id_)
+        except (InvalidId, TypeError) as error:
+            raise ValueError(f'Invalid id {id_}') from error
 
     @staticmethod
     def _get_id_filter(user_id):
@@ -0,0 +1,123 @@
+import threading
+import time
+
+from pymongo.monitoring import ConnectionPoolListener
+
+
+class PoolMetricsListener(ConnectionPoolListener):
+    """ Connection pool (CMAP) event listener that keeps track of
+        how long requests wait for a connection and how close the
+        pool is to being saturated.
+
+        The client keeps one pool per server, each up to the max pool
+        size, so the connections in use are also counted by server.
+    """
+
+    def __init__(self, max_pool_size):
+        self.max_pool_size = max_pool_size
+        self.counters = {
+            'checkouts': 0,
+            'checkout_failures': 0,
+            'checkout_timeouts': 0,
+            'wait_ms_total': 0.0,
+            'wait_ms_max': 0.0,
+            'waiting': 0,
+            'in_use': 0,
+            'in_use_max': 0,
+            'open': 0,
+            'created': 0,
+            'closed': 0,
+            'pool_clears': 0
+        }
+        self.servers = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def stats(self):
+        """ Snapshot of the pool metrics
+
+            Returns:
+                (dict): The counters plus the average wait, the counters by
+                    server and the saturation, the highest ratio of a server's
+                    in use connections to the max pool size
+        """
+        with self._lock:
+            stats = dict(self.counters)
+            stats['servers'] = {
+                f'{host}:{port}': dict(server) for (host, port), server in self.servers.items()
+            }
+        stats['wait_ms_avg'] = stats['wait_ms_total'] / stats['checkouts'] \
+            if stats['checkouts'] else 0.0
+        in_use = max((server['in_use'] for server in stats['servers'].values()), default=0)
+        stats['saturation'] = in_use / self.max_pool_size if self.max_pool_size else 0.0
+        return stats
+
+    def connection_check_out_started(self, event):
+        # Checkout start and end are published on the requesting thread
+        self._local.started = time.monotonic()
+        with self._lock:
+            self.counters['waiting'] += 1
+            self._server(event)['waiting'] += 1
+
+    def connection_checked_out(self, event):
+        wait_ms = self._elapsed_ms()
+        with self._lock:
+            self.counters['waiting'] -= 1
+            self.counters['checkouts'] += 1
+            self.counters['wait_ms_total'] += wait_ms
+            self.counters['wait_ms_max'] = max(self.counters['wait_ms_max'], wait_ms)
+            self.counters['in_use'] += 1
+            self.counters['in_use_max'] = max(self.counters['in_use_max'],
+                                              self.counters['in_use'])
+            server = self._server(event)
+            server['waiting'] -= 1
+            server['in_use'] += 1
+            server['in_use_max'] = max(server['in_use_max'], server['in_use'])
+
+    def connection_check_out_failed(self, event):
+        self._elapsed_ms()
+        with self._lock:
+            self.counters['waiting'] -= 1
+            self._server(event)['waiting'] -= 1
+            self.counters['checkout_failures'] += 1
+            if event.reason == 'timeout':
+                self.counters['checkout_timeouts'] += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.counters['in_use'] -= 1
+            self._server(event)['in_use'] -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.counters['created'] += 1
+            self.counters['open'] += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.counters['closed'] += 1
+            self.counters['open'] -= 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.counters['pool_clears'] += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def _server(self, event):
+        # Called holding the lock
+        if event.address not in self.servers:
+            self.servers[event.address] = {'in_use': 0, 'in_use_max': 0, 'waiting': 0}
+        return self.servers[event.address]
+
+    def _elapsed_ms(self):
+        started = getattr(self._local, 'started', None)
+        self._local.started = None
+        return (time.monotonic() - started) * 1000 if started else 0.0
@@ -0,0 +1,183 @@
+import re
+import unicodedata
+
+from users.utils.env_vars import SHOPS_COLLECTION
+
+
+# Listing filters matched against a shop's offers
+OFFER_FILTERS = ('service_id', 'service_name', 'species', 'min_price', 'max_price')
+
+
+def summarize_services(services):
+    """ Summarizes a shop's services into the fields kept on the shop
+
+        "offers" holds one entry per service and species served, with
+        the service's "item_id", normalized names and the price as a
+        number, for the listing filters, and "service_names" the distinct
+        names of the offers, for the text index. A service's offers are
+        summarized from it alone, so writes replace only its entries.
+
+        Args:
+            services (iterable): The shop's services
+
+        Returns:
+            (dict): The shop's "service_names" and "offers"
+    """
+    offers = []
+    for service in services:
+        species = service.get('species')
+        offer = {
+            'item_id': service.get('_id'),
+            'service_id': service.get('service_id'),
+            'name': normalize_key(service.get('service_name')),
+            'price': parse_price(service.get('price'))
+        }
+        offers.extend(
+            dict(offer, species=normalize_key(kind))
+            # A service without species still gets an offer, to be found by name
+            for kind in (species if isinstance(species, list) else [species]) or [None]
+        )
+    return {'service_names': get_service_names(offers), 'offers': offers}
+
+
+def get_service_names(offers):
+    """ Lists the distinct names of a shop's offers
+
+        Args:
+            offers (list): The shop's offers
+
+        Returns:
+            (list): The sorted names
+    """
+    return sorted({offer['name'] for offer in offers if offer.get('name')})
+
+
+# Aggregation expression of get_service_names, for a pipeline
+# update setting the "offers" in a previous stage
+SERVICE_NAMES_UPDATE = {'$setUnion': [{'$filter': {
+    'input': '$offers.name', 'as': 'name', 'cond': {'$ne': ['$$name', None]}
+}}]}
+
+
+# Per user collection, the function summarizing its items into fields
+# kept on the user, so users are searched and filtered without their items
+ITEM_SUMMARIES = {
+    SHOPS_COLLECTION: summarize_services
+}
+
+
+def get_offers_update(item_ids, offers, added=False):
+    """ Compiles the replacement of some items' offers into an
+        aggregation expression, for a pipeline update of the user
+
+        Only the offers of the written items are replaced, so concurrent
+        writes to other items of the same user are all kept.
+
+        Args:
+            item_ids (list): The written items' ids
+            offers (list): Their offers, empty for removed items
+            added (bool): The items were inserted, else their offers are only
+                replaced when present, a concurrently removed item isn't
+                given offers back
+
+        Returns:
+            (dict): The expression of the new "offers"
+    """
+    offers_of = {'$in': ['$$offer.item_id', item_ids]}
+    kept = {'$filter': {
+        'input': {'$ifNull': ['$offers', []]}, 'as': 'offer', 'cond': {'$not': [offers_of]}
+    }}
+    new = {'$literal': offers}
+    if not added:
+        replaced = {'$filter': {
+            'input': {'$ifNull': ['$offers', []]}, 'as': 'offer', 'cond': offers_of
+        }}
+        new = {'$cond': [{'$gt': [{'$size': replaced}, 0]}, new, []]}
+    return {'$concatArrays': [kept, new]}
+
+
+def replace_offers(current, item_ids, offers, added=False):
+    """ Applies get_offers_update to a list of offers
+
+        Args:
+            current (list): The user's offers
+            item_ids (list): The written items' ids
+            offers (list): Their offers, empty for removed items
+            added (bool): The items were inserted
+
+        Returns:
+            (list): The new offers
+    """
+    kept = [offer for offer in current if offer.get('item_id') not in item_ids]
+    if not added and len(kept) == len(current):
+        return kept
+    return kept + offers
+
+
+def get_offers_query(filters):
+    """ Compiles the listing filters into a query on the shops' offers
+
+        All the filters must match the same offer, so they're combined
+        with $elemMatch and covered by the offers indexes.
+
+        Args:
+            filters (dict): Any of the OFFER_FILTERS
+
+        Returns:
+            (dict): The query, empty when there are no filters
+    """
+    match = {}
+    if filters.get('service_id'):
+        match['service_id'] = filters['service_id']
+    if filters.get('service_name'):
+        match['name'] = normalize_key(filters['service_name'])
+    if filters.get('species'):
+        match['species'] = normalize_key(filters['species'])
+
+    price = {}
+    if filters.get('min_price') is not None:
+        price['$gte'] = filters['min_price']
+    if filters.get('max_price') is not None:
+        price['$lte'] = filters['max_price']
+    if price:
+        match['price'] = price
+
+    return {'offers': {'$elemMatch': match}} if match else {}
+
+
+def normalize_key(text):
+    """ Lowercases text and strips its accents, "Vacinação " is "vacinacao"
+
+        Args:
+            text (str): The text, may be None
+
+        Returns:
+            (str): The normalized text, None when empty
+    """
+    if not text:
+        return None
+    decomposed = unicodedata.normalize('NFKD', str(text).casefold())
+    return ' '.join(''.join(char for char in decomposed
+                            if not unicodedata.combining(char)).split()) or None
+
+
+def parse_price(price):
+    """ Reads a price as a number, "R$ 1.200,50", "80,00" and "80.5" included
+
+        Args:
+            price (str/int/float): The price as sent by the shop
+
+        Returns:
+            (float): The price, None when it can't be read
+    """
+    if isinstance(price, (int, float)) and not isinstance(price, bool):
+        return float(price)
+
+    digits = re.sub(r'[^\d.,]', '', str(price or ''))
+    if ',' in digits:
+        # Brazilian format, dots group the thousands
+        digits = digits.replace('.', '').replace(',', '.')
+    try:
+        return float(digits)
+    except ValueError:
+        return None
@@ -1,16 +1,73 @@
 import os
 
 
+# HTTP server
+SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 64))
+SERVER_MAX_THREADS = int(os.environ.get('SERVER_MAX_THREADS', -1))
+SERVER_REQUEST_QUEUE_SIZE = int(os.environ.get('SERVER_REQUEST_QUEUE_SIZE', 128))
+SERVER_ACCEPTED_QUEUE_SIZE = int(os.environ.get('SERVER_ACCEPTED_QUEUE_SIZE', -1))
+SERVER_TIMEOUT = int(os.environ.get('SERVER_TIMEOUT', 10))
+
+# Backends, "memory" keeps everything in process for load tests and local runs
+DB_BACKEND = os.environ.get('DB_BACKEND', 'mongo').lower()
+FILES_BACKEND = os.environ.get('FILES_BACKEND', 'cos').lower()
+
 # MongoDB
 MONGO_CONNECTION_STRING = str(os.environ.get('MONGO_CONNECTION_STRING'))
 CLIENTS_COLLECTION = str(os.environ.get('MONGO_CLIENTS_COLLECTION'))
 SHOPS_COLLECTION = str(os.environ.get('MONGO_SHOPS_COLLECTION'))
+SERVICES_COLLECTION = os.environ.get('MONGO_SERVICES_COLLECTION', 'services')
+PETS_COLLECTION = os.environ.get('MONGO_PETS_COLLECTION', 'pets')
+VERSIONS_COLLECTION = os.environ.get('MONGO_VERSIONS_COLLECTION', 'versions')
+TOMBSTONES_COLLECTION = os.environ.get('MONGO_TOMBSTONES_COLLECTION', 'tombstones')
+MONGO_SYNC_INDEXES = os.environ.get('MONGO_SYNC_INDEXES', 'true').lower() == 'true'
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 100))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 0))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 10000))
+MONGO_READ_PREFERENCE = os.environ.get('MONGO_READ_PREFERENCE', 'secondaryPreferred')
+MONGO_MAX_STALENESS_SECONDS = int(os.environ.get('MONGO_MAX_STALENESS_SECONDS', 90))
+MONGO_CAUSAL_TOKENS_SIZE = int(os.environ.get('MONGO_CAUSAL_TOKENS_SIZE', 10000))
+MONGO_COMPRESSORS = [
+    compressor.strip() for compressor in os.environ.get('MONGO_COMPRESSORS', 'zlib').split(',')
+    if compressor.strip()
+]
 
 # COS
 COS_API_KEY = str(os.environ.get('COS_API_KEY'))
 COS_RESOURCE_INSTANCE_ID = str(os.environ.get('COS_RESOURCE_INSTANCE_ID'))
 COS_ENDPOINT = str(os.environ.get('COS_ENDPOINT'))
 
+# Password hashing
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', 260000))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 64))
+
 # JWT
 JWT_SECRET = str(os.environ.get('JWT_SECRET'))
 JWT_TOKEN_TTL = int(os.environ.get('JWT_TOKEN_TTL', 30))
+
+# Batch registration
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 1000))
+
+# User lookup
+LOOKUP_MAX_IDS = int(os.environ.get('LOOKUP_MAX_IDS', 100))
+
+# Delta sync, deleted users are reported for as long as their tombstones are kept
+SYNC_TOMBSTONES_TTL_DAYS = int(os.environ.get('SYNC_TOMBSTONES_TTL_DAYS', 30))
+SYNC_OVERLAP_SECONDS = int(os.environ.get('SYNC_OVERLAP_SECONDS', 120))
+
+# Shop listing cache
+SHOPS_CACHE_TTL = int(os.environ.get('SHOPS_CACHE_TTL', 30))
+SHOPS_CACHE_SIZE = int(os.environ.get('SHOPS_CACHE_SIZE', 256))
+
+# Shop stream, server-sent events on a port of their own, 0 disables it
+STREAM_PORT = int(os.environ.get('STREAM_PORT', 8081))
+STREAM_MAX_CONNECTIONS = int(os.environ.get('STREAM_MAX_CONNECTIONS', 1000))
+STREAM_BUFFER_SIZE = int(os.environ.get('STREAM_BUFFER_SIZE', 1000))
+STREAM_HEARTBEAT_SECONDS = int(os.environ.get('STREAM_HEARTBEAT_SECONDS', 15))
+
+# Change streams, cross-replica cache invalidation
+CHANGE_STREAM_ENABLED = os.environ.get('CHANGE_STREAM_ENABLED', 'true').lower() == 'true'
+CHANGE_STREAM_TOKEN_FILE = os.environ.get('CHANGE_STREAM_TOKEN_FILE', '')
+CHANGE_STREAM_RETRY_SECONDS = int(os.environ.get('CHANGE_STREAM_RETRY_SECONDS', 5))
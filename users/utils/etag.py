@@ -0,0 +1,46 @@
+import hashlib
+
+from flask import Response, request
+
+
+def make_etag(*parts):
+    """ Creates a strong entity tag from what a representation depends on,
+        the version of the data and the request arguments
+
+        Args:
+            parts (tuple): The version and arguments, with stable reprs
+
+        Returns:
+            (str): The unquoted entity tag
+    """
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def get_not_modified(etag):
+    """ Checks the request's If-None-Match against the current entity tag
+
+        Args:
+            etag (str): The current entity tag
+
+        Returns:
+            (flask.Response): An empty 304 response when the client's
+                copy is current, None otherwise
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    return set_etag(Response(status=304), etag)
+
+
+def set_etag(response, etag):
+    """ Tags a response, clients keep it and revalidate it on every use
+
+        Args:
+            response (flask.Response): The response
+            etag (str): The entity tag
+
+        Returns:
+            (flask.Response): The same response
+    """
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,160 @@
+import threading
+from collections import deque
+
+from bson import json_util
+
+from users.utils.env_vars import SHOPS_COLLECTION, STREAM_BUFFER_SIZE
+from users.utils.json_encoder import encode
+
+
+# Bookkeeping fields, left out of the events' changed fields
+IGNORED_FIELDS = {'_id', 'password', 'version', 'updated_at'}
+
+# Fields summarizing the shop's services, reported as "services"
+SERVICE_FIELDS = {'offers', 'service_names'}
+
+# Sent when changes may have been missed, clients sync again
+RESET_FRAME = b'event: reset\ndata: {}\n\n'
+
+
+class ShopFeed:
+    """ Change watcher subscriber keeping the latest shop changes as
+        server-sent event frames, for the shop stream
+
+        Events only hold the shop's _id, the operation and, for updates,
+        the names of the changed fields. Their id is the change's resume token, the
+        same on every replica, so a client reconnecting to any of them
+        resumes after its Last-Event-ID while that change is kept.
+
+        Frames are encoded once and numbered, each stream keeps the
+        number of the last frame it sent. Listeners are called on the
+        watcher's thread after every new frame.
+    """
+
+    def __init__(self, size):
+        self.frames = deque(maxlen=size)
+        self.listeners = []
+        self._last = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def on_change(self, change):
+        """ Adds the event of a shop change
+
+            Args:
+                change (dict): A change stream event
+        """
+        if change.get('ns', {}).get('coll') != SHOPS_COLLECTION:
+            return
+        if 'documentKey' not in change:
+            # Collection wide events (drop, rename) may affect any shop
+            self.on_reset()
+            return
+
+        event = self.compact(change)
+        if event:
+            event_id = get_event_id(change['_id'])
+            self._add(f'id: {event_id}\n'.encode('utf-8') + b'data: ' + encode(event) + b'\n\n',
+                      event_id)
+
+    def on_reset(self):
+        """ Tells the clients to sync again, changes may have been missed
+        """
+        self._add(RESET_FRAME)
+
+    def get_position(self, event_id):
+        """ Finds where a client resuming after an event left off
+
+            Args:
+                event_id (str): The client's Last-Event-ID, None for new clients
+
+            Returns:
+                (tuple): The number of the event's frame, or of the last
+                    frame when the event isn't kept, and whether it was found
+        """
+        with self._lock:
+            if event_id:
+                for number, frame_id, _ in reversed(self.frames):
+                    if frame_id == event_id:
+                        return number, True
+            return self._last, False
+
+    def read(self, after):
+        """ Reads the frames added after a position
+
+            Args:
+                after (int): The number of the last frame sent
+
+            Returns:
+                (tuple): The frames, the number of the last one and whether
+                    frames after the position were dropped before being read
+        """
+        with self._lock:
+            if not self.frames or after >= self._last:
+                return [], after, False
+            missed = after < self.frames[0][0] - 1
+            frames = [frame for number, _, frame in self.frames if number > after]
+            return frames, self._last, missed
+
+    @staticmethod
+    def compact(change):
+        """ The event of a shop change, without any field's value
+
+            Args:
+                change (dict): A change stream event on a shop
+
+            Returns:
+                (dict): The shop's "_id", the "op" and, for updates, the
+                    changed "fields". None for updates of bookkeeping fields only
+        """
+        operation = change['operationType']
+        event = {'_id': str(change['documentKey']['_id']), 'op': operation}
+        if operation != 'update':
+            # Inserted and replaced shops are read again as a whole
+            return event
+
+        description = change.get('updateDescription', {})
+        names = list(description.get('updatedFields', {})) + \
+            description.get('removedFields', [])
+        fields = set()
+        for name in names:
+            field = name.split('.')[0]
+            if field not in IGNORED_FIELDS:
+                fields.add('services' if field in SERVICE_FIELDS else field)
+        if not fields:
+            return None
+        event['fields'] = sorted(fields)
+        return event
+
+    def _add(self, frame, event_id=None):
+        with self._lock:
+            self._last += 1
+            self.frames.append((self._last, event_id, frame))
+        for listener in self.listeners:
+            listener()
+
+
+def get_event_id(resume_token):
+    """ Writes a change's resume token as an event id
+
+        Args:
+            resume_token (dict): The change's "_id"
+
+        Returns:
+            (str): The token's hex "_data", or its extended JSON
+    """
+    data = resume_token.get('_data')
+    if isinstance(data, str):
+        return data
+    return json_util.dumps(resume_token)
+
+
+def get_shop_feed():
+    if not get_shop_feed.feed:
+        get_shop_feed.feed = ShopFeed(STREAM_BUFFER_SIZE)
+    return get_shop_feed.feed
+
+
+get_shop_feed.feed = None
@@ -0,0 +1,49 @@
+from users.utils.cache import get_listing_cache
+from users.utils.db.adapter_factory import get_mongo_adapter
+from users.utils.env_vars import SHOPS_COLLECTION
+from users.utils.suggest import get_name_index
+
+
+class CacheInvalidator:
+    """ Change watcher subscriber keeping this replica's shop caches
+        (listing pages and name index) in line with the writes
+        handled by any replica.
+    """
+
+    @staticmethod
+    def on_change(change):
+        """ Drops what the caches hold about the changed shop
+
+            Args:
+                change (dict): A change stream event
+        """
+        if change.get('ns', {}).get('coll') != SHOPS_COLLECTION:
+            return
+        if 'documentKey' not in change:
+            # Collection wide events (drop, rename) may affect any shop
+            CacheInvalidator.on_reset()
+            return
+        operation = change['operationType']
+        shop_id = str(change['documentKey']['_id'])
+        listing_cache, name_index = get_listing_cache(), get_name_index()
+
+        if operation == 'insert':
+            listing_cache.invalidate_new_user(shop_id)
+        else:
+            listing_cache.invalidate_user(shop_id)
+
+        if operation == 'delete':
+            name_index.remove(shop_id)
+            return
+        # Inserts and replacements carry the document, updates only what changed
+        document = change.get('fullDocument') or \
+            change.get('updateDescription', {}).get('updatedFields', {})
+        if 'name' in document:
+            name_index.add(shop_id, document['name'])
+
+    @staticmethod
+    def on_reset():
+        """ Starts the caches over, changes may have been missed
+        """
+        get_listing_cache().clear()
+        get_name_index().build(get_mongo_adapter().get_shop_names())
@@ -0,0 +1,80 @@
+import json
+from datetime import date, datetime
+
+import bson
+from bson.objectid import ObjectId
+from bson.raw_bson import RawBSONDocument
+from flask import current_app, make_response
+from flask.json import JSONEncoder as FlaskJSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def encode(obj):
+    """ Encodes an object as compact JSON
+
+        ObjectIds are written as their hex string and dates in ISO 8601,
+        so documents are encoded as they come from the database, raw BSON
+        documents included. Uses orjson when installed, the standard
+        library json otherwise.
+
+        Args:
+            obj (object): JSON serializable object, may hold ObjectIds, dates
+                and RawBSONDocuments
+
+        Raises:
+            TypeError: When something in the object can't be encoded
+
+        Returns:
+            (bytes): UTF-8 encoded JSON
+    """
+    if orjson:
+        return orjson.dumps(obj, default=_default)  # pylint: disable=no-member
+    return json.dumps(obj, default=_default, ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def jsonify(obj):
+    """ Creates an application/json response, like flask.json.jsonify
+
+        Args:
+            obj (object): JSON serializable object
+
+        Returns:
+            (flask.Response): The response
+    """
+    return current_app.response_class(encode(obj) + b'\n', mimetype='application/json')
+
+
+def output_json(data, code, headers=None):
+    """ flask_restful representation for application/json """
+    response = make_response(encode(data) + b'\n', code)
+    response.headers.extend(headers or {})
+    return response
+
+
+class JSONEncoder(FlaskJSONEncoder):
+    """ Flask's encoder (used by flask.json and the JWTs) with the same
+        ObjectId and date encoding as encode
+    """
+
+    def default(self, o):  # pylint: disable=method-hidden
+        try:
+            return _default(o)
+        except TypeError:
+            return super().default(o)
+
+
+def _default(obj):
+    if isinstance(obj, RawBSONDocument):
+        # Decoded with the C extension right before encoding, so the
+        # dicts only live while their document is written
+        return bson.decode(obj.raw)
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
@@ -0,0 +1,80 @@
+from flask import Response, stream_with_context
+
+from users.utils.json_encoder import encode
+
+
+def stream_json_list(items):
+    """ Creates a response that writes a JSON array item by item
+
+        Each item is encoded as soon as it's produced, so the
+        whole list never needs to be held in memory. Documents
+        can be sent as read, ObjectIds are encoded as strings.
+
+        Args:
+            items (iterable): JSON serializable objects
+
+        Returns:
+            (flask.Response): Streamed application/json response
+    """
+    return Response(
+        stream_with_context(_generate_json_list(items)),
+        mimetype='application/json'
+    )
+
+
+def stream_json_object(members, name, items):
+    """ Creates a response that writes a JSON object whose last
+        member is a list written item by item, like stream_json_list
+
+        Args:
+            members (dict): The object's other members, encoded up front
+            name (str): The streamed list's member name
+            items (iterable): JSON serializable objects
+
+        Returns:
+            (flask.Response): Streamed application/json response
+    """
+    return Response(
+        stream_with_context(_generate_json_object(members, name, items)),
+        mimetype='application/json'
+    )
+
+
+def encode_json_list(items):
+    """ Encodes a list the same way stream_json_list writes it
+
+        Args:
+            items (iterable): JSON serializable objects
+
+        Returns:
+            (bytes): The JSON array
+    """
+    return b''.join(_generate_json_list(items))
+
+
+def json_response(body):
+    """ Creates a response from an already encoded JSON body
+
+        Args:
+            body (bytes): The JSON
+
+        Returns:
+            (flask.Response): application/json response
+    """
+    return Response(body, mimetype='application/json')
+
+
+def _generate_json_list(items, end=b']\n'):
+    yield b'['
+    separator = b''
+    for item in items:
+        yield separator + encode(item)
+        separator = b','
+    yield end
+
+
+def _generate_json_object(members, name, items):
+    # The object is encoded with an empty list as its last member,
+    # the list is then written from where that "[]}" starts
+    yield encode(dict(members, **{name: []}))[:-3]
+    yield from _generate_json_list(items, b']}\n')
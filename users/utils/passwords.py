@@ -0,0 +1,157 @@
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from users.utils.env_vars import PASSWORD_HASH_ITERATIONS, PASSWORD_HASH_MAX_PENDING, \
+    PASSWORD_HASH_WORKERS
+
+
+ALGORITHM = 'pbkdf2_sha256'
+PENDING_TIMEOUT_SECONDS = 10
+
+
+class PasswordHasher:
+    """ Hashes and verifies passwords with PBKDF2-SHA256
+
+        The hashing is deliberately slow, so it runs on a bounded
+        process pool instead of the request threads. Stored hashes
+        look like "pbkdf2_sha256$<iterations>$<salt>$<hash>", anything
+        else is a legacy plain text password.
+    """
+
+    def __init__(self, iterations, workers, max_pending):
+        self.iterations = iterations
+        self.max_pending = max_pending
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context('spawn')
+        ) if workers > 0 else None
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._acquiring = threading.Lock()
+        self._dummy_hash = None
+
+    @property
+    def dummy_hash(self):
+        """ A hash of a random password, verified when the user isn't
+            found so logins take as long whether the username exists or not
+        """
+        if not self._dummy_hash:
+            self._dummy_hash = self.hash(base64.b64encode(os.urandom(16)).decode())
+        return self._dummy_hash
+
+    def hash(self, password):
+        """ Hashes a password with a new salt
+
+            Args:
+                password (str): The plain text password
+
+            Raises:
+                RuntimeError: If too many hashes are already pending
+
+            Returns:
+                (str): The encoded hash to be stored
+        """
+        return self.hash_many([password])[0]
+
+    def hash_many(self, passwords):
+        """ Hashes many passwords at once, spread over the pool
+
+            Args:
+                passwords (list): The plain text passwords
+
+            Raises:
+                RuntimeError: If too many hashes are already pending
+
+            Returns:
+                (list): The encoded hashes, in the same order
+        """
+        salts = [base64.b64encode(os.urandom(16)).decode() for _ in passwords]
+        digests = self._map(_pbkdf2, passwords, salts, [self.iterations] * len(passwords))
+        return [
+            f'{ALGORITHM}${self.iterations}${salt}${digest}'
+            for salt, digest in zip(salts, digests)
+        ]
+
+    def verify(self, password, stored):
+        """ Checks a password against the stored value
+
+            Args:
+                password (str): The plain text password sent by the user
+                stored (str): The stored hash or legacy plain text password
+
+            Raises:
+                RuntimeError: If too many hashes are already pending
+
+            Returns:
+                (tuple): Whether the password matches and whether
+                    the stored value should be rehashed
+        """
+        parts = stored.split('$') if stored else []
+        if len(parts) != 4 or parts[0] != ALGORITHM:
+            valid = bool(stored) and hmac.compare_digest(password.encode(), stored.encode())
+            return valid, valid
+
+        iterations, salt, expected = int(parts[1]), parts[2], parts[3]
+        digest = self._map(_pbkdf2, [password], [salt], [iterations])[0]
+        valid = hmac.compare_digest(digest, expected)
+        return valid, valid and iterations < self.iterations
+
+    def _map(self, func, *iterables):
+        if not self._executor:
+            return list(map(func, *iterables))
+
+        # Each hash takes a permit, batches go in chunks of at most max_pending
+        arguments = list(zip(*iterables))
+        results = []
+        for start in range(0, len(arguments), self.max_pending):
+            chunk = arguments[start:start + self.max_pending]
+            self._acquire(len(chunk))
+            try:
+                results.extend(self._executor.map(func, *zip(*chunk)))
+            finally:
+                for _ in chunk:
+                    self._pending.release()
+        return results
+
+    def _acquire(self, permits):
+        # Permits are taken one caller at a time, so callers holding part
+        # of the permits they need never wait on each other
+        deadline = time.monotonic() + PENDING_TIMEOUT_SECONDS
+        taken = 0
+        # pylint: disable=consider-using-with
+        if self._acquiring.acquire(timeout=PENDING_TIMEOUT_SECONDS):
+            try:
+                while taken < permits and self._pending.acquire(
+                        timeout=max(deadline - time.monotonic(), 0)):
+                    taken += 1
+            finally:
+                self._acquiring.release()
+
+        if taken < permits:
+            for _ in range(taken):
+                self._pending.release()
+            raise RuntimeError('Too many pending password hashes')
+
+
+def _pbkdf2(password, salt, iterations):
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), iterations)
+    return base64.b64encode(digest).decode()
+
+
+def get_password_hasher():
+    if not get_password_hasher.hasher:
+        # Request threads may race here, a second pool would leak its processes
+        with get_password_hasher.lock:
+            if not get_password_hasher.hasher:
+                get_password_hasher.hasher = PasswordHasher(
+                    PASSWORD_HASH_ITERATIONS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING
+                )
+    return get_password_hasher.hasher
+
+
+get_password_hasher.hasher = None
+get_password_hasher.lock = threading.Lock()
@@ -0,0 +1,233 @@
+import asyncio
+import threading
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from jwt.exceptions import PyJWTError
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+
+from users.utils.env_vars import SERVER_TIMEOUT, STREAM_HEARTBEAT_SECONDS, \
+    STREAM_MAX_CONNECTIONS
+from users.utils.feed import RESET_FRAME
+from users.utils.json_encoder import encode
+
+
+STREAM_PATH = '/shops/stream'
+
+# Largest request line and headers read, the stream takes no body
+MAX_HEAD_SIZE = 8192
+
+STREAM_HEADERS = (
+    b'HTTP/1.1 200 OK\r\n'
+    b'Content-Type: text/event-stream\r\n'
+    b'Cache-Control: no-cache\r\n'
+    b'Connection: close\r\n'
+    b'Access-Control-Allow-Origin: *\r\n'
+    b'X-Accel-Buffering: no\r\n'
+    b'\r\n'
+)
+
+# Comment frame, keeps proxies from closing idle streams and finds dead clients
+HEARTBEAT_FRAME = b': ping\n\n'
+
+
+class StreamServer:  # pylint: disable=too-many-instance-attributes
+    """ Serves the shop feed as server-sent events, on GET /shops/stream
+
+        The WSGI server holds a worker thread per request for as long as
+        its response is written, so the long lived streams are served
+        apart, on their own port: one asyncio loop, on its own thread,
+        holds every stream and only writes to them when the feed has new
+        frames or a heartbeat is due.
+
+        Clients authenticate like on the API, with the "Authorization"
+        header or, as EventSource can't send headers, an "access_token"
+        query argument.
+    """
+
+    def __init__(self, app, feed, port):
+        self.app = app
+        self.feed = feed
+        self.port = port
+        self.connections = 0
+        self.stopping = False
+        self.loop = None
+        self.server = None
+        self.ready = threading.Event()
+        self._changed = None
+        self._thread = None
+
+    def start(self):
+        """ Starts serving on a daemon thread, returns once listening
+        """
+        self._thread = threading.Thread(target=self.run, name='shop-stream', daemon=True)
+        self._thread.start()
+        self.ready.wait()
+
+    def run(self):
+        """ Serves until the loop is stopped
+        """
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._changed = self.loop.create_future()
+        self.feed.subscribe(self._notify_threadsafe)
+        self.server = self.loop.run_until_complete(
+            asyncio.start_server(self.handle, '0.0.0.0', self.port, limit=MAX_HEAD_SIZE)
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.server.close()
+            streams = asyncio.all_tasks(self.loop)
+            for stream in streams:
+                stream.cancel()
+            self.loop.run_until_complete(asyncio.gather(*streams, return_exceptions=True))
+            self.loop.close()
+
+    def stop(self):
+        """ Closes every stream and stops serving
+        """
+        self.loop.call_soon_threadsafe(self._stop)
+        self._thread.join()
+
+    def _stop(self):
+        # Streams also check the flag, a cancellation may be lost in wait_for
+        self.stopping = True
+        self.loop.stop()
+
+    async def handle(self, reader, writer):
+        """ Serves one connection, a stream or an error response
+
+            Args:
+                reader (asyncio.StreamReader): The request
+                writer (asyncio.StreamWriter): The response
+        """
+        try:
+            await self._serve(reader, writer)
+        except (ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                asyncio.LimitOverrunError):
+            # Gone, idle or misbehaving clients are just disconnected
+            pass
+        except asyncio.CancelledError:
+            # Stopping, the stream ends with the connection
+            pass
+        finally:
+            writer.close()
+
+    async def _serve(self, reader, writer):
+        head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), SERVER_TIMEOUT)
+        try:
+            method, path, args, headers = parse_head(head)
+        except ValueError:
+            error = 400, 'Malformed request'
+        else:
+            error = self._check(method, path, args, headers)
+        if error:
+            writer.write(get_error_response(*error))
+            await asyncio.wait_for(writer.drain(), SERVER_TIMEOUT)
+            return
+
+        self.connections += 1
+        try:
+            await self._stream(writer, headers.get('last-event-id'))
+        finally:
+            self.connections -= 1
+
+    def _check(self, method, path, args, headers):
+        if path != STREAM_PATH:
+            return 404, f'Only {STREAM_PATH} is served on this port'
+        if method != 'GET':
+            return 405, 'Only GET is allowed'
+        if self.connections >= STREAM_MAX_CONNECTIONS:
+            return 503, 'Too many streams, try again later'
+
+        scheme, _, token = headers.get('authorization', '').partition(' ')
+        if scheme != 'Bearer':
+            token = args.get('access_token', [''])[0]
+        if not self._authenticate(token):
+            return 401, 'A valid access token is required'
+        return None
+
+    def _authenticate(self, token):
+        if not token:
+            return False
+        try:
+            with self.app.app_context():
+                return decode_token(token).get('type') == 'access'
+        except (PyJWTError, JWTExtendedException):
+            return False
+
+    async def _stream(self, writer, last_event_id):
+        position, found = self.feed.get_position(last_event_id)
+        writer.write(STREAM_HEADERS if found or not last_event_id
+                     else STREAM_HEADERS + RESET_FRAME)
+        while not self.stopping:
+            # Taken before reading, so frames added after the read wake it up
+            changed = self._changed
+            frames, position, missed = self.feed.read(position)
+            if missed:
+                frames.insert(0, RESET_FRAME)
+            if not frames:
+                # Every stream waits on the same future, without a task of its own
+                done, _ = await asyncio.wait([changed], timeout=STREAM_HEARTBEAT_SECONDS)
+                if done:
+                    continue
+                frames = [HEARTBEAT_FRAME]
+            writer.write(b''.join(frames))
+            # Clients that stop reading are dropped, not buffered for
+            await asyncio.wait_for(writer.drain(), SERVER_TIMEOUT)
+
+    def _notify_threadsafe(self):
+        self.loop.call_soon_threadsafe(self._notify)
+
+    def _notify(self):
+        changed, self._changed = self._changed, self.loop.create_future()
+        changed.set_result(None)
+
+
+def parse_head(head):
+    """ Reads an HTTP request's line and headers
+
+        Args:
+            head (bytes): The request up to the blank line after the headers
+
+        Raises:
+            ValueError: When the request line is malformed
+
+        Returns:
+            (tuple): The method, the path, the query arguments (lists of
+                values by name) and the headers (by lowercase name)
+    """
+    lines = head.decode('latin-1').split('\r\n')
+    method, target, _ = lines[0].split(' ')
+    headers = {}
+    for line in lines[1:]:
+        name, separator, value = line.partition(':')
+        if separator:
+            headers[name.strip().lower()] = value.strip()
+    url = urlsplit(target)
+    return method, url.path, parse_qs(url.query), headers
+
+
+def get_error_response(status, message):
+    """ A complete JSON error response, like the API's aborts
+
+        Args:
+            status (int): The HTTP status code
+            message (str): Sent as "extra"
+
+        Returns:
+            (bytes): The response
+    """
+    body = encode({'extra': message}) + b'\n'
+    return (
+        f'HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n'
+        'Content-Type: application/json\r\n'
+        f'Content-Length: {len(body)}\r\n'
+        'Connection: close\r\n'
+        'Access-Control-Allow-Origin: *\r\n'
+        '\r\n'
+    ).encode('latin-1') + body
@@ -0,0 +1,118 @@
+import bisect
+import threading
+import unicodedata
+
+from users.utils.db.adapter_factory import get_mongo_adapter
+
+
+class NameIndex:
+    """ Thread safe in-process prefix index of shop names, kept as
+        a sorted list searched with bisect. Every word start of a
+        name is a key, so "fel" suggests "Pet Feliz".
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._names = {}
+        self._lock = threading.Lock()
+
+    def build(self, shops):
+        """ Replaces the index contents
+
+            Args:
+                shops (iterable): The (shop id, name) pairs
+        """
+        keys, names = [], {}
+        for shop_id, name in shops:
+            if name:
+                names[shop_id] = name
+                keys.extend((key, shop_id) for key in self._get_keys(name))
+        keys.sort()
+
+        with self._lock:
+            self._keys, self._names = keys, names
+
+    def add(self, shop_id, name):
+        """ Adds a shop or renames it, no-op when the name didn't change
+
+            Args:
+                shop_id (str): The shop's id
+                name (str): The shop's name
+        """
+        with self._lock:
+            if self._names.get(shop_id) == name:
+                return
+            self._remove(shop_id)
+            if name:
+                self._names[shop_id] = name
+                for key in self._get_keys(name):
+                    bisect.insort(self._keys, (key, shop_id))
+
+    def remove(self, shop_id):
+        """ Removes a shop from the index
+
+            Args:
+                shop_id (str): The shop's id
+        """
+        with self._lock:
+            self._remove(shop_id)
+
+    def suggest(self, prefix, limit=10):
+        """ Finds the shops with a name word starting with the prefix
+
+            Args:
+                prefix (str): The typed text, case and accent insensitive
+                limit (int): Max number of suggestions
+
+            Returns:
+                (list): The matching shops' "_id" and "name", in key order
+        """
+        prefix = self._normalize(prefix)
+        if not prefix:
+            return []
+
+        found = []
+        with self._lock:
+            index = bisect.bisect_left(self._keys, (prefix,))
+            while index < len(self._keys) and len(found) < limit:
+                key, shop_id = self._keys[index]
+                if not key.startswith(prefix):
+                    break
+                if shop_id not in found:
+                    found.append(shop_id)
+                index += 1
+            return [{'_id': shop_id, 'name': self._names[shop_id]} for shop_id in found]
+
+    def __len__(self):
+        return len(self._names)
+
+    def _remove(self, shop_id):
+        name = self._names.pop(shop_id, None)
+        if not name:
+            return
+        for key in self._get_keys(name):
+            index = bisect.bisect_left(self._keys, (key, shop_id))
+            if index < len(self._keys) and self._keys[index] == (key, shop_id):
+                del self._keys[index]
+
+    @classmethod
+    def _get_keys(cls, name):
+        words = cls._normalize(name).split()
+        return {' '.join(words[index:]) for index in range(len(words))}
+
+    @staticmethod
+    def _normalize(text):
+        decomposed = unicodedata.normalize('NFKD', text or '')
+        stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+        return ' '.join(stripped.casefold().split())
+
+
+def get_name_index():
+    if get_name_index.index is None:
+        index = NameIndex()
+        index.build(get_mongo_adapter().get_shop_names())
+        get_name_index.index = index
+    return get_name_index.index
+
+
+get_name_index.index = None